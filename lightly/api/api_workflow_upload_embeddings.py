@@ -1,6 +1,7 @@
 import csv
 import hashlib
 import io
+import os
 import tempfile
 from datetime import datetime
 from typing import List
@@ -17,7 +18,12 @@ from lightly.openapi_generated.swagger_client.models.dataset_embedding_data impo
 from lightly.openapi_generated.swagger_client.models.write_csv_url_data import (
     WriteCSVUrlData,
 )
-from lightly.utils.io import check_embeddings, check_filenames
+from lightly.utils.io import (
+    check_embeddings,
+    check_filenames,
+    convert_embeddings_binary_to_csv,
+    is_binary_embeddings_path,
+)
 
 
 class EmbeddingDoesNotExistError(ValueError):
@@ -101,6 +107,9 @@ class _UploadEmbeddingsMixin:
         Then creates a new csv with the embeddings in the order specified on the server. Next it uploads it to the server.
         The received embedding_id is saved as a property of self.
 
+        Embeddings in the binary format (see lightly.utils.io.save_embeddings) are
+        converted to a temporary .csv before the upload.
+
         Args:
             path_to_embeddings_csv:
                 The path to the .csv containing the embeddings, e.g. "path/to/embeddings.csv"
@@ -109,6 +118,18 @@ class _UploadEmbeddingsMixin:
                 the upload is aborted.
 
         """
+        if is_binary_embeddings_path(path_to_embeddings_csv):
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                tmp_path_to_embeddings_csv = os.path.join(tmp_dir, "embeddings.csv")
+                convert_embeddings_binary_to_csv(
+                    binary_path=path_to_embeddings_csv,
+                    csv_path=tmp_path_to_embeddings_csv,
+                )
+                self.upload_embeddings(
+                    path_to_embeddings_csv=tmp_path_to_embeddings_csv, name=name
+                )
+            return
+
         check_embeddings(path_to_embeddings_csv, remove_additional_columns=True)
 
         # Try to append the embeddings on the server, if they exist
@@ -6,6 +6,7 @@
 # Copyright (c) 2020. Lightly AG and its affiliates.
 # All Rights Reserved
 
+from lightly.cli.check_images_cli import check_images_cli
 from lightly.cli.crop_cli import crop_cli
 from lightly.cli.download_cli import download_cli
 from lightly.cli.embed_cli import embed_cli
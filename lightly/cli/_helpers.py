@@ -2,7 +2,9 @@
 
 # Copyright (c) 2020. Lightly AG and its affiliates.
 # All Rights Reserved
+import math
 import os
+from typing import Any, Dict, Optional
 
 import hydra
 import torch
@@ -26,6 +28,35 @@ def cpu_count():
     return os.cpu_count()
 
 
+def get_loader_kwargs(cfg) -> Dict[str, Any]:
+    """Returns the arguments of the loader namespace which are passed to
+    torch.utils.data.DataLoader."""
+    return {
+        key: value for key, value in cfg["loader"].items() if key != "draft_decoding"
+    }
+
+
+def get_decode_size(cfg, training: bool) -> Optional[int]:
+    """Returns the size at which images are decoded or None if images are
+    decoded at full resolution.
+
+    Images must be decoded such that they are at least collate.input_size
+    pixels large. For training, random crops can be as small as
+    collate.min_scale of the image area and are resized to input_size.
+    Images are therefore decoded at input_size / sqrt(min_scale) pixels to not
+    lose resolution in the crops.
+
+    """
+    # custom config files of older versions have no draft_decoding key
+    if not cfg["loader"].get("draft_decoding", False):
+        return None
+    input_size = cfg["collate"]["input_size"]
+    if training:
+        min_scale = cfg["collate"].get("min_scale", 1.0)
+        return math.ceil(input_size / math.sqrt(min_scale))
+    return input_size
+
+
 def fix_input_path(path):
     """Fix broken relative paths."""
     if not os.path.isabs(path):
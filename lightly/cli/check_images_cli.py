@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""**Lightly Check Images:** Find corrupt images from the command-line.
+
+This module contains the entrypoint for the **lightly-check-images**
+command-line interface.
+"""
+
+# Copyright (c) 2023. Lightly AG and its affiliates.
+# All Rights Reserved
+
+from typing import List, Tuple
+
+import hydra
+
+from lightly.cli._helpers import fix_hydra_arguments, fix_input_path
+from lightly.data._utils import iter_check_images
+from lightly.utils.hipify import bcolors
+
+
+def _check_images_cli(cfg, is_cli_call=True) -> Tuple[List[str], List[str]]:
+    input_dir = cfg["input_dir"]
+    if not input_dir:
+        print("Please specify an input directory with input_dir=...")
+        return [], []
+    if is_cli_call:
+        input_dir = fix_input_path(input_dir)
+
+    cache_path = cfg["check_images"]["cache_path"]
+    if cache_path and is_cli_call:
+        cache_path = fix_input_path(cache_path)
+    num_workers = cfg["check_images"]["num_workers"]
+    if num_workers < 0:
+        num_workers = None
+
+    healthy_images = []
+    corrupt_images = []
+    for filename, is_corrupt in iter_check_images(
+        input_dir,
+        num_workers=num_workers,
+        verify_only=cfg["check_images"]["verify_only"],
+        cache_path=cache_path or None,
+    ):
+        if is_corrupt:
+            # print corrupt images as soon as they are found
+            print(filename, flush=True)
+            corrupt_images.append(filename)
+        else:
+            healthy_images.append(filename)
+
+    color = bcolors.FAIL if corrupt_images else bcolors.OKGREEN
+    print(
+        f"Found {color}{len(corrupt_images)}{bcolors.ENDC} corrupt images and "
+        f"{len(healthy_images)} healthy images in {input_dir}."
+    )
+    return healthy_images, corrupt_images
+
+
+@hydra.main(**fix_hydra_arguments(config_path="config", config_name="config"))
+def check_images_cli(cfg):
+    """Finds corrupt images in a directory.
+
+    The filenames of the corrupt images are printed one per line while the
+    images are checked.
+
+    Args:
+        cfg:
+            The default configs are loaded from the config file.
+            To overwrite them please see the section on the config file
+            (.config.config.yaml).
+
+    Command-Line Args:
+        input_dir:
+            Path to the input directory where images are stored.
+        check_images.num_workers: Optional
+            Number of processes used to check the images. Set it to -1 to use
+            all available cores.
+        check_images.verify_only: Optional
+            Set it to True to only verify the file structure of the images.
+            This is much faster but does not detect truncated images.
+        check_images.cache_path: Optional
+            Path to a file in which the results are cached. Images which did
+            not change since the last check are not checked again.
+
+    Examples:
+        >>> # find corrupt images
+        >>> lightly-check-images input_dir=data/
+        >>>
+        >>> # only verify the file structure and cache the results
+        >>> lightly-check-images input_dir=data/ check_images.verify_only=True check_images.cache_path=check.jsonl
+
+    """
+    return _check_images_cli(cfg)
+
+
+def entry():
+    check_images_cli()
@@ -20,6 +20,8 @@ from lightly.cli._helpers import (
     cpu_count,
     fix_hydra_arguments,
     fix_input_path,
+    get_decode_size,
+    get_loader_kwargs,
     get_model_from_config,
 )
 from lightly.data import LightlyDataset
@@ -64,7 +66,11 @@ def _embed_cli(
         ]
     )
 
-    dataset = LightlyDataset(input_dir, transform=transform)
+    dataset = LightlyDataset(
+        input_dir,
+        transform=transform,
+        decode_size=get_decode_size(cfg, training=False),
+    )
 
     # disable drop_last and shuffle
     cfg["loader"]["drop_last"] = False
@@ -75,11 +81,16 @@ def _embed_cli(
     if cfg["loader"]["num_workers"] < 0:
         cfg["loader"]["num_workers"] = cpu_count()
 
-    dataloader = torch.utils.data.DataLoader(dataset, **cfg["loader"])
+    dataloader = torch.utils.data.DataLoader(dataset, **get_loader_kwargs(cfg))
 
     encoder = get_model_from_config(cfg, is_cli_call)
 
-    embeddings, labels, filenames = encoder.embed(dataloader, device=device)
+    embeddings, labels, filenames = encoder.embed(
+        dataloader,
+        device=device,
+        # custom config files of older versions have no inference namespace
+        **cfg.get("inference", {}),
+    )
 
     if is_cli_call:
         path = os.path.join(os.getcwd(), "embeddings.csv")
@@ -122,6 +133,9 @@ def embed_cli(cfg) -> str:
         >>>
         >>> # embed images with custom settings
         >>> lightly-embed input_dir=data/ model.num_ftrs=32
+        >>>
+        >>> # embed images faster on CPU with bfloat16 precision
+        >>> lightly-embed input_dir=data/ inference.precision=bf16 inference.channels_last=True
 
     """
     return _embed_cli(cfg)
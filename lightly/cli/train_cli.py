@@ -21,6 +21,8 @@ from lightly.cli._helpers import (
     cpu_count,
     fix_hydra_arguments,
     fix_input_path,
+    get_decode_size,
+    get_loader_kwargs,
     get_ptmodel_from_config,
     is_url,
     load_from_state_dict,
@@ -108,13 +110,13 @@ def _train_cli(cfg, is_cli_call=True):
     criterion = NTXentLoss(**cfg["criterion"])
     optimizer = torch.optim.SGD(model.parameters(), **cfg["optimizer"])
 
-    dataset = LightlyDataset(input_dir)
+    dataset = LightlyDataset(input_dir, decode_size=get_decode_size(cfg, training=True))
 
     cfg["loader"]["batch_size"] = min(cfg["loader"]["batch_size"], len(dataset))
 
     collate_fn = ImageCollateFunction(**cfg["collate"])
     dataloader = torch.utils.data.DataLoader(
-        dataset, **cfg["loader"], collate_fn=collate_fn
+        dataset, **get_loader_kwargs(cfg), collate_fn=collate_fn
     )
 
     encoder = SelfSupervisedEmbedding(model, criterion, optimizer, dataloader)
@@ -209,6 +209,14 @@ def embed_images(checkpoint: str, config_path: str = None, **kwargs):
         >>>     my_checkpoint_path, input_dir='path/to/data', collate=my_collate)
         >>> # the command above is equivalent to:
         >>> # lightly-embed input_dir='path/to/data' collate.input_size=256
+        >>>
+        >>> # embed images faster on CPU with bfloat16 precision and the
+        >>> # channels-last memory format
+        >>> my_inference = {'precision': 'bf16', 'channels_last': True}
+        >>> embeddings, _, _ = lightly.embed_images(
+        >>>     my_checkpoint_path, input_dir='path/to/data', inference=my_inference)
+        >>> # the command above is equivalent to:
+        >>> # lightly-embed input_dir='path/to/data' inference.precision=bf16 inference.channels_last=True
 
     """
     config_path = _get_config_path(config_path)
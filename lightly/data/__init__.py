@@ -24,3 +24,5 @@ from lightly.data.collate import (
     imagenet_normalize,
 )
 from lightly.data.dataset import LightlyDataset
+from lightly.data.image_cache import DecodedImageCache
+from lightly.data.video_sampler import VideoBatchSampler, VideoSequentialSampler
@@ -9,6 +9,8 @@ from typing import Any, Callable, Dict, List, Optional, Set
 from torchvision import datasets
 
 from lightly.data._image import DatasetFolder
+from lightly.data._manifest import _FileManifest, _ManifestImageFolder
+from lightly.data._shard import ShardDataset, _contains_shards
 
 try:
     from lightly.data._video import VideoDataset
@@ -100,12 +102,18 @@ def _load_dataset_from_folder(
     is_valid_file: Optional[Callable[[str], bool]] = None,
     tqdm_args: Dict[str, Any] = None,
     num_workers_video_frame_counting: int = 0,
+    video_index_cache_path: Optional[str] = None,
+    max_open_videos: int = 1,
+    manifest_path: Optional[str] = None,
 ):
     """Initializes dataset from folder.
 
     Args:
         root: (str) Root directory path
         transform: (torchvision.transforms.Compose) image transformations
+        manifest_path: (str) Path to a json file with the listing of all files
+            in root. If set, only directories which changed since the last
+            call are listed.
 
     Returns:
         Dataset consisting of images/videos in the root directory.
@@ -117,9 +125,22 @@ def _load_dataset_from_folder(
     if not os.path.exists(root):
         raise ValueError(f"The input directory {root} does not exist!")
 
+    if _contains_shards(root):
+        # root contains shards created with LightlyDataset.dump_shards
+        return ShardDataset(root, transform=transform, is_valid_file=is_valid_file)
+
+    manifest = None
+    if manifest_path is not None:
+        manifest = _FileManifest(manifest_path, root)
+        manifest.refresh()
+        manifest.save()
+
     # if there is a video in the input directory but we do not have
     # the right dependencies, raise a ValueError
-    contains_videos = _contains_videos(root, VIDEO_EXTENSIONS)
+    if manifest is not None:
+        contains_videos = manifest.contains_files(VIDEO_EXTENSIONS)
+    else:
+        contains_videos = _contains_videos(root, VIDEO_EXTENSIONS)
     if contains_videos and not VIDEO_DATASET_AVAILABLE:
         raise ValueError(
             f"The input directory {root} contains videos "
@@ -138,8 +159,17 @@ def _load_dataset_from_folder(
             is_valid_file=is_valid_file,
             tqdm_args=tqdm_args,
             num_workers=num_workers_video_frame_counting,
+            video_index_cache_path=video_index_cache_path,
+            max_open_videos=max_open_videos,
+        )
+    elif manifest is not None and any(
+        not _is_lightly_output_dir(subdir) for subdir in manifest.subdirs()
+    ):
+        # root contains subdirectories -> create an image folder dataset
+        dataset = _ManifestImageFolder(
+            root, manifest=manifest, transform=transform, is_valid_file=is_valid_file
         )
-    elif _contains_subdirs(root):
+    elif manifest is None and _contains_subdirs(root):
         # root contains subdirectories -> create an image folder dataset
         dataset = datasets.ImageFolder(
             root, transform=transform, is_valid_file=is_valid_file
@@ -151,6 +181,7 @@ def _load_dataset_from_folder(
             extensions=IMG_EXTENSIONS,
             transform=transform,
             is_valid_file=is_valid_file,
+            filepaths=None if manifest is None else manifest.filepaths(),
         )
 
     return dataset
@@ -4,7 +4,7 @@
 # All Rights Reserved
 
 import os
-from typing import List, Set, Tuple
+from typing import List, Optional, Set, Tuple
 
 import torchvision.datasets as datasets
 from torchvision import transforms
@@ -13,7 +13,7 @@ from lightly.data._image_loaders import default_loader
 
 
 def _make_dataset(
-    directory, extensions=None, is_valid_file=None
+    directory, extensions=None, is_valid_file=None, filepaths=None
 ) -> List[Tuple[str, int]]:
     """Returns a list of all image files with targets in the directory.
 
@@ -24,6 +24,9 @@ def _make_dataset(
             Tuple of valid extensions.
         is_valid_file:
             Used to find valid files.
+        filepaths:
+            Paths of all files in the directory. If None, the directory is
+            listed with os.scandir.
 
     Returns:
         List of instance tuples: (path_i, target_i = 0).
@@ -47,14 +50,17 @@ def _make_dataset(
             def _is_valid_file(filepath):
                 return is_valid_file_extension(filepath) and is_valid_file(filepath)
 
+    if filepaths is None:
+        filepaths = [f.path for f in os.scandir(directory)]
+
     instances = []
-    for f in os.scandir(directory):
-        if not _is_valid_file(f.path):
+    for path in filepaths:
+        if not _is_valid_file(path):
             continue
 
         # convention: the label of all images is 0, based on the fact that
         # they are all in the same directory
-        item = (f.path, 0)
+        item = (path, 0)
         instances.append(item)
 
     return sorted(instances, key=lambda x: x[0])  # sort by path
@@ -79,6 +85,10 @@ class DatasetFolder(datasets.VisionDataset):
             As transform but for targets
         is_valid_file:
             Used to check corrupt files
+        filepaths:
+            Paths of all files in root. If set, root is not listed again
+            which is useful if the listing is already known, for example from
+            a file manifest.
 
     Raises:
         RuntimeError: If no supported files are found in root.
@@ -93,12 +103,15 @@ class DatasetFolder(datasets.VisionDataset):
         transform=None,
         target_transform=None,
         is_valid_file=None,
+        filepaths: Optional[List[str]] = None,
     ):
         super(DatasetFolder, self).__init__(
             root, transform=transform, target_transform=target_transform
         )
 
-        samples = _make_dataset(self.root, extensions, is_valid_file)
+        samples = _make_dataset(
+            self.root, extensions, is_valid_file, filepaths=filepaths
+        )
         if len(samples) == 0:
             msg = "Found 0 files in folder: {}\n".format(self.root)
             if extensions is not None:
@@ -6,6 +6,9 @@
 # Copyright (c) 2020. Lightly AG and its affiliates.
 # All Rights Reserved
 
+import functools
+from typing import Callable, Optional
+
 from PIL import Image
 
 
@@ -34,3 +37,52 @@ def default_loader(path):
         return accimage_loader(path)
     else:
         return pil_loader(path)
+
+
+def draft_pil_loader(path, size: int):
+    """Loads an image with PIL and decodes JPEGs at reduced resolution.
+
+    JPEG images are decoded at the smallest resolution (1/1, 1/2, 1/4, or 1/8
+    of the original size) for which both width and height are still at least
+    size pixels. This is much faster than decoding at full resolution if the
+    image is downscaled afterwards anyway. Other formats are decoded at full
+    resolution.
+
+    Args:
+        path:
+            Path to the image.
+        size:
+            Minimum width and height of the decoded image in pixels.
+
+    Returns:
+        The image as RGB PIL image.
+
+    """
+    # open path as file to avoid ResourceWarning
+    # (https://github.com/python-pillow/Pillow/issues/835)
+    with open(path, "rb") as f:
+        img = Image.open(f)
+        if img.format == "JPEG":
+            img.draft("RGB", (size, size))
+        return img.convert("RGB")
+
+
+def get_image_loader(decode_size: Optional[int] = None) -> Callable[[str], Image.Image]:
+    """Returns the image loader for the decode size.
+
+    Args:
+        decode_size:
+            If not None, JPEG images are decoded at reduced resolution with
+            draft_pil_loader such that width and height are at least
+            decode_size pixels. Otherwise, images are decoded at full
+            resolution with default_loader.
+
+    Returns:
+        A picklable function which loads the image at a path.
+
+    """
+    if decode_size is None:
+        return default_loader
+    if decode_size <= 0:
+        raise ValueError(f"decode_size must be positive but is {decode_size}.")
+    return functools.partial(draft_pil_loader, size=decode_size)
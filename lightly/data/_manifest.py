@@ -0,0 +1,207 @@
+""" File Manifest """
+
+# Copyright (c) 2023. Lightly AG and its affiliates.
+# All Rights Reserved
+
+import json
+import os
+import warnings
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from torchvision import datasets
+
+
+class _FileManifest:
+    """Persistent listing of all files below a root directory.
+
+    Listing large directory trees takes a long time, especially on network
+    filesystems. The manifest stores the names, sizes, and modification times
+    of all files together with the modification time of every directory in a
+    json file. When the manifest is refreshed, only directories whose
+    modification time changed are listed again. The modification time of a
+    directory changes whenever a file or subdirectory is added, removed, or
+    renamed in it.
+
+    Attributes:
+        path:
+            Path to the json file of the manifest.
+        root:
+            Root directory of the listed files. The manifest is discarded if
+            it was created for a different root directory.
+
+    """
+
+    _VERSION = 1
+
+    def __init__(self, path: str, root: str):
+        self.path = path
+        self.root = root
+        # Maps the path of every directory relative to root to its
+        # modification time, its files as {name: [size, mtime_ns]}, and the
+        # names of its subdirectories.
+        self._dirs: Dict[str, Dict[str, Any]] = {}
+        self._changed = False
+        if os.path.isfile(path):
+            self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as ex:
+            warnings.warn(f"Could not read file manifest {self.path}: {ex}")
+            return
+        if manifest.get("version") == self._VERSION and manifest.get(
+            "root"
+        ) == os.path.abspath(self.root):
+            self._dirs = manifest["dirs"]
+
+    def refresh(self) -> None:
+        """Lists all directories which changed since the manifest was saved."""
+        dirs = {}
+        stack = [""]
+        while stack:
+            rel_dir = stack.pop()
+            directory = os.path.join(self.root, rel_dir)
+            mtime_ns = os.stat(directory).st_mtime_ns
+            entry = self._dirs.get(rel_dir)
+            if entry is None or entry["mtime_ns"] != mtime_ns:
+                entry = _list_dir(directory, mtime_ns)
+                self._changed = True
+            dirs[rel_dir] = entry
+            stack.extend(os.path.join(rel_dir, subdir) for subdir in entry["subdirs"])
+        if dirs.keys() != self._dirs.keys():
+            self._changed = True
+        self._dirs = dirs
+
+    def save(self) -> None:
+        """Saves the manifest if it changed."""
+        if not self._changed:
+            return
+        manifest = {
+            "version": self._VERSION,
+            "root": os.path.abspath(self.root),
+            "dirs": self._dirs,
+        }
+        # write to a temporary file first to never leave a corrupt manifest
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, self.path)
+        self._changed = False
+
+    def subdirs(self, rel_dir: str = "") -> List[str]:
+        """Returns the sorted names of the subdirectories of a directory."""
+        return sorted(self._dirs[rel_dir]["subdirs"])
+
+    def filepaths(self, rel_dir: str = "") -> List[str]:
+        """Returns the sorted paths of the files directly in a directory."""
+        directory = os.path.join(self.root, rel_dir)
+        return [
+            os.path.join(directory, name)
+            for name in sorted(self._dirs[rel_dir]["files"])
+        ]
+
+    def walk(self, rel_dir: str = "") -> Iterator[Tuple[str, List[str]]]:
+        """Yields (directory, sorted filenames) for the directory and all its
+        subdirectories. Directories are yielded in the same order as
+        sorted(os.walk(directory))."""
+        rel_dirs = []
+        stack = [rel_dir]
+        while stack:
+            current = stack.pop()
+            rel_dirs.append(current)
+            stack.extend(
+                os.path.join(current, subdir)
+                for subdir in self._dirs[current]["subdirs"]
+            )
+        for directory, rel in sorted(
+            (os.path.join(self.root, rel), rel) for rel in rel_dirs
+        ):
+            yield directory, sorted(self._dirs[rel]["files"])
+
+    def contains_files(self, extensions: Tuple[str, ...]) -> bool:
+        """Returns True if any file has one of the extensions."""
+        return any(
+            name.lower().endswith(extensions)
+            for entry in self._dirs.values()
+            for name in entry["files"]
+        )
+
+
+class _ManifestImageFolder(datasets.ImageFolder):
+    """ImageFolder which gets its classes and files from a _FileManifest.
+
+    Returns the same classes and samples as torchvision.datasets.ImageFolder
+    without listing the root directory. Requires torchvision 0.10 or newer
+    because older versions do not call the find_classes and make_dataset
+    methods.
+
+    """
+
+    def __init__(self, root: str, manifest: _FileManifest, **kwargs):
+        if not hasattr(datasets.DatasetFolder, "find_classes"):
+            raise RuntimeError("A file manifest requires torchvision 0.10 or newer.")
+        self._manifest = manifest
+        super().__init__(root, **kwargs)
+
+    def find_classes(self, directory: str) -> Tuple[List[str], Dict[str, int]]:
+        classes = self._manifest.subdirs()
+        if not classes:
+            raise FileNotFoundError(f"Couldn't find any class folder in {directory}.")
+        class_to_idx = {cls_name: i for i, cls_name in enumerate(classes)}
+        return classes, class_to_idx
+
+    def make_dataset(
+        self,
+        directory: str,
+        class_to_idx: Dict[str, int],
+        extensions: Optional[Union[str, Tuple[str, ...]]] = None,
+        is_valid_file: Optional[Callable[[str], bool]] = None,
+        allow_empty: bool = False,
+    ) -> List[Tuple[str, int]]:
+        if (extensions is None) == (is_valid_file is None):
+            raise ValueError(
+                "Both extensions and is_valid_file cannot be None or not None "
+                "at the same time"
+            )
+        if extensions is not None:
+
+            def is_valid_file(filepath: str) -> bool:
+                return datasets.folder.has_file_allowed_extension(filepath, extensions)
+
+        instances = []
+        available_classes = set()
+        for target_class in sorted(class_to_idx.keys()):
+            class_index = class_to_idx[target_class]
+            for root, filenames in self._manifest.walk(target_class):
+                for filename in filenames:
+                    path = os.path.join(root, filename)
+                    if is_valid_file(path):
+                        instances.append((path, class_index))
+                        available_classes.add(target_class)
+
+        empty_classes = set(class_to_idx.keys()) - available_classes
+        if empty_classes and not allow_empty:
+            msg = (
+                f"Found no valid file for the classes "
+                f"{', '.join(sorted(empty_classes))}. "
+            )
+            if extensions is not None:
+                msg += f"Supported extensions are: {extensions}"
+            raise FileNotFoundError(msg)
+        return instances
+
+
+def _list_dir(directory: str, mtime_ns: int) -> Dict[str, Any]:
+    """Lists the files and subdirectories of a single directory."""
+    files = {}
+    subdirs = []
+    with os.scandir(directory) as scan_dir:
+        for entry in scan_dir:
+            if entry.is_dir():
+                subdirs.append(entry.name)
+            else:
+                stat = entry.stat()
+                files[entry.name] = [stat.st_size, stat.st_mtime_ns]
+    return {"mtime_ns": mtime_ns, "files": files, "subdirs": sorted(subdirs)}
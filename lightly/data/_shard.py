@@ -0,0 +1,222 @@
+""" Shard Dataset """
+
+# Copyright (c) 2023. Lightly AG and its affiliates.
+# All Rights Reserved
+
+import io
+import json
+import mmap
+import os
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from PIL import Image
+from torchvision import datasets
+
+# Name of the index file in a directory with shards. A directory containing
+# this file is loaded as ShardDataset.
+SHARD_INDEX_FILENAME = "lightly_shards.json"
+
+# Default maximum size of a single shard file in bytes.
+DEFAULT_MAX_SHARD_SIZE = 1 << 30
+
+
+def _shard_filename(shard_index: int) -> str:
+    return f"shard-{shard_index:05d}.bin"
+
+
+class _ShardWriter:
+    """Writes encoded images into append-only shard files.
+
+    Images are appended to the current shard until it would exceed
+    max_shard_size bytes, then a new shard is started. The index file with
+    the shard, offset, and length of every image is written by close().
+
+    Attributes:
+        output_dir:
+            Directory in which the shards and the index file are stored.
+        max_shard_size:
+            Maximum size of a shard in bytes. A shard can be larger if it
+            contains only a single image which is larger than max_shard_size.
+
+    """
+
+    _VERSION = 1
+
+    def __init__(self, output_dir: str, max_shard_size: int = DEFAULT_MAX_SHARD_SIZE):
+        if max_shard_size <= 0:
+            raise ValueError(
+                f"max_shard_size must be positive but is {max_shard_size}."
+            )
+        self.output_dir = output_dir
+        self.max_shard_size = max_shard_size
+        self._shards: List[str] = []
+        self._samples: List[List[Any]] = []
+        self._file = None
+        self._offset = 0
+        os.makedirs(output_dir, exist_ok=True)
+
+    def write(self, data: bytes, filename: str, target: int) -> None:
+        """Appends the encoded image to the current shard."""
+        if self._file is None or (
+            self._offset > 0 and self._offset + len(data) > self.max_shard_size
+        ):
+            self._next_shard()
+        self._file.write(data)
+        self._samples.append(
+            [filename, target, len(self._shards) - 1, self._offset, len(data)]
+        )
+        self._offset += len(data)
+
+    def close(self) -> None:
+        """Closes the current shard and writes the index file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        index = {
+            "version": self._VERSION,
+            "shards": self._shards,
+            "samples": self._samples,
+        }
+        # write to a temporary file first to never leave a corrupt index behind
+        path = os.path.join(self.output_dir, SHARD_INDEX_FILENAME)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(index, f)
+        os.replace(tmp_path, path)
+
+    def _next_shard(self) -> None:
+        if self._file is not None:
+            self._file.close()
+        shard = _shard_filename(len(self._shards))
+        self._file = open(os.path.join(self.output_dir, shard), "wb")
+        self._shards.append(shard)
+        self._offset = 0
+
+
+class ShardDataset(datasets.VisionDataset):
+    """Dataset of images packed into shard files.
+
+    The images are stored as encoded bytes in a few large shard files which
+    are memory-mapped. This avoids opening a separate file for every image
+    which is slow on network filesystems with many small files. Shards are
+    created with LightlyDataset.dump_shards. The samples have the same
+    filenames and targets as in the dataset from which the shards were
+    created.
+
+    Attributes:
+        root:
+            Directory with the shards and the index file.
+        transform:
+            Function that takes a PIL image and returns transformed version
+        target_transform:
+            As transform but for targets
+        is_valid_file:
+            Used to filter the images. Gets the path of the image as
+            os.path.join(root, filename).
+
+    Examples:
+        >>> dataset = LightlyDataset(input_dir='images/')
+        >>> dataset.dump_shards('shards/')
+        >>>
+        >>> # the shards are loaded as ShardDataset
+        >>> dataset = LightlyDataset(input_dir='shards/')
+        >>> sample, target, fname = dataset[0]
+
+    """
+
+    def __init__(
+        self,
+        root: str,
+        transform=None,
+        target_transform=None,
+        is_valid_file: Optional[Callable[[str], bool]] = None,
+    ):
+        super(ShardDataset, self).__init__(
+            root, transform=transform, target_transform=target_transform
+        )
+        with open(os.path.join(root, SHARD_INDEX_FILENAME), "r") as f:
+            index = json.load(f)
+        if index.get("version") != _ShardWriter._VERSION:
+            raise ValueError(
+                f"Unsupported shard index version {index.get('version')} in {root}."
+            )
+
+        samples = index["samples"]
+        if is_valid_file is not None:
+            samples = [
+                sample
+                for sample in samples
+                if is_valid_file(os.path.join(root, sample[0]))
+            ]
+        if len(samples) == 0:
+            raise RuntimeError(f"Found 0 files in shards: {root}\n")
+
+        self.shards: List[str] = index["shards"]
+        self.samples: List[Tuple[str, int, int, int, int]] = [
+            tuple(sample) for sample in samples
+        ]
+        self.targets = [sample[1] for sample in self.samples]
+        # Memory maps are opened lazily in every process.
+        self._mmaps: Dict[int, mmap.mmap] = {}
+
+    def __getitem__(self, index: int):
+        """Returns item at index.
+
+        Args:
+            index:
+                Index of the sample to retrieve.
+
+        Returns:
+            A tuple (sample, target).
+
+        """
+        _, target, shard, offset, length = self.samples[index]
+        data = self._get_mmap(shard)[offset : offset + length]
+        sample = Image.open(io.BytesIO(data)).convert("RGB")
+        if self.transform is not None:
+            sample = self.transform(sample)
+        if self.target_transform is not None:
+            target = self.target_transform(target)
+        return sample, target
+
+    def __len__(self):
+        """Returns the number of samples in the dataset."""
+        return len(self.samples)
+
+    def __getstate__(self):
+        # Memory maps cannot be pickled, they are reopened in the new process.
+        state = self.__dict__.copy()
+        state["_mmaps"] = {}
+        return state
+
+    def get_filename(self, index: int) -> str:
+        """Returns the filename of the image at index."""
+        return self.samples[index][0]
+
+    def _get_mmap(self, shard: int) -> mmap.mmap:
+        shard_mmap = self._mmaps.get(shard)
+        if shard_mmap is None:
+            with open(os.path.join(self.root, self.shards[shard]), "rb") as f:
+                shard_mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._mmaps[shard] = shard_mmap
+        return shard_mmap
+
+
+def _contains_shards(root: str) -> bool:
+    """Checks whether the directory contains a shard index file."""
+    return os.path.isfile(os.path.join(root, SHARD_INDEX_FILENAME))
+
+
+def _encode_image(image: Image.Image, filename: str, fmt: Optional[str]) -> bytes:
+    """Encodes the image with the format or the format derived from the
+    filename. Falls back to png if no format can be determined."""
+    if fmt is None:
+        extension = os.path.splitext(filename)[1].lower()
+        fmt = Image.registered_extensions().get(extension, "png")
+    buffer = io.BytesIO()
+    try:
+        image.save(buffer, format=fmt)
+    except (KeyError, ValueError):
+        buffer = io.BytesIO()
+        image.save(buffer, format="png")
+    return buffer.getvalue()
@@ -3,39 +3,303 @@
 # Copyright (c) 2020. Lightly AG and its affiliates.
 # All Rights Reserved
 
+import json
 import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from typing import *
 
-import tqdm.contrib.concurrent as concurrent
+import tqdm
 from PIL import Image, UnidentifiedImageError
 
 from lightly.data import LightlyDataset
 
 
-def check_images(data_dir: str) -> Tuple[List[str], List[str]]:
+def check_images(
+    data_dir: str,
+    num_workers: Optional[int] = None,
+    verify_only: bool = False,
+    cache_path: Optional[str] = None,
+) -> Tuple[List[str], List[str]]:
     """Iterate through a directory of images and find corrupt images
 
     Args:
         data_dir: Path to the directory containing the images
+        num_workers: Number of processes used to check the images. Uses all
+            CPUs if None and checks the images in the current process if 0.
+        verify_only: If True, only the file structure of the images is
+            verified without decoding the pixel data. This is much faster
+            but does not detect all corrupt images, for example truncated
+            JPEG files.
+        cache_path: Path to a file in which the results are cached. Images
+            which did not change since the last check are not checked again.
 
     Returns:
         (healthy_images, corrupt_images)
     """
-    dataset = LightlyDataset(input_dir=data_dir)
-    filenames = dataset.get_filenames()
+    filenames = LightlyDataset(input_dir=data_dir).get_filenames()
+    results = iter_check_images(
+        data_dir,
+        filenames=filenames,
+        num_workers=num_workers,
+        verify_only=verify_only,
+        cache_path=cache_path,
+    )
+    healthy_images = []
+    corrupt_images = []
+    for filename, is_corrupt in tqdm.tqdm(results, total=len(filenames)):
+        if is_corrupt:
+            corrupt_images.append(filename)
+        else:
+            healthy_images.append(filename)
+    return healthy_images, corrupt_images
+
+
+def iter_check_images(
+    data_dir: str,
+    filenames: Optional[Iterable[str]] = None,
+    num_workers: Optional[int] = None,
+    verify_only: bool = False,
+    cache_path: Optional[str] = None,
+    chunk_size: int = 256,
+) -> Iterator[Tuple[str, bool]]:
+    """Checks the images in a directory and yields the results as they are
+    available.
+
+    The images are checked by a pool of processes. Only a few chunks of
+    images are processed at the same time which keeps the memory usage
+    constant independent of the number of images.
+
+    Args:
+        data_dir: Path to the directory containing the images
+        filenames: Filenames relative to data_dir of the images to check. If
+            None, all images in data_dir are checked.
+        num_workers: Number of processes used to check the images. Uses all
+            CPUs if None and checks the images in the current process if 0.
+        verify_only: See check_images.
+        cache_path: See check_images.
+        chunk_size: Number of images sent to a worker process at once.
+
+    Yields:
+        (filename, is_corrupt) tuples in the order of the filenames.
+    """
+    if filenames is None:
+        filenames = LightlyDataset(input_dir=data_dir).get_filenames()
+    if num_workers is None:
+        num_workers = os.cpu_count() or 1
 
-    def _is_corrupt(filename):
+    cache = _CheckImagesCache(cache_path) if cache_path else None
+    try:
+        for chunk in _check_chunks(
+            data_dir=data_dir,
+            filenames=filenames,
+            num_workers=num_workers,
+            verify_only=verify_only,
+            cache=cache,
+            chunk_size=chunk_size,
+        ):
+            yield from chunk
+    finally:
+        if cache is not None:
+            cache.close()
+
+
+def _check_chunks(
+    data_dir: str,
+    filenames: Iterable[str],
+    num_workers: int,
+    verify_only: bool,
+    cache: Optional["_CheckImagesCache"],
+    chunk_size: int,
+) -> Iterator[List[Tuple[str, bool]]]:
+    """Checks the images in chunks and yields the results of every chunk in
+    order."""
+    chunks = _split_into_chunks(
+        data_dir=data_dir,
+        filenames=filenames,
+        verify_only=verify_only,
+        cache=cache,
+        chunk_size=chunk_size,
+    )
+    if num_workers == 0:
+        for chunk, to_check in chunks:
+            results = _check_image_files(data_dir, to_check, verify_only)
+            yield _merge_results(chunk, to_check, results, cache, verify_only)
+        return
+
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        # Keep at most 2 chunks per worker in flight.
+        pending: Deque[Tuple[_Chunk, List[_FileInfo], Future]] = deque()
+        for chunk, to_check in chunks:
+            future = executor.submit(
+                _check_image_files, data_dir, to_check, verify_only
+            )
+            pending.append((chunk, to_check, future))
+            if len(pending) >= 2 * num_workers:
+                chunk, to_check, future = pending.popleft()
+                yield _merge_results(
+                    chunk, to_check, future.result(), cache, verify_only
+                )
+        while pending:
+            chunk, to_check, future = pending.popleft()
+            yield _merge_results(chunk, to_check, future.result(), cache, verify_only)
+
+
+# (filename, size, mtime_ns) of an image file
+_FileInfo = Tuple[str, int, int]
+# (filename, is_corrupt) for every file in a chunk. is_corrupt is None if the
+# file must be checked.
+_Chunk = List[Tuple[str, Optional[bool]]]
+
+
+def _split_into_chunks(
+    data_dir: str,
+    filenames: Iterable[str],
+    verify_only: bool,
+    cache: Optional["_CheckImagesCache"],
+    chunk_size: int,
+) -> Iterator[Tuple[_Chunk, List[_FileInfo]]]:
+    """Yields chunks of filenames together with the files which have no
+    valid cache entry and must be checked. Missing files are corrupt."""
+    chunk: _Chunk = []
+    to_check: List[_FileInfo] = []
+    for filename in filenames:
         try:
-            image = Image.open(os.path.join(data_dir, filename))
-            image.load()
-        except (IOError, UnidentifiedImageError):
-            return True
+            stat = os.stat(os.path.join(data_dir, filename))
+        except OSError:
+            chunk.append((filename, True))
         else:
-            return False
+            info = (filename, stat.st_size, stat.st_mtime_ns)
+            is_corrupt = None if cache is None else cache.get(info, verify_only)
+            if is_corrupt is None:
+                to_check.append(info)
+            chunk.append((filename, is_corrupt))
+        if len(chunk) == chunk_size:
+            yield chunk, to_check
+            chunk, to_check = [], []
+    if chunk:
+        yield chunk, to_check
 
-    mapped = concurrent.thread_map(
-        _is_corrupt, filenames, chunksize=min(32, len(filenames))
-    )
-    healthy_images = [f for f, is_corrupt in zip(filenames, mapped) if not is_corrupt]
-    corrupt_images = [f for f, is_corrupt in zip(filenames, mapped) if is_corrupt]
-    return healthy_images, corrupt_images
+
+def _merge_results(
+    chunk: _Chunk,
+    to_check: List[_FileInfo],
+    results: List[bool],
+    cache: Optional["_CheckImagesCache"],
+    verify_only: bool,
+) -> List[Tuple[str, bool]]:
+    """Fills in the results of the checked files and stores them in the
+    cache."""
+    if cache is not None:
+        for info, is_corrupt in zip(to_check, results):
+            cache.put(info, verify_only, is_corrupt)
+        cache.flush()
+    results_iter = iter(results)
+    return [
+        (filename, next(results_iter) if is_corrupt is None else is_corrupt)
+        for filename, is_corrupt in chunk
+    ]
+
+
+def _check_image_files(
+    data_dir: str, files: List[_FileInfo], verify_only: bool
+) -> List[bool]:
+    """Returns for every file whether it is corrupt. Runs in a worker
+    process."""
+    return [
+        _is_corrupt(os.path.join(data_dir, filename), verify_only)
+        for filename, _, _ in files
+    ]
+
+
+def _is_corrupt(path: str, verify_only: bool = False) -> bool:
+    try:
+        with Image.open(path) as image:
+            if verify_only:
+                image.verify()
+            else:
+                image.load()
+    except (IOError, UnidentifiedImageError, SyntaxError, ValueError):
+        return True
+    return False
+
+
+class _CheckImagesCache:
+    """Persistent cache of check_images results.
+
+    The results are appended to a json lines file and flushed after every
+    chunk while the images are checked such that the results of an
+    interrupted run are not lost. Every
+    line is a [filename, size, mtime_ns, verify_only, is_corrupt] list and
+    later lines overwrite earlier ones. A result is only reused if the size
+    and modification time of the file did not change. Results of a full
+    check can be reused for a verify_only check but not the other way around.
+
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._entries: Dict[str, Tuple[int, int, bool, bool]] = {}
+        self._n_lines = 0
+        ends_with_newline = True
+        if os.path.isfile(path):
+            self._load()
+            ends_with_newline = _ends_with_newline(path)
+        self._file = open(path, "a")
+        if not ends_with_newline:
+            # terminate the incomplete last line of an interrupted run such
+            # that it does not corrupt the next entry
+            self._file.write("\n")
+
+    def _load(self) -> None:
+        with open(self.path, "r") as f:
+            for line in f:
+                try:
+                    filename, size, mtime_ns, verify_only, is_corrupt = json.loads(line)
+                except ValueError:
+                    # incomplete last line of an interrupted run
+                    continue
+                self._entries[filename] = (size, mtime_ns, verify_only, is_corrupt)
+                self._n_lines += 1
+
+    def get(self, info: _FileInfo, verify_only: bool) -> Optional[bool]:
+        """Returns the cached result or None if there is no valid entry."""
+        filename, size, mtime_ns = info
+        entry = self._entries.get(filename)
+        if entry is None or entry[0] != size or entry[1] != mtime_ns:
+            return None
+        entry_verify_only, is_corrupt = entry[2], entry[3]
+        if entry_verify_only and not verify_only and not is_corrupt:
+            return None
+        return is_corrupt
+
+    def put(self, info: _FileInfo, verify_only: bool, is_corrupt: bool) -> None:
+        filename, size, mtime_ns = info
+        self._entries[filename] = (size, mtime_ns, verify_only, is_corrupt)
+        self._file.write(
+            json.dumps([filename, size, mtime_ns, verify_only, is_corrupt]) + "\n"
+        )
+        self._n_lines += 1
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+        # Compact the file if most lines are outdated.
+        if self._n_lines > 2 * len(self._entries):
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                for filename, entry in self._entries.items():
+                    f.write(json.dumps([filename, *entry]) + "\n")
+            os.replace(tmp_path, self.path)
+
+
+def _ends_with_newline(path: str) -> bool:
+    """Returns True if the file is empty or ends with a line break."""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() == 0:
+            return True
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
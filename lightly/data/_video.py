@@ -3,12 +3,14 @@
 # Copyright (c) 2020. Lightly AG and its affiliates.
 # All Rights Reserved
 
+import json
 import os
 import threading
 import warnings
 import weakref
+from collections import OrderedDict
 from fractions import Fraction
-from typing import Any, Dict, List, Tuple
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Union
 
 import numpy as np
 import torch
@@ -86,6 +88,60 @@ class UnseekableTimestampError(VideoError):
 # main process.
 
 
+class _TimestampIndex:
+    """Precomputed lookups over the timestamps of a single video.
+
+    Finding the frame index of a timestamp and the next larger timestamp after
+    a frame are both constant time operations after an O(n) setup. The index
+    is read-only and can be shared between VideoLoader instances of the same
+    video.
+
+    Attributes:
+        timestamps:
+            List of frame timestamps of the video.
+
+    """
+
+    def __init__(self, timestamps: List[Any]):
+        self.timestamps = timestamps
+        # Maps every timestamp to the index of its first occurrence, this
+        # mirrors the behavior of list.index for duplicate timestamps.
+        self._positions = {}
+        for index, timestamp in enumerate(timestamps):
+            self._positions.setdefault(timestamp, index)
+
+        # _next_larger[i] is the first timestamp after frame i which is larger
+        # than timestamps[i] or inf if no such timestamp exists. Computed with
+        # a monotonic stack in a single backwards pass.
+        self._next_larger = [float("inf")] * len(timestamps)
+        stack = []
+        for index in range(len(timestamps) - 1, -1, -1):
+            timestamp = timestamps[index]
+            while stack and stack[-1] <= timestamp:
+                stack.pop()
+            if stack:
+                self._next_larger[index] = stack[-1]
+            stack.append(timestamp)
+
+    def index(self, timestamp: Any) -> int:
+        """Returns the index of the first frame with the given timestamp.
+
+        Raises:
+            ValueError:
+                If the timestamp is not in timestamps.
+
+        """
+        try:
+            return self._positions[timestamp]
+        except KeyError:
+            raise ValueError(f"{timestamp} is not in timestamps") from None
+
+    def next_larger(self, index: int) -> Any:
+        """Returns the first timestamp after the frame at index which is larger
+        than the timestamp of the frame or inf if there is none."""
+        return self._next_larger[index]
+
+
 class VideoLoader(threading.local):
     """Implementation of VideoLoader.
 
@@ -113,6 +169,10 @@ class VideoLoader(threading.local):
             Used to check corrupt files
         eps:
             Small value to account for floating point imprecisions.
+        timestamp_index:
+            Optional precomputed _TimestampIndex of the timestamps. Pass it
+            to avoid recomputing the index every time a new VideoLoader is
+            created for the same video.
 
     Examples:
         >>> from torchvision import io
@@ -136,9 +196,11 @@ class VideoLoader(threading.local):
         timestamps: List[float],
         backend: str = "video_reader",
         eps: float = 1e-6,
+        timestamp_index: Optional[_TimestampIndex] = None,
     ):
         self.path = path
         self.timestamps = timestamps
+        self._timestamp_index = timestamp_index
         self.current_index = None
         self.pts_unit = "sec"
         self.backend = backend
@@ -183,14 +245,12 @@ class VideoLoader(threading.local):
             if self.current_index is None:
                 # Beginning of video.
                 index = 0
-                timestamp = self.timestamps[index]
             elif self.current_index >= len(self.timestamps):
                 # Reached end of video.
                 raise StopIteration()
             else:
                 # Read next frame.
                 index = self.current_index + 1
-                timestamp = self.timestamps[index]
         elif (
             self.current_index is not None
             and self.current_index + 1 < len(self.timestamps)
@@ -200,32 +260,100 @@ class VideoLoader(threading.local):
             index = self.current_index + 1
         else:
             # Random timestamp, must find corresponding index.
-            index = self.timestamps.index(timestamp)
+            index = self._get_timestamp_index().index(timestamp)
+
+        frame = self._decode_frame(index)
+
+        # convert to PIL image
+        image = Image.fromarray(frame.numpy())
+        return image
+
+    def read_frames(
+        self, timestamps: List[Any], max_skip_frames: int = 32
+    ) -> torch.Tensor:
+        """Reads the frames at the given timestamps in a single pass.
+
+        The frames are decoded in the order of their timestamps. Frames between
+        two requested frames are decoded and dropped instead of seeking if
+        there are at most max_skip_frames of them. The frames are returned as
+        a single uint8 tensor without converting them to PIL images.
+
+        Args:
+            timestamps:
+                Timestamps of the frames in seconds. Can be unsorted and
+                contain duplicates.
+            max_skip_frames:
+                Maximum number of frames between two requested frames that are
+                decoded instead of seeking to the next requested frame.
+
+        Returns:
+            A uint8 tensor with shape (N, H, W, C) where N is the number of
+            timestamps. The frames are in the same order as the timestamps.
+
+        Raises:
+            ValueError:
+                If a timestamp is not in self.timestamps.
+            VideoError:
+                If a frame could not be loaded.
+
+        Examples:
+            >>> ts, fps = io.read_video_timestamps('myvideo.mp4', pts_unit = 'sec')
+            >>> video_loader = VideoLoader('myvideo.mp4', ts)
+            >>> frames = video_loader.read_frames(ts[10:20])
+            >>> frames.shape
+            >>> > torch.Size([10, 720, 1280, 3])
+
+        """
+        if not self.timestamps:
+            raise EmptyVideoError(f"Cannot load frame from empty video {self.path}.")
+
+        timestamp_index = self._get_timestamp_index()
+        indices = [timestamp_index.index(timestamp) for timestamp in timestamps]
+        if not indices:
+            return torch.empty((0, 0, 0, 0), dtype=torch.uint8)
+
+        frames = {}
+        sorted_indices = sorted(set(indices))
+        if self.reader:
+            for index in sorted_indices:
+                frames[index] = self._decode_frame(
+                    index, max_skip_frames=max_skip_frames
+                )
+        else:
+            # Split the indices into runs that are decoded with a single call
+            # to io.read_video.
+            run = [sorted_indices[0]]
+            for index in sorted_indices[1:]:
+                if index - run[-1] - 1 > max_skip_frames:
+                    frames.update(self._decode_frames_pyav(run))
+                    run = []
+                run.append(index)
+            frames.update(self._decode_frames_pyav(run))
+
+        return torch.stack([frames[index] for index in indices])
+
+    def _decode_frame(self, index: int, max_skip_frames: int = 0) -> torch.Tensor:
+        """Decodes the frame at index and returns it as (H, W, C) tensor.
 
+        If the frame is at most max_skip_frames frames after the current frame
+        the frames in between are decoded and dropped instead of seeking.
+
+        """
+        timestamp = self.timestamps[index]
         if self.reader:
             # Only seek if we cannot just call next(self.reader).
-            if (
-                self.current_index is None
-                and index != 0
-                or self.current_index is not None
-                and index != self.current_index + 1
-            ):
+            if self.current_index is None:
+                skip = index
+            else:
+                skip = index - self.current_index - 1
+            if skip < 0 or skip > max_skip_frames:
                 self.reader.seek(timestamp)
 
             # Find next larger timestamp than the one we seek. Used to verify
             # that we did not seek too far in the video and that the correct
-            # frame is returned.
-            if index + 1 < len(self.timestamps):
-                try:
-                    next_timestamp = next(
-                        ts for ts in self.timestamps[index + 1 :] if ts > timestamp
-                    )
-                except StopIteration:
-                    # All timestamps of future frames are smaller.
-                    next_timestamp = float("inf")
-            else:
-                # Want to load last frame in video.
-                next_timestamp = float("inf")
+            # frame is returned. This is inf if we want to load the last frame
+            # or if all timestamps of future frames are smaller.
+            next_timestamp = self._get_timestamp_index().next_larger(index)
 
             # Load the frame.
             try:
@@ -233,8 +361,9 @@ class VideoLoader(threading.local):
                     frame_info = next(self.reader)
                     if frame_info["pts"] < timestamp - self.eps:
                         # Did not read far enough, let's continue reading more
-                        # frames. This can happen due to decreasing timestamps.
-                        frame_info = next(self.reader)
+                        # frames. This can happen due to decreasing timestamps
+                        # or if we skip frames instead of seeking.
+                        continue
                     elif frame_info["pts"] >= next_timestamp:
                         # Accidentally read too far, let's seek back to the
                         # correct position and exit. This can happen due to
@@ -285,6 +414,30 @@ class VideoLoader(threading.local):
             )
             self.current_index = index
 
+        return self._check_frame_shape(frame)
+
+    def _decode_frames_pyav(self, indices: List[int]) -> Dict[int, torch.Tensor]:
+        """Decodes the frames at the sorted indices with a single call to
+        io.read_video and returns a mapping from index to (H, W, C) tensor."""
+        frames, _, _ = io.read_video(
+            self.path,
+            start_pts=self.timestamps[indices[0]],
+            end_pts=self.timestamps[indices[-1]],
+            pts_unit=self.pts_unit,
+        )
+        if len(frames) != indices[-1] - indices[0] + 1:
+            # The decoded frames do not match the timestamps, for example due
+            # to non-increasing timestamps. Fall back to decoding every frame
+            # separately.
+            return {index: self._decode_frame(index) for index in indices}
+        self.current_index = indices[-1]
+        return {
+            index: self._check_frame_shape(frames[index - indices[0]])
+            for index in indices
+        }
+
+    def _check_frame_shape(self, frame: torch.Tensor) -> torch.Tensor:
+        """Makes sure that the frame is a (H, W, C) tensor."""
         if len(frame.shape) < 3:
             raise FrameShapeError(
                 f"Loaded frame has unexpected shape {frame.shape}. "
@@ -298,10 +451,87 @@ class VideoLoader(threading.local):
         # make sure we return a H x W x C tensor and not (1 x H x W x C)
         if len(frame.shape) == 4:
             frame = frame.squeeze()
+        return frame
 
-        # convert to PIL image
-        image = Image.fromarray(frame.numpy())
-        return image
+    def _get_timestamp_index(self) -> _TimestampIndex:
+        """Returns the timestamp index and builds it on first access."""
+        if self._timestamp_index is None:
+            self._timestamp_index = _TimestampIndex(self.timestamps)
+        return self._timestamp_index
+
+
+class VideoLoaderCacheInfo(NamedTuple):
+    """Statistics of the VideoLoader cache of a VideoDataset.
+
+    Attributes:
+        hits:
+            Number of frames that were read with an already open VideoLoader.
+        misses:
+            Number of frames for which a new VideoLoader had to be created.
+        maxsize:
+            Maximum number of open VideoLoader instances.
+        currsize:
+            Current number of open VideoLoader instances.
+
+    """
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class _VideoLoaderPool:
+    """Least recently used pool of open VideoLoader instances.
+
+    The least recently used VideoLoader is dropped when a new one is added to
+    a full pool. Its video file is closed as soon as the VideoLoader is garbage
+    collected which bounds the number of open video files.
+
+    Attributes:
+        maxsize:
+            Maximum number of open VideoLoader instances.
+
+    """
+
+    def __init__(self, maxsize: int):
+        if maxsize < 1:
+            raise ValueError(f"maxsize must be at least 1 but is {maxsize}.")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._loaders: "OrderedDict[int, VideoLoader]" = OrderedDict()
+
+    def get(
+        self, video_index: int, create_loader: Callable[[int], VideoLoader]
+    ) -> VideoLoader:
+        """Returns the VideoLoader of the video and creates it if necessary."""
+        loader = self._loaders.get(video_index)
+        if loader is not None:
+            self.hits += 1
+            self._loaders.move_to_end(video_index)
+            return loader
+
+        self.misses += 1
+        while len(self._loaders) >= self.maxsize:
+            self._loaders.popitem(last=False)
+        loader = create_loader(video_index)
+        self._loaders[video_index] = loader
+        return loader
+
+    def clear(self) -> None:
+        """Drops all VideoLoader instances and resets the counters."""
+        self._loaders.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def cache_info(self) -> VideoLoaderCacheInfo:
+        return VideoLoaderCacheInfo(
+            hits=self.hits,
+            misses=self.misses,
+            maxsize=self.maxsize,
+            currsize=len(self._loaders),
+        )
 
 
 class _TimestampFpsFromVideosDataset(Dataset):
@@ -318,6 +548,98 @@ class _TimestampFpsFromVideosDataset(Dataset):
         return ts, fps
 
 
+class _VideoIndexCache:
+    """Persistent cache of the timestamps and fps of videos.
+
+    Reading the timestamps of a video requires decoding the whole video which
+    takes a long time for large datasets. The cache stores the timestamps and
+    fps of every video in a json file together with the size and modification
+    time of the video file. An entry is only reused if the size and
+    modification time of the video did not change. Timestamps which are
+    fractions are stored as strings to keep them exact.
+
+    Attributes:
+        path:
+            Path to the json file of the cache.
+        pts_unit:
+            Unit of the timestamps. The cache is discarded if it was created
+            with a different unit.
+
+    """
+
+    _VERSION = 1
+
+    def __init__(self, path: str, pts_unit: str):
+        self.path = path
+        self.pts_unit = pts_unit
+        self._videos: Dict[str, Dict[str, Any]] = {}
+        self._changed = False
+        if os.path.isfile(path):
+            self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r") as f:
+                cache = json.load(f)
+        except (OSError, ValueError) as ex:
+            warnings.warn(f"Could not read video index cache {self.path}: {ex}")
+            return
+        if (
+            cache.get("version") == self._VERSION
+            and cache.get("pts_unit") == self.pts_unit
+        ):
+            self._videos = cache["videos"]
+
+    def get(self, video: str) -> Optional[Tuple[List[Any], Optional[float]]]:
+        """Returns (timestamps, fps) of the video or None if it must be rescanned."""
+        entry = self._videos.get(os.path.abspath(video))
+        if entry is None or entry["stat"] != _video_stat(video):
+            return None
+        return _decode_timestamps(entry["timestamps"]), entry["fps"]
+
+    def set(self, video: str, timestamps: List[Any], fps: Optional[float]):
+        """Adds or updates the timestamps and fps of the video."""
+        self._videos[os.path.abspath(video)] = {
+            "stat": _video_stat(video),
+            "timestamps": _encode_timestamps(timestamps),
+            "fps": fps,
+        }
+        self._changed = True
+
+    def save(self):
+        """Saves the cache if it changed. Entries of deleted videos are removed."""
+        deleted = [video for video in self._videos if not os.path.isfile(video)]
+        for video in deleted:
+            del self._videos[video]
+        if not self._changed and not deleted:
+            return
+        cache = {
+            "version": self._VERSION,
+            "pts_unit": self.pts_unit,
+            "videos": self._videos,
+        }
+        # write to a temporary file first to never leave a corrupt cache behind
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, self.path)
+        self._changed = False
+
+
+def _video_stat(video: str) -> List[int]:
+    """Returns size and modification time of a video used to invalidate the cache."""
+    stat = os.stat(video)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _encode_timestamps(timestamps: List[Any]) -> List[Union[str, float, int]]:
+    return [str(ts) if isinstance(ts, Fraction) else ts for ts in timestamps]
+
+
+def _decode_timestamps(timestamps: List[Union[str, float, int]]) -> List[Any]:
+    return [Fraction(ts) if isinstance(ts, str) else ts for ts in timestamps]
+
+
 def _make_dataset(
     directory,
     extensions=None,
@@ -325,6 +647,7 @@ def _make_dataset(
     pts_unit="sec",
     tqdm_args=None,
     num_workers: int = 0,
+    cache_path: Optional[str] = None,
 ):
     """Returns a list of all video files, timestamps, and offsets.
 
@@ -341,6 +664,10 @@ def _make_dataset(
             arguments to pass to tqdm
         num_workers:
             number of workers to use for multithreading
+        cache_path:
+            Path to a json file in which the timestamps and fps of the videos
+            are cached. Only new or changed videos are scanned if the cache
+            exists. The cache is created or updated afterwards.
 
     Returns:
         A list of video files, timestamps, frame offsets, and fps.
@@ -382,12 +709,20 @@ def _make_dataset(
             path = os.path.join(root, fname)
             video_instances.append(path)
 
+    # reuse the timestamps of unchanged videos from the cache
+    cache = None if cache_path is None else _VideoIndexCache(cache_path, pts_unit)
+    timestamps_fpss = [
+        None if cache is None else cache.get(video) for video in video_instances
+    ]
+    missing_indices = [i for i, ts_fps in enumerate(timestamps_fpss) if ts_fps is None]
+    missing_instances = [video_instances[i] for i in missing_indices]
+
     # define loader to get the timestamps
-    num_workers = min(num_workers, len(video_instances))
-    if len(video_instances) == 1:
+    num_workers = min(num_workers, len(missing_instances))
+    if len(missing_instances) == 1:
         num_workers = 0
     loader = DataLoader(
-        _TimestampFpsFromVideosDataset(video_instances, pts_unit=pts_unit),
+        _TimestampFpsFromVideosDataset(missing_instances, pts_unit=pts_unit),
         num_workers=num_workers,
         batch_size=None,
         shuffle=False,
@@ -397,7 +732,12 @@ def _make_dataset(
     tqdm_args = dict(tqdm_args)
     tqdm_args.setdefault("unit", " video")
     tqdm_args.setdefault("desc", "Counting frames in videos")
-    timestamps_fpss = list(tqdm(loader, **tqdm_args))
+    for i, (ts, fps) in zip(missing_indices, tqdm(loader, **tqdm_args)):
+        timestamps_fpss[i] = (ts, fps)
+        if cache is not None:
+            cache.set(video_instances[i], ts, fps)
+    if cache is not None:
+        cache.save()
     timestamps, fpss = zip(*timestamps_fpss)
 
     # get frame offsets
@@ -456,6 +796,15 @@ class VideoDataset(datasets.VisionDataset):
             If True, a NonIncreasingTimestampError is raised when trying to load
             a frame that has a timestamp lower or equal to the timestamps of
             previous frames in the same video.
+        video_index_cache_path:
+            Path to a json file in which the timestamps of the videos are
+            cached. If set, only new or changed videos are scanned when the
+            dataset is created again.
+        max_open_videos:
+            Maximum number of videos that are kept open per dataloader worker.
+            The least recently used video is closed when the limit is
+            reached. Increase this value if frames of different videos are
+            accessed in an interleaved order, for example with shuffling.
 
     """
 
@@ -469,6 +818,8 @@ class VideoDataset(datasets.VisionDataset):
         exception_on_non_increasing_timestamp=True,
         tqdm_args: Dict[str, Any] = None,
         num_workers: int = 0,
+        video_index_cache_path: Optional[str] = None,
+        max_open_videos: int = 1,
     ):
         super(VideoDataset, self).__init__(
             root, transform=transform, target_transform=target_transform
@@ -480,6 +831,7 @@ class VideoDataset(datasets.VisionDataset):
             is_valid_file,
             tqdm_args=tqdm_args,
             num_workers=num_workers,
+            cache_path=video_index_cache_path,
         )
 
         if len(videos) == 0:
@@ -509,13 +861,19 @@ class VideoDataset(datasets.VisionDataset):
         # e.g. for two videos of length 10 and 20, the offsets will be [0, 10].
         self.offsets = offsets
         self.fps = fps
+        # Array copy of the offsets used for binary search in
+        # _find_video_index.
+        self._offsets_array = np.asarray(offsets, dtype=np.int64)
 
-        # Current VideoLoader instance and the corresponding video index. We
-        # only keep track of the last accessed video as this is a good trade-off
-        # between speed and memory requirements.
-        # See https://github.com/lightly-ai/lightly/pull/702 for details.
-        self._video_loader = None
-        self._video_index = None
+        # Timestamp indices are built lazily per video and are shared by all
+        # VideoLoader instances of the same video.
+        self._timestamp_indices: Dict[int, _TimestampIndex] = {}
+
+        # Pool of the most recently used VideoLoader instances. By default we
+        # only keep track of the last accessed video as this is a good
+        # trade-off between speed and memory requirements for sequential
+        # access. See https://github.com/lightly-ai/lightly/pull/702 for details.
+        self._video_loader_pool = _VideoLoaderPool(maxsize=max_open_videos)
 
         # Keep unique reference of dataloader worker. We need this to avoid
         # accidentaly sharing VideoLoader instances between workers.
@@ -558,6 +916,100 @@ class VideoDataset(datasets.VisionDataset):
             VideoError:
                 If the frame at the given index could not be loaded.
 
+        """
+        i, timestamp_idx = self._find_frame(index)
+
+        # find and return the frame as PIL image
+        frame_timestamp = self.video_timestamps[i][timestamp_idx]
+        video_loader = self._get_video_loader(i)
+        sample = video_loader.read_frame(frame_timestamp)
+
+        target = i
+        if self.transform is not None:
+            sample = self.transform(sample)
+        if self.target_transform is not None:
+            target = self.target_transform(target)
+
+        return sample, target
+
+    def __getitems__(self, indices: List[int]) -> List[Tuple[Any, Any]]:
+        """Returns the items at the given indices.
+
+        Used by torch.utils.data.DataLoader to load a whole batch at once.
+        The frames are grouped by video and the frames of each video are
+        decoded in a single pass with VideoLoader.read_frames. Returns the
+        same items as calling __getitem__ for every index.
+
+        Args:
+            indices:
+                Indices of the samples to retrieve.
+
+        Returns:
+            A list of (sample, target) tuples where target indicates the
+            video index.
+
+        Raises:
+            IndexError:
+                If an index is out of bounds.
+            VideoError:
+                If a frame could not be loaded.
+
+        """
+        items = []
+        for frame, i in zip(*self._read_frames(indices)):
+            sample = Image.fromarray(frame.numpy())
+            target = i
+            if self.transform is not None:
+                sample = self.transform(sample)
+            if self.target_transform is not None:
+                target = self.target_transform(target)
+            items.append((sample, target))
+        return items
+
+    def get_frames(self, indices: List[int]) -> torch.Tensor:
+        """Returns the raw frames at the given indices as a single tensor.
+
+        The frames are decoded in a single pass per video and are not
+        converted to PIL images. No transforms are applied.
+
+        Args:
+            indices:
+                Indices of the frames to retrieve. All frames must have the
+                same size.
+
+        Returns:
+            A uint8 tensor with shape (N, H, W, C) where N is the number of
+            indices.
+
+        Raises:
+            IndexError:
+                If an index is out of bounds.
+            VideoError:
+                If a frame could not be loaded.
+
+        Examples:
+            >>> dataset = VideoDataset('videos/')
+            >>> frames = dataset.get_frames(list(range(16)))
+            >>> frames.shape
+            >>> > torch.Size([16, 720, 1280, 3])
+
+        """
+        frames, _ = self._read_frames(indices)
+        if not frames:
+            return torch.empty((0, 0, 0, 0), dtype=torch.uint8)
+        return torch.stack(frames)
+
+    def _find_frame(self, index: int) -> Tuple[int, int]:
+        """Returns the video index and the frame index in the video of the
+        frame at index.
+
+        Raises:
+            IndexError:
+                If index is out of bounds.
+            NonIncreasingTimestampError:
+                If the frame has a non-increasing timestamp and
+                exception_on_non_increasing_timestamp is True.
+
         """
         if index < 0 or index >= self.__len__():
             raise IndexError(
@@ -568,9 +1020,7 @@ class VideoDataset(datasets.VisionDataset):
         # each sample belongs to a video, to load the sample at index, we need
         # to find the video to which the sample belongs and then read the frame
         # from this video on the disk.
-        i = len(self.offsets) - 1
-        while self.offsets[i] > index:
-            i = i - 1
+        i = self._find_video_index(index)
 
         timestamp_idx = index - self.offsets[i]
 
@@ -585,19 +1035,35 @@ class VideoDataset(datasets.VisionDataset):
                 f"in the wrong frame being returned. Set the VideoDataset.exception_on_non_increasing_timestamp"
                 f"attribute to False to allow unsafe frame loading."
             )
+        return i, timestamp_idx
 
-        # find and return the frame as PIL image
-        frame_timestamp = self.video_timestamps[i][timestamp_idx]
-        video_loader = self._get_video_loader(i)
-        sample = video_loader.read_frame(frame_timestamp)
+    def _read_frames(self, indices: List[int]) -> Tuple[List[torch.Tensor], List[int]]:
+        """Reads the frames at indices grouped by video.
 
-        target = i
-        if self.transform is not None:
-            sample = self.transform(sample)
-        if self.target_transform is not None:
-            target = self.target_transform(target)
+        Returns:
+            A (frames, video_indices) tuple with a (H, W, C) tensor and the
+            index of the video for every index.
 
-        return sample, target
+        """
+        video_frames: Dict[int, List[Tuple[int, int]]] = {}
+        video_indices = []
+        for position, index in enumerate(indices):
+            i, timestamp_idx = self._find_frame(index)
+            video_frames.setdefault(i, []).append((position, timestamp_idx))
+            video_indices.append(i)
+
+        frames = [None] * len(indices)
+        for i, positions_and_frames in video_frames.items():
+            timestamps = [
+                self.video_timestamps[i][timestamp_idx]
+                for _, timestamp_idx in positions_and_frames
+            ]
+            video_loader = self._get_video_loader(i)
+            for (position, _), frame in zip(
+                positions_and_frames, video_loader.read_frames(timestamps)
+            ):
+                frames[position] = frame
+        return frames, video_indices
 
     def __len__(self):
         """Returns the number of samples (frames) in the dataset.
@@ -635,9 +1101,7 @@ class VideoDataset(datasets.VisionDataset):
         # each sample belongs to a video, to load the sample at index, we need
         # to find the video to which the sample belongs and then read the frame
         # from this video on the disk.
-        i = len(self.offsets) - 1
-        while self.offsets[i] > index:
-            i = i - 1
+        i = self._find_video_index(index)
 
         # get filename of the video file
         video = self.videos[i]
@@ -675,6 +1139,16 @@ class VideoDataset(datasets.VisionDataset):
                 )
         return filenames
 
+    def _find_video_index(self, index: int) -> int:
+        """Returns the index of the video containing the frame at index.
+
+        Uses a binary search over the frame offsets. The last video whose
+        offset is smaller or equal to index is returned which skips videos
+        without frames.
+
+        """
+        return int(np.searchsorted(self._offsets_array, index, side="right")) - 1
+
     def _video_frame_count(self, video_index: int) -> int:
         """Returns the number of frames in the video with the given index."""
         if video_index < len(self.offsets) - 1:
@@ -708,6 +1182,22 @@ class VideoDataset(datasets.VisionDataset):
     ) -> str:
         return f"{video_name}-{frame_number:0{zero_padding}}-{video_format}.{extension}"
 
+    def video_loader_cache_info(self) -> VideoLoaderCacheInfo:
+        """Returns hit and miss statistics of the VideoLoader cache.
+
+        The statistics are tracked separately by every dataloader worker and
+        are reset when a new worker accesses the dataset.
+
+        Examples:
+            >>> dataset = VideoDataset('videos/', max_open_videos=8)
+            >>> for i in range(len(dataset)):
+            >>>     dataset[i]
+            >>> dataset.video_loader_cache_info()
+            >>> > VideoLoaderCacheInfo(hits=990, misses=10, maxsize=8, currsize=8)
+
+        """
+        return self._video_loader_pool.cache_info()
+
     def _get_video_loader(self, video_index: int) -> VideoLoader:
         """Returns a video loader unique to the current dataloader worker."""
         worker_info = torch.utils.data.get_worker_info()
@@ -717,18 +1207,23 @@ class VideoDataset(datasets.VisionDataset):
             worker_ref = weakref.ref(worker_info)
             if worker_ref != self._worker_ref:
                 # This worker has never accessed the dataset before, we have to
-                # reset the video loader.
-                self._video_loader = None
-                self._video_index = None
+                # reset the video loaders.
+                self._video_loader_pool.clear()
                 self._worker_ref = worker_ref
 
         with self._video_loader_lock:
-            if video_index != self._video_index:
-                video = self.videos[video_index]
-                timestamps = self.video_timestamps[video_index]
-                self._video_loader = VideoLoader(
-                    video, timestamps, backend=self.backend
-                )
-                self._video_index = video_index
-
-            return self._video_loader
+            return self._video_loader_pool.get(video_index, self._create_video_loader)
+
+    def _create_video_loader(self, video_index: int) -> VideoLoader:
+        video = self.videos[video_index]
+        timestamps = self.video_timestamps[video_index]
+        timestamp_index = self._timestamp_indices.get(video_index)
+        if timestamp_index is None:
+            timestamp_index = _TimestampIndex(timestamps)
+            self._timestamp_indices[video_index] = timestamp_index
+        return VideoLoader(
+            video,
+            timestamps,
+            backend=self.backend,
+            timestamp_index=timestamp_index,
+        )
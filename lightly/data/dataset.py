@@ -7,7 +7,7 @@ import bisect
 import os
 import shutil
 import tempfile
-from typing import Any, Callable, Dict, List, Union
+from typing import Any, Callable, Dict, List, Optional, Union
 
 import torchvision.datasets as datasets
 from PIL import Image
@@ -16,7 +16,16 @@ from torchvision import transforms
 from torchvision.datasets.vision import StandardTransform, VisionDataset
 
 from lightly.data._helpers import DatasetFolder, _load_dataset_from_folder
+from lightly.data._image_loaders import get_image_loader
+from lightly.data._shard import (
+    DEFAULT_MAX_SHARD_SIZE,
+    ShardDataset,
+    _encode_image,
+    _ShardWriter,
+)
 from lightly.data._video import VideoDataset
+from lightly.data.image_cache import DecodedImageCache
+from lightly.transforms.seeded_rng import sample_rng
 from lightly.utils.io import check_filenames
 
 
@@ -33,6 +42,9 @@ def _get_filename_by_index(dataset, index):
     elif isinstance(dataset, VideoDataset):
         # filename is constructed by the video dataset
         return dataset.get_filename(index)
+    elif isinstance(dataset, ShardDataset):
+        # filename is stored in the shard index
+        return dataset.get_filename(index)
     else:
         # dummy to prevent crashes
         return str(index)
@@ -65,6 +77,21 @@ def _save_image(image, output_dir, filename, fmt):
         image.save(target, format="png")
 
 
+def _read_image_bytes(dataset, filename, index, fmt) -> bytes:
+    """Returns the encoded bytes of a single image.
+
+    Will read the file from the input directory if possible. If not (e.g. for
+    VideoDatasets), will load the image and encode it with the specified
+    format.
+
+    """
+    if isinstance(dataset, (datasets.ImageFolder, DatasetFolder)):
+        with open(os.path.join(dataset.root, filename), "rb") as f:
+            return f.read()
+    image, _ = dataset[index]
+    return _encode_image(image, filename, fmt)
+
+
 def _dump_image(dataset, output_dir, filename, index, fmt):
     """Saves a single image to the output directory.
 
@@ -115,6 +142,43 @@ class LightlyDataset:
         filenames:
             If not None, it filters the dataset in the input directory
             by the given filenames.
+        tqdm_args:
+            Arguments passed to tqdm when counting the frames of videos.
+        num_workers_video_frame_counting:
+            Number of workers used to count the frames of videos.
+        video_index_cache_path:
+            Path to a json file in which the frame timestamps of videos are
+            cached. If set, only new or changed videos are scanned when a
+            dataset is created from the same input directory again. Has no
+            effect if the input directory does not contain videos.
+        max_open_videos:
+            Maximum number of videos that are kept open per dataloader worker
+            when reading frames. Has no effect if the input directory does
+            not contain videos.
+        manifest_path:
+            Path to a json file in which the listing of all files in the input
+            directory is stored. If set, the input directory is only listed
+            completely the first time. Later, only directories which changed
+            since then are listed again. Useful for large datasets on slow
+            (network) filesystems. Requires torchvision 0.10 or newer.
+        image_cache:
+            If set, decoded images are loaded from and stored in this cache.
+            Only supported for folders of images.
+        decode_size:
+            If set, JPEG images are decoded at reduced resolution (1/2, 1/4,
+            or 1/8 of the original size) such that their width and height are
+            still at least decode_size pixels. Set it to the largest size that
+            the transform requires, for example the input size of the model,
+            to speed up loading of large images. Only supported for folders of
+            images. If image_cache is set, the cache uses this loader.
+        seed:
+            If set, the random augmentations of every sample are seeded with a
+            seed derived from seed, the current epoch, and the index of the
+            sample. Every view of a MultiViewTransform gets its own seed. Two
+            runs with the same seed then load exactly the same augmented
+            samples, independent of the number of dataloader workers. Call
+            set_epoch at the beginning of every epoch to get different
+            augmentations in every epoch.
 
     Examples:
         >>> # load a dataset consisting of images from a local folder
@@ -148,9 +212,17 @@ class LightlyDataset:
         filenames: List[str] = None,
         tqdm_args: Dict[str, Any] = None,
         num_workers_video_frame_counting: int = 0,
+        video_index_cache_path: Optional[str] = None,
+        max_open_videos: int = 1,
+        manifest_path: Optional[str] = None,
+        image_cache: Optional[DecodedImageCache] = None,
+        decode_size: Optional[int] = None,
+        seed: Optional[int] = None,
     ):
         # can pass input_dir=None to create an "empty" dataset
         self.input_dir = input_dir
+        self.seed = seed
+        self.epoch = 0
         if filenames is not None:
             filepaths = [os.path.join(input_dir, filename) for filename in filenames]
             filepaths = set(filepaths)
@@ -168,12 +240,39 @@ class LightlyDataset:
                 is_valid_file=is_valid_file,
                 tqdm_args=tqdm_args,
                 num_workers_video_frame_counting=num_workers_video_frame_counting,
+                video_index_cache_path=video_index_cache_path,
+                max_open_videos=max_open_videos,
+                manifest_path=manifest_path,
             )
         elif transform is not None:
             raise ValueError(
                 "transform must be None when input_dir is None but is " f"{transform}",
             )
 
+        if decode_size is not None:
+            if input_dir is None or not isinstance(
+                self.dataset, (datasets.ImageFolder, DatasetFolder)
+            ):
+                raise ValueError(
+                    "decode_size is only supported for input directories with "
+                    "images."
+                )
+            loader = get_image_loader(decode_size)
+            if image_cache is not None:
+                image_cache.loader = loader
+            else:
+                self.dataset.loader = loader
+
+        if image_cache is not None:
+            if input_dir is None or not isinstance(
+                self.dataset, (datasets.ImageFolder, DatasetFolder)
+            ):
+                raise ValueError(
+                    "image_cache is only supported for input directories with "
+                    "images."
+                )
+            self.dataset.loader = image_cache
+
         # initialize function to get filename of image
         self.index_to_filename = _get_filename_by_index
         if index_to_filename is not None:
@@ -185,7 +284,9 @@ class LightlyDataset:
             check_filenames(self.get_filenames())
 
     @classmethod
-    def from_torch_dataset(cls, dataset, transform=None, index_to_filename=None):
+    def from_torch_dataset(
+        cls, dataset, transform=None, index_to_filename=None, seed=None
+    ):
         """Builds a LightlyDataset from a PyTorch (or torchvision) dataset.
 
         Args:
@@ -196,6 +297,8 @@ class LightlyDataset:
             index_to_filename:
                 Function which takes the dataset and index as input and returns
                 the filename of the file at the index. If None, uses default.
+            seed:
+                Seed for the augmentations, see LightlyDataset.
 
         Returns:
             A LightlyDataset object.
@@ -212,6 +315,7 @@ class LightlyDataset:
         dataset_obj = cls(
             None,
             index_to_filename=index_to_filename,
+            seed=seed,
         )
 
         # populate it with the torch dataset
@@ -237,10 +341,59 @@ class LightlyDataset:
 
         """
         fname = self.index_to_filename(self.dataset, index)
-        sample, target = self.dataset.__getitem__(index)
+        sample, target = self._get_sample_and_target(index)
 
         return sample, target, fname
 
+    def __getitems__(self, indices: List[int]):
+        """Returns (sample, target, fname) of all items at indices.
+
+        Used by torch.utils.data.DataLoader to load a whole batch at once.
+        Video datasets decode the frames of a batch video by video instead of
+        frame by frame unless the dataset has a seed. All other datasets and
+        subclasses which override __getitem__ load the items one by one with
+        __getitem__.
+
+        Args:
+            indices:
+                Indices of the queried items.
+
+        Returns:
+            A list with the image, target, and filename of every item.
+
+        """
+        if (
+            isinstance(self.dataset, VideoDataset)
+            and self.seed is None
+            and type(self).__getitem__ is LightlyDataset.__getitem__
+        ):
+            samples_and_targets = self.dataset.__getitems__(indices)
+            return [
+                (sample, target, self.index_to_filename(self.dataset, index))
+                for (sample, target), index in zip(samples_and_targets, indices)
+            ]
+        return [self.__getitem__(index) for index in indices]
+
+    def _get_sample_and_target(self, index: int):
+        if self.seed is None:
+            return self.dataset.__getitem__(index)
+        with sample_rng(seed=self.seed, epoch=self.epoch, index=index):
+            return self.dataset.__getitem__(index)
+
+    def set_epoch(self, epoch: int) -> None:
+        """Sets the epoch from which the augmentation seeds are derived.
+
+        Only has an effect if the dataset has a seed. Dataloader workers get a
+        copy of the dataset when they are started. Call set_epoch before
+        iterating over the dataloader and do not use persistent workers.
+
+        Args:
+            epoch:
+                The current epoch.
+
+        """
+        self.epoch = epoch
+
     def __len__(self):
         """Returns the length of the dataset."""
         return len(self.dataset)
@@ -313,6 +466,75 @@ class LightlyDataset:
         for i, filename in zip(indices, filenames):
             _dump_image(self.dataset, output_dir, filename, i, fmt=format)
 
+    def dump_shards(
+        self,
+        output_dir: str,
+        filenames: Union[List[str], None] = None,
+        format: Union[str, None] = None,
+        max_shard_size: int = DEFAULT_MAX_SHARD_SIZE,
+    ):
+        """Packs the images in the dataset into large shard files.
+
+        Reading many small files is slow on network filesystems. This method
+        appends the encoded images to a few large shard files and writes an
+        index with the offset of every image. A LightlyDataset created from
+        the output directory serves the images from the shards with the same
+        filenames and targets as this dataset.
+
+        Images are copied without re-encoding if possible. If not (e.g. for
+        VideoDatasets), they are encoded with the specified format.
+
+        Args:
+            output_dir:
+                Output directory where the shards and the index are stored.
+            filenames:
+                Filenames of the images to store. If None, stores all images.
+            format:
+                Image format. Can be any pillow image format (png, jpg, ...).
+                By default we try to use the same format as the input data. If
+                not possible (e.g. for videos) we encode the image as png to
+                prevent compression artifacts.
+            max_shard_size:
+                Maximum size of a shard file in bytes.
+
+        Examples:
+            >>> dataset = LightlyDataset(input_dir='path/to/images/')
+            >>> dataset.dump_shards('path/to/shards/')
+            >>> shard_dataset = LightlyDataset(input_dir='path/to/shards/')
+
+        """
+        if self.dataset.transform is not None:
+            raise RuntimeError("Cannot dump dataset which applies transforms!")
+
+        all_filenames = self.get_filenames()
+        if filenames is None:
+            indices = range(len(all_filenames))
+        else:
+            filenames = set(filenames)
+            indices = [
+                index
+                for index, filename in enumerate(all_filenames)
+                if filename in filenames
+            ]
+
+        writer = _ShardWriter(output_dir, max_shard_size=max_shard_size)
+        for index in indices:
+            filename = all_filenames[index]
+            data = _read_image_bytes(self.dataset, filename, index, fmt=format)
+            writer.write(data, filename=filename, target=self._get_target(index))
+        writer.close()
+
+    def _get_target(self, index: int) -> int:
+        """Returns the target of the sample at index without loading it if
+        possible."""
+        targets = getattr(self.dataset, "targets", None)
+        if isinstance(self.dataset, VideoDataset):
+            return self.dataset._find_video_index(index)
+        if targets is not None:
+            return int(targets[index])
+        _, target = self.dataset[index]
+        return int(target)
+
     def get_filepath_from_filename(self, filename: str, image: Image = None):
         """Returns the filepath given the filename of the image
 
@@ -0,0 +1,173 @@
+""" Decoded Image Cache """
+
+# Copyright (c) 2023. Lightly AG and its affiliates.
+# All Rights Reserved
+
+import hashlib
+import os
+import tempfile
+from typing import Callable, Optional, Sequence, Union
+
+import numpy as np
+import torchvision.transforms.functional as F
+from PIL import Image
+
+from lightly.data._image_loaders import default_loader
+
+_CACHE_EXTENSION = ".npy"
+
+
+class DecodedImageCache:
+    """Image loader which caches decoded images as uint8 arrays.
+
+    Decoding an image with PIL is often the most expensive step of loading a
+    sample. For datasets which fit on a local disk or in memory, the cache
+    stores every decoded (and optionally resized) image as a numpy array in a
+    cache directory. From the second epoch onwards only the augmentations have
+    to be computed. Use a directory in /dev/shm to keep the cache in shared
+    memory.
+
+    The cache directory is shared by all dataloader workers. Entries are
+    written atomically and the least recently used entries are deleted once
+    the cache grows beyond max_bytes. The budget is enforced approximately:
+    every worker tracks its own writes and rescans the cache directory when
+    its estimate of the cache size exceeds max_bytes.
+
+    An entry is invalidated if the size or modification time of the image
+    file changes.
+
+    Attributes:
+        cache_dir:
+            Directory in which the decoded images are stored.
+        max_bytes:
+            Maximum size of the cache in bytes.
+        size:
+            If not None, images are resized before they are cached. Same as
+            the size argument of torchvision.transforms.Resize.
+        loader:
+            Function that loads the image at a path as PIL image.
+        hits:
+            Number of images which were loaded from the cache by this
+            process.
+        misses:
+            Number of images which were decoded by this process.
+
+    Examples:
+        >>> cache = DecodedImageCache('/dev/shm/lightly_cache', max_bytes=8 << 30)
+        >>> dataset = LightlyDataset('path/to/images/', image_cache=cache)
+
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        max_bytes: int,
+        size: Optional[Union[int, Sequence[int]]] = None,
+        loader: Callable[[str], Image.Image] = default_loader,
+    ):
+        if max_bytes <= 0:
+            raise ValueError(f"max_bytes must be positive but is {max_bytes}.")
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.size = size
+        self.loader = loader
+        self.hits = 0
+        self.misses = 0
+        # Estimated size of the cache directory in bytes. Computed lazily in
+        # every process.
+        self._estimated_bytes: Optional[int] = None
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def __call__(self, path: str) -> Image.Image:
+        """Returns the image at path from the cache or decodes it."""
+        cache_path = self._cache_path(path)
+        try:
+            array = np.load(cache_path)
+        except (FileNotFoundError, ValueError, OSError):
+            # Missing or incomplete entry, for example deleted by another
+            # worker.
+            array = None
+        if array is not None:
+            self.hits += 1
+            # Mark the entry as recently used.
+            _touch(cache_path)
+            return Image.fromarray(array)
+
+        self.misses += 1
+        image = self.loader(path)
+        if self.size is not None:
+            image = F.resize(image, self.size)
+        array = np.asarray(image, dtype=np.uint8)
+        self._store(cache_path, array)
+        return Image.fromarray(array)
+
+    def clear(self) -> None:
+        """Deletes all entries in the cache."""
+        for entry in _scan_cache(self.cache_dir):
+            _remove(entry.path)
+        self._estimated_bytes = 0
+
+    def _cache_path(self, path: str) -> str:
+        stat = os.stat(path)
+        key = f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}|{self.size}"
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, digest + _CACHE_EXTENSION)
+
+    def _store(self, cache_path: str, array: np.ndarray) -> None:
+        if array.nbytes > self.max_bytes:
+            return
+        if self._estimated_bytes is None:
+            self._estimated_bytes = sum(
+                entry.stat().st_size for entry in _scan_cache(self.cache_dir)
+            )
+        # Write to a temporary file first such that other workers never read
+        # an incomplete entry.
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, array)
+        os.replace(tmp_path, cache_path)
+        self._estimated_bytes += os.path.getsize(cache_path)
+        if self._estimated_bytes > self.max_bytes:
+            self._evict()
+
+    def _evict(self) -> None:
+        """Deletes the least recently used entries until the cache is smaller
+        than max_bytes."""
+        entries = []
+        for entry in _scan_cache(self.cache_dir):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            _remove(path)
+            total -= size
+        self._estimated_bytes = total
+
+
+def _scan_cache(cache_dir: str):
+    with os.scandir(cache_dir) as scan_dir:
+        return [
+            entry
+            for entry in scan_dir
+            if entry.is_file() and entry.name.endswith(_CACHE_EXTENSION)
+        ]
+
+
+def _touch(path: str) -> None:
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        pass
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
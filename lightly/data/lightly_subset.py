@@ -42,6 +42,25 @@ class LightlySubset(LightlyDataset):
         sample, target, fname = self.base_dataset.__getitem__(index_baseset)
         return sample, target, fname
 
+    def __getitems__(
+        self, indices_subset: List[int]
+    ) -> List[Tuple[object, object, str]]:
+        """An overwrite for batched indexing.
+
+        Args:
+            indices_subset:
+                The indices of the samples w.r.t. to the subset.
+
+        Returns:
+            A list with the sample, target, and filename of every item.
+
+        """
+        indices_baseset = [
+            self.mapping_subset_index_to_baseset_index[index_subset]
+            for index_subset in indices_subset
+        ]
+        return self.base_dataset.__getitems__(indices_baseset)
+
     def __len__(self) -> int:
         """Overwrites the len(...) function.
 
@@ -2,10 +2,47 @@ from typing import List, Tuple, Union
 from warnings import warn
 
 import torch
+from PIL.Image import Image
 from torch import Tensor
 
+from lightly.transforms.batch_transform import BatchMultiViewTransform
+
 
 class MultiViewCollate:
+    """Collates the views of a batch of images into one tensor per view.
+
+    The output tensor of every view is allocated once and the views are copied
+    directly into it. Views can have a different resolution for every view
+    index, for example the global and local views of DINOTransform or
+    SwaVTransform. Inside a dataloader worker, the output is allocated in
+    shared memory to avoid another copy when the batch is sent to the main
+    process.
+
+    Attributes:
+        pin_memory:
+            If True, the output tensors are allocated in pinned memory which
+            speeds up the transfer to the GPU. Only has an effect if CUDA is
+            available and the collate function is not called in a dataloader
+            worker. Pin memory with the pin_memory argument of the dataloader
+            when using workers.
+
+    Examples:
+        >>> dataloader = torch.utils.data.DataLoader(
+        >>>     dataset,
+        >>>     batch_size=256,
+        >>>     collate_fn=MultiViewCollate(pin_memory=True),
+        >>> )
+
+    """
+
+    def __init__(self, pin_memory: bool = False):
+        if pin_memory and not torch.cuda.is_available():
+            warn(
+                "MultiViewCollate: pin_memory is set to True but CUDA is not available."
+            )
+            pin_memory = False
+        self.pin_memory = pin_memory
+
     def __call__(
         self, batch: List[Tuple[List[Tensor], int, str]]
     ) -> Tuple[List[Tensor], Tensor, List[str]]:
@@ -41,19 +78,89 @@ class MultiViewCollate:
             warn("MultiViewCollate received empty batch.")
             return [], [], []
 
-        views = [[] for _ in range(len(batch[0][0]))]
-        labels = []
-        fnames = []
-        for img, label, fname in batch:
-            for i, view in enumerate(img):
-                views[i].append(view.unsqueeze(0))
-            labels.append(label)
-            fnames.append(fname)
-        for i, view in enumerate(views):
-            views[i] = torch.cat(view)
+        in_worker = torch.utils.data.get_worker_info() is not None
+        views = []
+        for i in range(len(batch[0][0])):
+            view = [img[i] for img, _, _ in batch]
+            out = _allocate(
+                view[0],
+                batch_size=len(batch),
+                shared=in_worker,
+                pin_memory=self.pin_memory and not in_worker,
+            )
+            views.append(torch.stack(view, out=out))
 
         labels = torch.tensor(
-            labels, dtype=torch.long
+            [label for _, label, _ in batch], dtype=torch.long
         )  # Conversion to tensor to ensure backwards compatibility
+        fnames = [fname for _, _, fname in batch]
+        return views, labels, fnames
+
+
+class BatchMultiViewCollate:
+    """Collates a batch of images and transforms it into multiple views.
+
+    Instead of augmenting every image separately in the dataset, the images
+    are augmented together in the collate function with a
+    BatchMultiViewTransform. The dataset must return untransformed images,
+    for example a LightlyDataset without a transform.
+
+    Attributes:
+        transform:
+            Batched transform which creates the views.
+
+    Examples:
+        >>> dataset = LightlyDataset('path/to/images/')
+        >>> collate_fn = BatchMultiViewCollate(SimCLRBatchTransform(input_size=224))
+        >>> dataloader = torch.utils.data.DataLoader(
+        >>>     dataset,
+        >>>     batch_size=256,
+        >>>     collate_fn=collate_fn,
+        >>> )
+
+    """
 
+    def __init__(self, transform: BatchMultiViewTransform):
+        self.transform = transform
+
+    def __call__(
+        self, batch: List[Tuple[Union[Image, Tensor], int, str]]
+    ) -> Tuple[List[Tensor], Tensor, List[str]]:
+        """Turns a batch of tuples into single tuple.
+
+        Args:
+            batch:
+                The input batch. It is a list of (image, label, filename) tuples
+                for each file in the dataset. The images are PIL images or
+                tensors with shape (C, H, W) and can have different sizes.
+
+        Returns:
+            A (views, labels, filenames) tuple. Views is a list of tensors with
+            each tensor containing one view for every image in the batch.
+
+        """
+        if len(batch) == 0:
+            warn("BatchMultiViewCollate received empty batch.")
+            return [], [], []
+
+        views = self.transform.transform_batch([img for img, _, _ in batch])
+        labels = torch.tensor([label for _, label, _ in batch], dtype=torch.long)
+        fnames = [fname for _, _, fname in batch]
         return views, labels, fnames
+
+
+def _allocate(elem: Tensor, batch_size: int, shared: bool, pin_memory: bool) -> Tensor:
+    """Allocates an uninitialized tensor for batch_size tensors like elem."""
+    shape = (batch_size, *elem.shape)
+    if shared:
+        # Same as torch.utils.data.default_collate in a dataloader worker.
+        numel = batch_size * elem.numel()
+        if hasattr(elem, "_typed_storage"):
+            storage = elem._typed_storage()._new_shared(numel, device=elem.device)
+        else:
+            # PyTorch < 2.0
+            storage = elem.storage()._new_shared(numel)
+        return elem.new(storage).resize_(shape)
+    return torch.empty(
+        shape, dtype=elem.dtype, device=elem.device, pin_memory=pin_memory
+    )
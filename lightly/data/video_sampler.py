@@ -0,0 +1,264 @@
+""" Samplers for Sequential Access to Video Datasets """
+
+# Copyright (c) 2023. Lightly AG and its affiliates.
+# All Rights Reserved
+
+from typing import Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+from torch.utils.data import Sampler
+
+from lightly.data._video import VideoDataset
+from lightly.data.dataset import LightlyDataset
+
+
+class VideoSequentialSampler(Sampler):
+    """Sampler which returns the frames of a video dataset in contiguous runs.
+
+    Reading a random frame from a video requires a seek which is much slower
+    than decoding the next frame. This sampler splits every video into chunks
+    of consecutive frames and returns the frames of each chunk in order. With
+    shuffle=True, the order of the chunks is shuffled but the frames within
+    a chunk are still returned sequentially.
+
+    Attributes:
+        dataset:
+            VideoDataset or LightlyDataset of videos to sample from.
+        chunk_size:
+            Number of consecutive frames per chunk. If None, every video
+            forms a single chunk.
+        shuffle:
+            If True, the chunks are returned in random order.
+        seed:
+            Random seed used for shuffling. The order is different for every
+            epoch, see set_epoch.
+
+    Examples:
+        >>> dataset = LightlyDataset(input_dir='videos/')
+        >>> sampler = VideoSequentialSampler(dataset, chunk_size=32, shuffle=True)
+        >>> dataloader = torch.utils.data.DataLoader(
+        >>>     dataset,
+        >>>     batch_size=64,
+        >>>     sampler=sampler,
+        >>> )
+        >>> for epoch in range(epochs):
+        >>>     sampler.set_epoch(epoch)
+        >>>     for batch in dataloader:
+        >>>         ...
+
+    """
+
+    def __init__(
+        self,
+        dataset: Union[VideoDataset, LightlyDataset],
+        chunk_size: Optional[int] = None,
+        shuffle: bool = False,
+        seed: int = 0,
+    ):
+        if chunk_size is not None and chunk_size <= 0:
+            raise ValueError(f"chunk_size must be positive but is {chunk_size}.")
+        self.dataset = dataset
+        self.chunk_size = chunk_size
+        self.shuffle = shuffle
+        self.seed = seed
+        self.epoch = 0
+        self._frame_ranges = _get_video_frame_ranges(dataset)
+
+    def __iter__(self) -> Iterator[int]:
+        chunks = _split_into_chunks(self._frame_ranges, self.chunk_size)
+        if self.shuffle:
+            rng = np.random.default_rng(self.seed + self.epoch)
+            chunks = [chunks[i] for i in rng.permutation(len(chunks))]
+        for start, end in chunks:
+            yield from range(start, end)
+
+    def __len__(self) -> int:
+        return sum(end - start for start, end in self._frame_ranges)
+
+    def set_epoch(self, epoch: int) -> None:
+        """Sets the epoch used to shuffle the chunks."""
+        self.epoch = epoch
+
+
+class VideoBatchSampler(Sampler):
+    """Batch sampler which keeps every video in a single dataloader worker.
+
+    Every video is assigned to one of num_workers dataloader workers such that
+    all workers get a similar number of frames. The frames of each worker are
+    split into contiguous chunks as in VideoSequentialSampler and batched.
+    The batches of the workers are interleaved in round robin order which is
+    the order in which torch.utils.data.DataLoader distributes batches to its
+    workers. As a result, a video is only decoded by a single worker and the
+    worker can read most frames sequentially from its cached VideoLoader.
+
+    Note that the assignment is best effort: Once a worker runs out of batches
+    the remaining batches of the other workers are distributed to all workers.
+
+    Attributes:
+        dataset:
+            VideoDataset or LightlyDataset of videos to sample from.
+        batch_size:
+            Number of frames per batch.
+        num_workers:
+            Number of workers of the dataloader. Must be the same value as
+            passed to the dataloader.
+        chunk_size:
+            Number of consecutive frames per chunk. If None, every video
+            forms a single chunk.
+        shuffle:
+            If True, the chunks of every worker are returned in random order.
+        drop_last:
+            If True, the last incomplete batch of every worker is dropped.
+        seed:
+            Random seed used for shuffling. The order is different for every
+            epoch, see set_epoch.
+
+    Examples:
+        >>> dataset = LightlyDataset(input_dir='videos/')
+        >>> batch_sampler = VideoBatchSampler(
+        >>>     dataset,
+        >>>     batch_size=64,
+        >>>     num_workers=4,
+        >>>     chunk_size=32,
+        >>>     shuffle=True,
+        >>> )
+        >>> dataloader = torch.utils.data.DataLoader(
+        >>>     dataset,
+        >>>     batch_sampler=batch_sampler,
+        >>>     num_workers=4,
+        >>> )
+
+    """
+
+    def __init__(
+        self,
+        dataset: Union[VideoDataset, LightlyDataset],
+        batch_size: int,
+        num_workers: int = 0,
+        chunk_size: Optional[int] = None,
+        shuffle: bool = False,
+        drop_last: bool = False,
+        seed: int = 0,
+    ):
+        if batch_size <= 0:
+            raise ValueError(f"batch_size must be positive but is {batch_size}.")
+        if num_workers < 0:
+            raise ValueError(f"num_workers must be non-negative but is {num_workers}.")
+        if chunk_size is not None and chunk_size <= 0:
+            raise ValueError(f"chunk_size must be positive but is {chunk_size}.")
+        self.dataset = dataset
+        self.batch_size = batch_size
+        self.num_workers = num_workers
+        self.chunk_size = chunk_size
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+        self.seed = seed
+        self.epoch = 0
+        self._worker_frame_ranges = _assign_videos_to_workers(
+            _get_video_frame_ranges(dataset), max(num_workers, 1)
+        )
+
+    def __iter__(self) -> Iterator[List[int]]:
+        rng = np.random.default_rng(self.seed + self.epoch)
+        worker_batches = []
+        for frame_ranges in self._worker_frame_ranges:
+            chunks = _split_into_chunks(frame_ranges, self.chunk_size)
+            if self.shuffle:
+                chunks = [chunks[i] for i in rng.permutation(len(chunks))]
+            worker_batches.append(self._batches(chunks))
+
+        # Interleave the batches of the workers in round robin order.
+        active = list(worker_batches)
+        while active:
+            remaining = []
+            for batches in active:
+                batch = next(batches, None)
+                if batch is not None:
+                    yield batch
+                    remaining.append(batches)
+            active = remaining
+
+    def __len__(self) -> int:
+        n_batches = 0
+        for frame_ranges in self._worker_frame_ranges:
+            n_frames = sum(end - start for start, end in frame_ranges)
+            if self.drop_last:
+                n_batches += n_frames // self.batch_size
+            else:
+                n_batches += (n_frames + self.batch_size - 1) // self.batch_size
+        return n_batches
+
+    def set_epoch(self, epoch: int) -> None:
+        """Sets the epoch used to shuffle the chunks."""
+        self.epoch = epoch
+
+    def _batches(self, chunks: List[Tuple[int, int]]) -> Iterator[List[int]]:
+        """Concatenates the chunks and splits them into batches."""
+        batch = []
+        for start, end in chunks:
+            for index in range(start, end):
+                batch.append(index)
+                if len(batch) == self.batch_size:
+                    yield batch
+                    batch = []
+        if batch and not self.drop_last:
+            yield batch
+
+
+def _get_video_frame_ranges(
+    dataset: Union[VideoDataset, LightlyDataset]
+) -> List[Tuple[int, int]]:
+    """Returns a (start, end) index range for every video in the dataset."""
+    video_dataset = dataset.dataset if isinstance(dataset, LightlyDataset) else dataset
+    if not isinstance(video_dataset, VideoDataset):
+        raise ValueError(
+            f"Video samplers require a VideoDataset or a LightlyDataset of "
+            f"videos but got {type(video_dataset)}."
+        )
+    frame_ranges = []
+    for video_index, offset in enumerate(video_dataset.offsets):
+        n_frames = video_dataset._video_frame_count(video_index)
+        frame_ranges.append((int(offset), int(offset + n_frames)))
+    return frame_ranges
+
+
+def _split_into_chunks(
+    frame_ranges: List[Tuple[int, int]], chunk_size: Optional[int]
+) -> List[Tuple[int, int]]:
+    """Splits the frame ranges into ranges of at most chunk_size frames."""
+    if chunk_size is None:
+        return [(start, end) for start, end in frame_ranges if end > start]
+    return [
+        (chunk_start, min(chunk_start + chunk_size, end))
+        for start, end in frame_ranges
+        for chunk_start in range(start, end, chunk_size)
+    ]
+
+
+def _assign_videos_to_workers(
+    frame_ranges: List[Tuple[int, int]], num_workers: int
+) -> List[List[Tuple[int, int]]]:
+    """Assigns every video to a worker such that the workers have a similar
+    number of frames.
+
+    Videos are assigned greedily from longest to shortest to the worker with
+    the fewest frames. The assignment is deterministic and the videos of each
+    worker are kept in dataset order.
+
+    """
+    order = sorted(
+        range(len(frame_ranges)),
+        key=lambda i: frame_ranges[i][1] - frame_ranges[i][0],
+        reverse=True,
+    )
+    worker_frames = [0] * num_workers
+    worker_videos = [[] for _ in range(num_workers)]
+    for video_index in order:
+        worker = int(np.argmin(worker_frames))
+        start, end = frame_ranges[video_index]
+        worker_frames[worker] += end - start
+        worker_videos[worker].append(video_index)
+    return [
+        [frame_ranges[i] for i in sorted(video_indices)]
+        for video_indices in worker_videos
+    ]
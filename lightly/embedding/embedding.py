@@ -3,8 +3,11 @@
 # Copyright (c) 2020. Lightly AG and its affiliates.
 # All Rights Reserved
 
+import hashlib
+import os
 import time
-from typing import List, Tuple, Union
+import warnings
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 
 import numpy as np
 import torch
@@ -12,7 +15,13 @@ from tqdm import tqdm
 
 import lightly
 from lightly.embedding._base import BaseEmbedding
-from lightly.utils.reordering import sort_items_by_keys
+from lightly.utils.io import (
+    BINARY_EMBEDDINGS_EXTENSION,
+    _get_binary_embeddings_sidecar_path,
+    _save_filenames_and_labels,
+    is_binary_embeddings_path,
+)
+from lightly.utils.reordering import get_sort_indices
 
 if lightly._is_prefetch_generator_available():
     from prefetch_generator import BackgroundGenerator
@@ -73,22 +82,64 @@ class SelfSupervisedEmbedding(BaseEmbedding):
         )
 
     def embed(
-        self, dataloader: torch.utils.data.DataLoader, device: torch.device = None
+        self,
+        dataloader: torch.utils.data.DataLoader,
+        device: torch.device = None,
+        embeddings_path: Optional[str] = None,
+        checkpoint_every_n_batches: int = 100,
+        inference_mode: bool = False,
+        precision: Union[int, str] = 32,
+        channels_last: bool = False,
+        compile_model: bool = False,
     ) -> Tuple[np.ndarray, List[int], List[str]]:
         """Embeds images in a vector space.
 
+        If embeddings_path is set, the embeddings are streamed to disk instead
+        of being accumulated in memory. Every batch is written to a memory-mapped
+        float32 array at the position of its samples in the dataset. Progress is
+        checkpointed every checkpoint_every_n_batches batches and a crashed or
+        interrupted run continues with the samples which have not been embedded
+        yet when embed is called again with the same embeddings_path. On success,
+        the embeddings are stored in the binary format of lightly.utils.io and
+        can be loaded with lightly.utils.io.load_embeddings.
+
+        The remaining arguments speed up inference, especially on CPU-only
+        machines. They do not change the model weights, but embeddings computed
+        with reduced precision differ slightly from full precision ones.
+
         Args:
             dataloader:
                 A PyTorch dataloader.
             device:
                 Selected device (`cpu`, `cuda`, see PyTorch documentation)
+            embeddings_path:
+                Path to a .npy file to which the embeddings are streamed. If
+                None, the embeddings are kept in memory.
+            checkpoint_every_n_batches:
+                Number of batches after which the progress is saved. Only used
+                if embeddings_path is set.
+            inference_mode:
+                If True, torch.inference_mode is used instead of torch.no_grad.
+            precision:
+                Precision of the forward pass. Must be one of 32, 16, or "bf16".
+                With 16 or "bf16", the backbone runs under torch.autocast with
+                float16 or bfloat16, respectively. Use "bf16" on CPU. The
+                embeddings are always converted back to float32.
+            channels_last:
+                If True, the backbone and images are converted to the
+                channels-last memory format. Note that this converts the
+                parameters of the backbone in-place.
+            compile_model:
+                If True, the backbone is compiled with torch.compile. Requires
+                PyTorch 2.0 or newer.
 
         Returns:
             Tuple of (embeddings, labels, filenames) ordered by the
             samples in the dataset of the dataloader.
                 embeddings:
                     Embedding of shape (n_samples, embedding_feature_size).
-                    One embedding for each sample.
+                    One embedding for each sample. Memory-mapped from
+                    embeddings_path if it is set.
                 labels:
                     Labels of shape (n_samples, ).
                 filenames:
@@ -98,40 +149,104 @@ class SelfSupervisedEmbedding(BaseEmbedding):
         Examples:
             >>> # embed images in vector space
             >>> embeddings, labels, fnames = encoder.embed(dataloader)
+            >>>
+            >>> # stream embeddings to disk, rerun to resume after a crash
+            >>> embeddings, labels, fnames = encoder.embed(
+            >>>     dataloader, embeddings_path='embeddings.npy')
+            >>>
+            >>> # fast inference on CPU with bfloat16 and channels-last
+            >>> embeddings, labels, fnames = encoder.embed(
+            >>>     dataloader,
+            >>>     inference_mode=True,
+            >>>     precision='bf16',
+            >>>     channels_last=True,
+            >>> )
 
         """
-
         self.model.eval()
-        embeddings, labels, filenames = None, None, []
+        embed_batch = _BatchEmbedder(
+            backbone=self.model.backbone,
+            device=device,
+            inference_mode=inference_mode,
+            precision=precision,
+            channels_last=channels_last,
+            compile_model=compile_model,
+        )
+
+        if embeddings_path is not None:
+            return self._embed_to_file(
+                dataloader=dataloader,
+                embed_batch=embed_batch,
+                embeddings_path=embeddings_path,
+                checkpoint_every_n_batches=checkpoint_every_n_batches,
+            )
 
         dataset = dataloader.dataset
+
+        embeddings = []
+        labels = []
+        filenames = []
+        for embedding_batch, label_batch, filename_batch in self._embed_batches(
+            dataloader=dataloader, embed_batch=embed_batch, n_samples=len(dataset)
+        ):
+            embeddings.append(embedding_batch)
+            labels.append(label_batch)
+            filenames += [*filename_batch]
+
+        with torch.no_grad():
+            embeddings = torch.cat(embeddings, 0)
+            labels = torch.cat(labels, 0)
+
+            embeddings = embeddings.cpu().numpy()
+            labels = labels.cpu().numpy()
+
+        sorted_filenames = dataset.get_filenames()
+        # compute the permutation once and apply it to embeddings and labels
+        sort_indices = get_sort_indices(filenames, sorted_filenames)
+        embeddings = embeddings[sort_indices]
+        labels = labels[sort_indices].tolist()
+
+        return embeddings, labels, sorted_filenames
+
+    def _embed_batches(
+        self,
+        dataloader: torch.utils.data.DataLoader,
+        embed_batch: "_BatchEmbedder",
+        n_samples: int,
+        n_done: int = 0,
+    ) -> Iterator[Tuple[torch.Tensor, torch.Tensor, List[str]]]:
+        """Yields embeddings, labels, and filenames for every batch of the dataloader.
+
+        The progress bar starts at n_done if the embedding is resumed.
+
+        """
         if lightly._is_prefetch_generator_available():
             dataloader = BackgroundGenerator(dataloader, max_prefetch=3)
 
-        pbar = tqdm(total=len(dataset), unit="imgs")
+        pbar = tqdm(
+            total=n_samples,
+            initial=n_done,
+            unit="imgs",
+            desc=f"Resuming from {n_done}/{n_samples} samples" if n_done > 0 else None,
+        )
 
         efficiency = 0.0
-        embeddings = []
-        labels = []
-        with torch.no_grad():
+        with embed_batch.grad_context():
             start_timepoint = time.time()
             for image_batch, label_batch, filename_batch in dataloader:
                 batch_size = image_batch.shape[0]
 
                 # the following 2 lines are needed to prevent a file handler leak,
                 # see https://github.com/lightly-ai/lightly/pull/676
-                image_batch = image_batch.to(device)
+                image_batch = embed_batch.to_device(image_batch)
                 label_batch = label_batch.clone()
 
-                filenames += [*filename_batch]
-
                 prepared_timepoint = time.time()
 
-                embedding_batch = self.model.backbone(image_batch)
+                embedding_batch = embed_batch(image_batch)
                 embedding_batch = embedding_batch.detach().reshape(batch_size, -1)
 
-                embeddings.append(embedding_batch)
-                labels.append(label_batch)
+                yield embedding_batch, label_batch, filename_batch
 
                 finished_timepoint = time.time()
 
@@ -145,16 +260,356 @@ class SelfSupervisedEmbedding(BaseEmbedding):
 
                 pbar.update(batch_size)
 
-            embeddings = torch.cat(embeddings, 0)
-            labels = torch.cat(labels, 0)
-
-            embeddings = embeddings.cpu().numpy()
-            labels = labels.cpu().numpy()
+    def _embed_to_file(
+        self,
+        dataloader: torch.utils.data.DataLoader,
+        embed_batch: "_BatchEmbedder",
+        embeddings_path: str,
+        checkpoint_every_n_batches: int,
+    ) -> Tuple[np.ndarray, List[int], List[str]]:
+        """Streams the embeddings to a memory-mapped file. See embed()."""
+        if not is_binary_embeddings_path(embeddings_path):
+            raise ValueError(
+                f"embeddings_path must end with {BINARY_EMBEDDINGS_EXTENSION} "
+                f"but is {embeddings_path}."
+            )
+        if checkpoint_every_n_batches <= 0:
+            raise ValueError(
+                f"checkpoint_every_n_batches must be positive but is "
+                f"{checkpoint_every_n_batches}."
+            )
 
+        dataset = dataloader.dataset
         sorted_filenames = dataset.get_filenames()
-        sorted_embeddings = sort_items_by_keys(filenames, embeddings, sorted_filenames)
-        sorted_labels = sort_items_by_keys(filenames, labels, sorted_filenames)
-        embeddings = np.stack(sorted_embeddings)
-        labels = np.stack(sorted_labels).tolist()
+        filename_to_index = {
+            filename: index for index, filename in enumerate(sorted_filenames)
+        }
+        progress = _EmbeddingProgress(
+            embeddings_path=embeddings_path, filenames=sorted_filenames
+        )
 
-        return embeddings, labels, sorted_filenames
+        try:
+            self._embed_remaining_to_file(
+                dataloader=dataloader,
+                embed_batch=embed_batch,
+                progress=progress,
+                filename_to_index=filename_to_index,
+                checkpoint_every_n_batches=checkpoint_every_n_batches,
+            )
+        except _StaleEmbeddingProgressError as error:
+            warnings.warn(f"{error} Embedding all samples again.")
+            progress.discard()
+            self._embed_remaining_to_file(
+                dataloader=dataloader,
+                embed_batch=embed_batch,
+                progress=progress,
+                filename_to_index=filename_to_index,
+                checkpoint_every_n_batches=checkpoint_every_n_batches,
+            )
+
+        progress.checkpoint()
+        if progress.n_done != len(sorted_filenames):
+            raise RuntimeError(
+                f"Only {progress.n_done}/{len(sorted_filenames)} samples were "
+                f"embedded. The dataloader must load every sample of the dataset."
+            )
+        return progress.finish(filenames=sorted_filenames)
+
+    def _embed_remaining_to_file(
+        self,
+        dataloader: torch.utils.data.DataLoader,
+        embed_batch: "_BatchEmbedder",
+        progress: "_EmbeddingProgress",
+        filename_to_index: Dict[str, int],
+        checkpoint_every_n_batches: int,
+    ) -> None:
+        """Embeds the samples which are not done yet and writes them to progress."""
+        n_samples = len(progress.done)
+        n_done = progress.n_done
+        if n_done > 0:
+            remaining_indices = np.flatnonzero(~progress.done).tolist()
+            dataloader = _get_subset_dataloader(
+                dataloader=dataloader, indices=remaining_indices
+            )
+
+        for batch_index, (embedding_batch, label_batch, filename_batch) in enumerate(
+            self._embed_batches(
+                dataloader=dataloader,
+                embed_batch=embed_batch,
+                n_samples=n_samples,
+                n_done=n_done,
+            )
+        ):
+            indices = np.array(
+                [filename_to_index[filename] for filename in filename_batch],
+                dtype=np.int64,
+            )
+            progress.write(
+                indices=indices,
+                embeddings=embedding_batch.cpu().numpy(),
+                labels=label_batch.cpu().numpy(),
+            )
+            if (batch_index + 1) % checkpoint_every_n_batches == 0:
+                progress.checkpoint()
+
+
+def _get_subset_dataloader(
+    dataloader: torch.utils.data.DataLoader, indices: List[int]
+) -> torch.utils.data.DataLoader:
+    """Returns a dataloader over a subset of the dataset of dataloader.
+
+    The settings of dataloader are kept except for the sampler and drop_last
+    because every sample of the subset must be loaded.
+
+    """
+    kwargs = {}
+    if hasattr(dataloader, "pin_memory_device"):
+        # added in PyTorch 1.13
+        kwargs["pin_memory_device"] = dataloader.pin_memory_device
+    return torch.utils.data.DataLoader(
+        torch.utils.data.Subset(dataloader.dataset, indices),
+        batch_size=dataloader.batch_size,
+        num_workers=dataloader.num_workers,
+        collate_fn=dataloader.collate_fn,
+        pin_memory=dataloader.pin_memory,
+        timeout=dataloader.timeout,
+        worker_init_fn=dataloader.worker_init_fn,
+        multiprocessing_context=dataloader.multiprocessing_context,
+        generator=dataloader.generator,
+        prefetch_factor=dataloader.prefetch_factor,
+        persistent_workers=dataloader.persistent_workers,
+        **kwargs,
+    )
+
+
+class _BatchEmbedder:
+    """Runs the backbone on image batches with the configured inference settings.
+
+    See SelfSupervisedEmbedding.embed for a description of the arguments.
+
+    """
+
+    def __init__(
+        self,
+        backbone: torch.nn.Module,
+        device: Optional[torch.device],
+        inference_mode: bool = False,
+        precision: Union[int, str] = 32,
+        channels_last: bool = False,
+        compile_model: bool = False,
+    ):
+        if str(precision) not in _AUTOCAST_DTYPES:
+            raise ValueError(
+                f"precision must be one of 32, 16, or 'bf16' but is {precision}."
+            )
+        self.device = device
+        self.inference_mode = inference_mode
+        self.autocast_dtype = _AUTOCAST_DTYPES[str(precision)]
+        self.channels_last = channels_last
+
+        if channels_last:
+            backbone = backbone.to(memory_format=torch.channels_last)
+        if compile_model:
+            if not hasattr(torch, "compile"):
+                raise ValueError("compile_model requires PyTorch 2.0 or newer.")
+            backbone = torch.compile(backbone)
+        self.backbone = backbone
+
+    def grad_context(self):
+        if self.inference_mode:
+            return torch.inference_mode()
+        return torch.no_grad()
+
+    def to_device(self, image_batch: torch.Tensor) -> torch.Tensor:
+        if self.channels_last and image_batch.dim() == 4:
+            return image_batch.to(self.device, memory_format=torch.channels_last)
+        return image_batch.to(self.device)
+
+    def __call__(self, image_batch: torch.Tensor) -> torch.Tensor:
+        if self.autocast_dtype is None:
+            return self.backbone(image_batch)
+        with torch.autocast(
+            device_type=image_batch.device.type, dtype=self.autocast_dtype
+        ):
+            embedding_batch = self.backbone(image_batch)
+        return embedding_batch.float()
+
+
+# maps the supported values of the precision argument of embed to autocast dtypes
+_AUTOCAST_DTYPES = {
+    "32": None,
+    "16": torch.float16,
+    "bf16": torch.bfloat16,
+}
+
+
+class _EmbeddingProgress:
+    """Keeps track of embeddings which are streamed to a memory-mapped file.
+
+    The embeddings and labels are written to memory-mapped arrays indexed by
+    dataset position. The boolean mask of embedded samples is kept in memory
+    and only saved to disk in checkpoint() after the arrays have been flushed.
+    Thus, a saved mask never marks samples as done whose embeddings were not
+    persisted yet. A hash of the sorted filenames is saved when a run starts
+    and a run is only resumed if the filenames of the dataset are unchanged.
+    Progress files which cannot be loaded or whose embeddings have a different
+    shape are discarded with a warning and all samples are embedded again.
+
+    Attributes:
+        embeddings_path:
+            Path to the .npy file with the embeddings.
+        n_samples:
+            Number of samples in the dataset.
+        done:
+            Boolean mask of the samples which have been embedded.
+
+    """
+
+    def __init__(self, embeddings_path: str, filenames: List[str]):
+        self.embeddings_path = embeddings_path
+        self.n_samples = len(filenames)
+        self.labels_path = embeddings_path + ".labels.partial"
+        self.done_path = embeddings_path + ".done.partial"
+        self.filenames_hash_path = embeddings_path + ".filenames.partial"
+        self.embeddings: Optional[np.ndarray] = None
+        self.labels: Optional[np.ndarray] = None
+        self.done = np.zeros(self.n_samples, dtype=bool)
+        filenames_hash = _hash_filenames(filenames)
+
+        if os.path.isfile(self.done_path):
+            done = np.load(self.done_path)
+            if len(done) != self.n_samples:
+                raise RuntimeError(
+                    f"Cannot resume embedding from {embeddings_path} because it "
+                    f"was created for {len(done)} samples but the dataset has "
+                    f"{self.n_samples} samples."
+                )
+            saved_filenames_hash = None
+            if os.path.isfile(self.filenames_hash_path):
+                with open(self.filenames_hash_path, "r") as f:
+                    saved_filenames_hash = f.read()
+            if saved_filenames_hash != filenames_hash:
+                raise RuntimeError(
+                    f"Cannot resume embedding from {embeddings_path} because it "
+                    f"was created for different filenames than the ones of the "
+                    f"dataset. Delete {self.done_path} to start over."
+                )
+            try:
+                self._load(done)
+            except _StaleEmbeddingProgressError as error:
+                warnings.warn(f"{error} Embedding all samples again.")
+                self.discard()
+        else:
+            with open(self.filenames_hash_path, "w") as f:
+                f.write(filenames_hash)
+
+    def _load(self, done: np.ndarray) -> None:
+        """Loads the memory-mapped arrays of a previous run."""
+        try:
+            embeddings = np.load(self.embeddings_path, mmap_mode="r+")
+            labels = np.load(self.labels_path, mmap_mode="r+")
+        except (OSError, ValueError) as error:
+            raise _StaleEmbeddingProgressError(
+                f"Cannot resume embedding from {self.embeddings_path} because "
+                f"its files cannot be loaded: {error}."
+            )
+        if (
+            embeddings.ndim != 2
+            or embeddings.shape[0] != self.n_samples
+            or embeddings.dtype != np.float32
+            or labels.shape != (self.n_samples,)
+        ):
+            raise _StaleEmbeddingProgressError(
+                f"Cannot resume embedding from {self.embeddings_path} because "
+                f"its embeddings have shape {embeddings.shape} and its labels "
+                f"have shape {labels.shape} but the dataset has "
+                f"{self.n_samples} samples."
+            )
+        self.done = done
+        self.embeddings = embeddings
+        self.labels = labels
+
+    def discard(self) -> None:
+        """Removes the embeddings and the progress of a previous run."""
+        self.embeddings = None
+        self.labels = None
+        self.done = np.zeros(self.n_samples, dtype=bool)
+        for path in [self.embeddings_path, self.labels_path, self.done_path]:
+            if os.path.isfile(path):
+                os.remove(path)
+
+    @property
+    def n_done(self) -> int:
+        return int(self.done.sum())
+
+    def write(self, indices: np.ndarray, embeddings: np.ndarray, labels: np.ndarray):
+        """Writes a batch of embeddings and labels to their dataset positions."""
+        if self.embeddings is not None and self.embeddings.shape[1:] != (
+            embeddings.shape[1:]
+        ):
+            raise _StaleEmbeddingProgressError(
+                f"Cannot resume embedding from {self.embeddings_path} because "
+                f"its embeddings have shape {self.embeddings.shape} but the "
+                f"model computes embeddings with shape {embeddings.shape[1:]}."
+            )
+        if self.embeddings is None:
+            # the embedding dimension is only known after the first batch
+            self.embeddings = np.lib.format.open_memmap(
+                self.embeddings_path,
+                mode="w+",
+                dtype=np.float32,
+                shape=(self.n_samples, embeddings.shape[1]),
+            )
+            self.labels = np.lib.format.open_memmap(
+                self.labels_path,
+                mode="w+",
+                dtype=np.int64,
+                shape=(self.n_samples,),
+            )
+        self.embeddings[indices] = embeddings
+        self.labels[indices] = labels
+        self.done[indices] = True
+
+    def checkpoint(self):
+        """Persists the embeddings and the mask of embedded samples."""
+        if self.embeddings is None:
+            return
+        self.embeddings.flush()
+        self.labels.flush()
+        # write the mask atomically to never leave a corrupt file behind
+        tmp_done_path = self.done_path + ".tmp"
+        with open(tmp_done_path, "wb") as f:
+            np.save(f, self.done)
+        os.replace(tmp_done_path, self.done_path)
+
+    def finish(self, filenames: List[str]) -> Tuple[np.ndarray, List[int], List[str]]:
+        """Saves the filenames and labels and removes the progress files."""
+        if self.embeddings is None:
+            raise RuntimeError("Cannot embed an empty dataset.")
+        labels = self.labels.tolist()
+        _save_filenames_and_labels(
+            _get_binary_embeddings_sidecar_path(self.embeddings_path),
+            filenames,
+            labels,
+        )
+        embeddings = self.embeddings
+        self.labels = None
+        os.remove(self.labels_path)
+        os.remove(self.done_path)
+        os.remove(self.filenames_hash_path)
+        return embeddings, labels, filenames
+
+
+class _StaleEmbeddingProgressError(RuntimeError):
+    """Raised if the files of a previous run cannot be used to resume."""
+
+
+def _hash_filenames(filenames: List[str]) -> str:
+    """Returns the hex digest of the SHA-256 hash of a list of filenames."""
+    sha256 = hashlib.sha256()
+    for filename in filenames:
+        # encode the length to make the hash unambiguous
+        encoded = filename.encode("utf-8")
+        sha256.update(len(encoded).to_bytes(8, "little"))
+        sha256.update(encoded)
+    return sha256.hexdigest()
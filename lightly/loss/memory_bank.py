@@ -4,8 +4,13 @@
 # All Rights Reserved
 
 import functools
+import weakref
+from typing import List, Optional
 
 import torch
+from torch import Tensor
+
+from lightly.utils import dist
 
 
 class MemoryBankModule(torch.nn.Module):
@@ -15,10 +20,22 @@ class MemoryBankModule(torch.nn.Module):
     Python package. This way, any loss can be used with a memory bank if
     desired.
 
+    The bank returned by forward is a read-only view instead of a copy.
+    Updates are applied when the bank is accessed the next time and never
+    modify a returned bank: if a returned bank might still be in use, for
+    example because it was saved for the backward pass, the update is applied
+    to a copy. In a regular training loop the backward pass of the previous
+    step has finished by then and the bank is updated in place.
+
     Attributes:
         size:
             Number of keys the memory bank can store. If set to 0,
             memory bank is not used.
+        gather_distributed:
+            If True then the outputs of all processes are gathered once per
+            update and added to the memory bank such that the memory bank is
+            the same on all processes. Otherwise, every process only adds its
+            own outputs.
 
     Examples:
         >>> class MyLossFunction(MemoryBankModule):
@@ -39,7 +56,7 @@ class MemoryBankModule(torch.nn.Module):
 
     """
 
-    def __init__(self, size: int = 2**16):
+    def __init__(self, size: int = 2**16, gather_distributed: bool = False):
         super(MemoryBankModule, self).__init__()
 
         if size < 0:
@@ -47,12 +64,36 @@ class MemoryBankModule(torch.nn.Module):
             raise ValueError(msg)
 
         self.size = size
+        # not stored as gather_distributed because subclasses such as
+        # NTXentLoss use an attribute with that name for their own purpose
+        self._gather_distributed_bank = gather_distributed
         self.register_buffer(
-            "bank", tensor=torch.empty(0, dtype=torch.float), persistent=False
+            "_bank", tensor=torch.empty(0, dtype=torch.float), persistent=False
         )
         self.register_buffer(
             "bank_ptr", tensor=torch.empty(0, dtype=torch.long), persistent=False
         )
+        # batch which is added to the bank when it is accessed the next time
+        self._pending_batch: Optional[Tensor] = None
+        # views of the bank returned by forward since the last update
+        self._bank_views: List[weakref.ref] = []
+
+    @property
+    def bank(self) -> Tensor:
+        """The memory bank with shape (dim, size) including all updates."""
+        self._apply_pending_batch()
+        return self._bank
+
+    @bank.setter
+    def bank(self, bank: Tensor):
+        self._bank = bank
+        self._bank_views = []
+
+    def __getstate__(self):
+        # weak references cannot be pickled
+        state = self.__dict__.copy()
+        state["_bank_views"] = []
+        return state
 
     @torch.no_grad()
     def _init_memory_bank(self, dim: int):
@@ -67,8 +108,8 @@ class MemoryBankModule(torch.nn.Module):
         # we could use register buffers like in the moco repo
         # https://github.com/facebookresearch/moco but we don't
         # want to pollute our checkpoints
-        self.bank = torch.randn(dim, self.size).type_as(self.bank)
-        self.bank = torch.nn.functional.normalize(self.bank, dim=0)
+        self.bank = torch.randn(dim, self.size).type_as(self._bank)
+        self.bank = torch.nn.functional.normalize(self._bank, dim=0)
         self.bank_ptr = torch.zeros(1).type_as(self.bank_ptr)
 
     @torch.no_grad()
@@ -80,16 +121,37 @@ class MemoryBankModule(torch.nn.Module):
                 The latest batch of keys to add to the memory bank.
 
         """
+        if any(view() is not None for view in self._bank_views):
+            # copy on write, a bank returned by forward is never modified
+            self.bank = self._bank.clone()
+        self._bank_views = []
+
         batch_size = batch.shape[0]
         ptr = int(self.bank_ptr)
 
         if ptr + batch_size >= self.size:
-            self.bank[:, ptr:] = batch[: self.size - ptr].T.detach()
+            self._bank[:, ptr:] = batch[: self.size - ptr].T.detach()
             self.bank_ptr[0] = 0
         else:
-            self.bank[:, ptr : ptr + batch_size] = batch.T.detach()
+            self._bank[:, ptr : ptr + batch_size] = batch.T.detach()
             self.bank_ptr[0] = ptr + batch_size
 
+    @torch.no_grad()
+    def _apply_pending_batch(self):
+        """Adds the pending batch to the memory bank."""
+        if self._pending_batch is not None:
+            batch = self._pending_batch.to(self._bank)
+            self._pending_batch = None
+            self._dequeue_and_enqueue(batch)
+
+    @torch.no_grad()
+    def _gather(self, batch: torch.Tensor) -> torch.Tensor:
+        """Returns the batches of all processes if gather_distributed is True
+        and a copy of the batch otherwise."""
+        if self._gather_distributed_bank and dist.world_size() > 1:
+            return torch.cat(dist.gather(batch), dim=0)
+        return batch.clone()
+
     def forward(
         self, output: torch.Tensor, labels: torch.Tensor = None, update: bool = False
     ):
@@ -114,14 +176,16 @@ class MemoryBankModule(torch.nn.Module):
         _, dim = output.shape
 
         # initialize the memory bank if it is not already done
-        if self.bank.nelement() == 0:
+        if self._bank.nelement() == 0:
             self._init_memory_bank(dim)
 
-        # query and update memory bank
-        bank = self.bank.clone().detach()
+        # query memory bank, the returned view is never modified
+        bank = self.bank.detach()
+        self._bank_views = [view for view in self._bank_views if view() is not None]
+        self._bank_views.append(weakref.ref(bank))
 
         # only update memory bank if we later do backward pass (gradient)
         if update:
-            self._dequeue_and_enqueue(output)
+            self._pending_batch = self._gather(output.detach())
 
         return output, bank
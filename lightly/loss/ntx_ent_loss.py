@@ -3,8 +3,10 @@
 # Copyright (c) 2020. Lightly AG and its affiliates.
 # All Rights Reserved
 
+from typing import Optional
+
 import torch
-from torch import nn
+from torch import Tensor, nn
 
 from lightly.loss.memory_bank import MemoryBankModule
 from lightly.utils import dist
@@ -29,6 +31,17 @@ class NTXentLoss(MemoryBankModule):
         gather_distributed:
             If True then negatives from all gpus are gathered before the
             loss calculation. This flag has no effect if memory_bank_size > 0.
+        gather_distributed_bank:
+            If True then the outputs of all gpus are added to the memory bank.
+            This flag has no effect if memory_bank_size == 0.
+        block_size:
+            If set, the loss is computed in blocks of block_size rows of the
+            similarity matrix and the full matrix is never materialized. The
+            blocks are recomputed in the backward pass. This reduces the memory
+            of the loss from O(batch_size * global_batch_size) to
+            O(block_size * global_batch_size) at the cost of computing the
+            similarities twice. The loss and the gradients are the same as
+            without blocks up to floating point errors.
 
     Raises:
         ValueError: If abs(temperature) < 1e-8 to prevent divide by zero.
@@ -56,10 +69,15 @@ class NTXentLoss(MemoryBankModule):
         temperature: float = 0.5,
         memory_bank_size: int = 0,
         gather_distributed: bool = False,
+        block_size: Optional[int] = None,
+        gather_distributed_bank: bool = False,
     ):
-        super(NTXentLoss, self).__init__(size=memory_bank_size)
+        super(NTXentLoss, self).__init__(
+            size=memory_bank_size, gather_distributed=gather_distributed_bank
+        )
         self.temperature = temperature
         self.gather_distributed = gather_distributed
+        self.block_size = block_size
         self.cross_entropy = nn.CrossEntropyLoss(reduction="mean")
         self.eps = 1e-8
 
@@ -67,6 +85,8 @@ class NTXentLoss(MemoryBankModule):
             raise ValueError(
                 "Illegal temperature: abs({}) < 1e-8".format(self.temperature)
             )
+        if block_size is not None and block_size < 1:
+            raise ValueError(f"block_size must be positive but is {block_size}.")
 
     def forward(self, out0: torch.Tensor, out1: torch.Tensor):
         """Forward pass through Contrastive Cross-Entropy Loss.
@@ -113,6 +133,9 @@ class NTXentLoss(MemoryBankModule):
             # use negatives from memory bank
             negatives = negatives.to(device)
 
+            if self.block_size is not None:
+                return self._blockwise_memory_bank_loss(out0, out1, negatives)
+
             # sim_pos is of shape (batch_size, 1) and sim_pos[i] denotes the similarity
             # of the i-th sample in the batch to its positive pair
             sim_pos = torch.einsum("nc,nc->n", out0, out1).unsqueeze(-1)
@@ -126,6 +149,9 @@ class NTXentLoss(MemoryBankModule):
             logits = torch.cat([sim_pos, sim_neg], dim=1) / self.temperature
             labels = torch.zeros(logits.shape[0], device=device, dtype=torch.long)
 
+        elif self.block_size is not None:
+            return self._blockwise_loss(out0, out1)
+
         else:
             # user other samples from batch as negatives
             # and create diagonal mask that only selects similarities between
@@ -167,3 +193,110 @@ class NTXentLoss(MemoryBankModule):
         loss = self.cross_entropy(logits, labels)
 
         return loss
+
+    def _blockwise_loss(self, out0: Tensor, out1: Tensor) -> Tensor:
+        """Computes the loss with in-batch negatives block by block.
+
+        Every row of the logits consists of the similarities of a sample to
+        all samples except itself. The loss of a row is the logsumexp of the
+        row minus the logit of the positive pair.
+
+        """
+        batch_size = out0.shape[0]
+        # index of every sample of this process in the gathered samples
+        index = torch.arange(batch_size, device=out0.device)
+        if self.gather_distributed and dist.world_size() > 1:
+            out0_large = torch.cat(dist.gather(out0), 0)
+            out1_large = torch.cat(dist.gather(out1), 0)
+            index = index + dist.rank() * batch_size
+        else:
+            out0_large = out0
+            out1_large = out1
+        batch_size_large = out0_large.shape[0]
+        queries = torch.cat([out0, out1], dim=0)
+        keys = torch.cat([out0_large, out1_large], dim=0)
+        self_index = torch.cat([index, index + batch_size_large])
+        positive_index = torch.cat([index + batch_size_large, index])
+
+        logsumexp = _BlockwiseLogSumExp.apply(
+            queries, keys, 1.0 / self.temperature, self_index, self.block_size
+        )
+        positives = (queries * keys[positive_index]).sum(dim=1) / self.temperature
+        return (logsumexp - positives).mean()
+
+    def _blockwise_memory_bank_loss(
+        self, out0: Tensor, out1: Tensor, negatives: Tensor
+    ) -> Tensor:
+        """Computes the loss with negatives from the memory bank block by
+        block."""
+        positives = torch.einsum("nc,nc->n", out0, out1) / self.temperature
+        logsumexp_negatives = _BlockwiseLogSumExp.apply(
+            out0, negatives.t(), 1.0 / self.temperature, None, self.block_size
+        )
+        logsumexp = torch.logaddexp(positives, logsumexp_negatives)
+        return (logsumexp - positives).mean()
+
+
+class _BlockwiseLogSumExp(torch.autograd.Function):
+    """Computes logsumexp(queries @ keys.T * scale, dim=1) in blocks of rows.
+
+    Only a (block_size, num_keys) block of the logits exists at any time. The
+    blocks are recomputed in the backward pass instead of being stored. If
+    self_index is not None, the logit of query i and key self_index[i] is
+    excluded.
+
+    """
+
+    @staticmethod
+    def forward(
+        ctx,
+        queries: Tensor,
+        keys: Tensor,
+        scale: float,
+        self_index: Optional[Tensor],
+        block_size: int,
+    ) -> Tensor:
+        logsumexp = queries.new_empty(queries.shape[0])
+        for start in range(0, queries.shape[0], block_size):
+            end = min(start + block_size, queries.shape[0])
+            logits = _logits_block(queries, keys, scale, self_index, start, end)
+            logsumexp[start:end] = torch.logsumexp(logits, dim=1)
+        ctx.save_for_backward(queries, keys, logsumexp, self_index)
+        ctx.scale = scale
+        ctx.block_size = block_size
+        return logsumexp
+
+    @staticmethod
+    def backward(ctx, grad_logsumexp: Tensor):
+        queries, keys, logsumexp, self_index = ctx.saved_tensors
+        grad_queries = torch.zeros_like(queries) if ctx.needs_input_grad[0] else None
+        grad_keys = torch.zeros_like(keys) if ctx.needs_input_grad[1] else None
+        for start in range(0, queries.shape[0], ctx.block_size):
+            end = min(start + ctx.block_size, queries.shape[0])
+            logits = _logits_block(queries, keys, ctx.scale, self_index, start, end)
+            # the gradient of logsumexp is softmax, the scale comes from the
+            # derivative of the logits
+            weights = logits.sub_(logsumexp[start:end, None]).exp_()
+            weights.mul_(grad_logsumexp[start:end, None] * ctx.scale)
+            if grad_queries is not None:
+                grad_queries[start:end] = weights @ keys
+            if grad_keys is not None:
+                grad_keys.addmm_(weights.t(), queries[start:end])
+        return grad_queries, grad_keys, None, None, None
+
+
+def _logits_block(
+    queries: Tensor,
+    keys: Tensor,
+    scale: float,
+    self_index: Optional[Tensor],
+    start: int,
+    end: int,
+) -> Tensor:
+    """Returns the logits of the queries start to end with all keys."""
+    logits = queries[start:end] @ keys.t()
+    logits.mul_(scale)
+    if self_index is not None:
+        rows = torch.arange(end - start, device=logits.device)
+        logits[rows, self_index[start:end]] = float("-inf")
+    return logits
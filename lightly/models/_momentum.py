@@ -8,6 +8,8 @@ import copy
 import torch
 import torch.nn as nn
 
+from lightly.models.utils import _update_ema, update_momentum
+
 
 def _deactivate_requires_grad(params):
     """Deactivates the requires_grad flag for all parameters."""
@@ -17,8 +19,7 @@ def _deactivate_requires_grad(params):
 
 def _do_momentum_update(prev_params, params, m):
     """Updates the weights of the previous parameters."""
-    for prev_param, param in zip(prev_params, params):
-        prev_param.data = prev_param.data * m + param.data * (1.0 - m)
+    _update_ema(prev_params, params, m=m)
 
 
 class _MomentumEncoderMixin:
@@ -71,17 +72,27 @@ class _MomentumEncoderMixin:
         _deactivate_requires_grad(self.momentum_projection_head.parameters())
 
     @torch.no_grad()
-    def _momentum_update(self, m: float = 0.999):
-        """Performs the momentum update for the backbone and projection head."""
-        _do_momentum_update(
-            self.momentum_backbone.parameters(),
-            self.backbone.parameters(),
+    def _momentum_update(self, m: float = 0.999, update_buffers: bool = False):
+        """Performs the momentum update for the backbone and projection head.
+
+        Args:
+            m:
+                Momentum.
+            update_buffers:
+                If True, the buffers are updated as well. See update_momentum.
+
+        """
+        update_momentum(
+            self.backbone,
+            self.momentum_backbone,
             m=m,
+            update_buffers=update_buffers,
         )
-        _do_momentum_update(
-            self.momentum_projection_head.parameters(),
-            self.projection_head.parameters(),
+        update_momentum(
+            self.projection_head,
+            self.momentum_projection_head,
             m=m,
+            update_buffers=update_buffers,
         )
 
     @torch.no_grad()
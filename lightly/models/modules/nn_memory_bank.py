@@ -21,6 +21,18 @@ class NNMemoryBankModule(MemoryBankModule):
         size:
             Number of keys the memory bank can store. If set to 0,
             memory bank is not used.
+        gather_distributed:
+            If True then the outputs of all gpus are added to the memory bank.
+        topk:
+            Number of nearest neighbours that are searched. If topk > 1, one of
+            the topk nearest neighbours is sampled uniformly at random for
+            every output, unless sample_topk is False.
+        sample_topk:
+            If False and topk > 1, all topk nearest neighbours are returned
+            with shape (batch_size, topk, dim), ordered by similarity.
+        chunk_size:
+            Number of keys that are compared with the outputs at once. Bounds
+            the size of the similarity matrix to (batch_size, chunk_size).
 
     Examples:
         >>> model = NNCLR(backbone)
@@ -37,8 +49,46 @@ class NNMemoryBankModule(MemoryBankModule):
 
     """
 
-    def __init__(self, size: int = 2**16):
-        super(NNMemoryBankModule, self).__init__(size)
+    def __init__(
+        self,
+        size: int = 2**16,
+        gather_distributed: bool = False,
+        topk: int = 1,
+        sample_topk: bool = True,
+        chunk_size: int = 2**14,
+    ):
+        super(NNMemoryBankModule, self).__init__(
+            size, gather_distributed=gather_distributed
+        )
+        if topk < 1 or topk > max(size, 1):
+            raise ValueError(
+                f"topk must be in [1, size] but is {topk} for size {size}."
+            )
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be positive but is {chunk_size}.")
+        self.topk = topk
+        self.sample_topk = sample_topk
+        self.chunk_size = chunk_size
+        # inverse norms of the keys in the bank, updated with the bank
+        self.register_buffer(
+            "bank_inv_norms",
+            tensor=torch.empty(0, dtype=torch.float),
+            persistent=False,
+        )
+
+    @torch.no_grad()
+    def _init_memory_bank(self, dim: int):
+        super(NNMemoryBankModule, self)._init_memory_bank(dim)
+        self.bank_inv_norms = 1.0 / self._bank.norm(dim=0).clamp_min(1e-12)
+
+    @torch.no_grad()
+    def _dequeue_and_enqueue(self, batch: torch.Tensor):
+        ptr = int(self.bank_ptr)
+        super(NNMemoryBankModule, self)._dequeue_and_enqueue(batch)
+        end = min(ptr + batch.shape[0], self.size)
+        self.bank_inv_norms[ptr:end] = 1.0 / batch[: end - ptr].norm(dim=1).clamp_min(
+            1e-12
+        )
 
     def forward(self, output: torch.Tensor, update: bool = False):
         """Returns nearest neighbour of output tensor from memory bank
@@ -50,15 +100,45 @@ class NNMemoryBankModule(MemoryBankModule):
         """
 
         output, bank = super(NNMemoryBankModule, self).forward(output, update=update)
-        bank = bank.to(output.device).t()
+        bank = bank.to(output.device)
+        index_nearest_neighbours = self._search_topk(output, bank)
+        if self.topk > 1 and self.sample_topk:
+            choice = torch.randint(
+                self.topk, (output.shape[0], 1), device=output.device
+            )
+            index_nearest_neighbours = index_nearest_neighbours.gather(1, choice)
+        if self.topk == 1 or self.sample_topk:
+            index_nearest_neighbours = index_nearest_neighbours.squeeze(1)
+        nearest_neighbours = bank.t()[index_nearest_neighbours]
 
-        output_normed = torch.nn.functional.normalize(output, dim=1)
-        bank_normed = torch.nn.functional.normalize(bank, dim=1)
+        return nearest_neighbours
 
-        similarity_matrix = torch.einsum("nd,md->nm", output_normed, bank_normed)
-        index_nearest_neighbours = torch.argmax(similarity_matrix, dim=1)
-        nearest_neighbours = torch.index_select(
-            bank, dim=0, index=index_nearest_neighbours
-        )
+    @torch.no_grad()
+    def _search_topk(self, output: torch.Tensor, bank: torch.Tensor) -> torch.Tensor:
+        """Returns the indices of the topk keys in the bank with the highest
+        cosine similarity to the outputs with shape (batch_size, topk).
 
-        return nearest_neighbours
+        The bank is searched in chunks of chunk_size keys and the keys are
+        normalized with the stored inverse norms instead of normalizing the
+        whole bank.
+
+        """
+        output_normed = torch.nn.functional.normalize(output, dim=1)
+        inv_norms = self.bank_inv_norms.to(output.device)
+        topk_similarities = None
+        topk_indices = None
+        for start in range(0, bank.shape[1], self.chunk_size):
+            end = min(start + self.chunk_size, bank.shape[1])
+            similarities = output_normed @ bank[:, start:end]
+            similarities.mul_(inv_norms[start:end])
+            similarities, indices = similarities.topk(
+                min(self.topk, end - start), dim=1
+            )
+            indices += start
+            if topk_similarities is not None:
+                similarities = torch.cat([topk_similarities, similarities], dim=1)
+                indices = torch.cat([topk_indices, indices], dim=1)
+                similarities, best = similarities.topk(self.topk, dim=1)
+                indices = indices.gather(1, best)
+            topk_similarities, topk_indices = similarities, indices
+        return topk_indices
@@ -5,7 +5,7 @@
 
 import math
 import warnings
-from typing import Optional, Tuple, Union
+from typing import Iterable, List, Optional, Tuple, Union
 
 import numpy as np
 import torch
@@ -89,10 +89,94 @@ def concat_all_gather(x: torch.Tensor) -> torch.Tensor:
     return output
 
 
+# Generator for the permutations of batch_shuffle_distributed. It is seeded
+# with the same seed on all processes such that they draw the same
+# permutations without communication.
+_shuffle_generator: Optional[torch.Generator] = None
+
+
+def _get_shuffle_generator(device: torch.device) -> torch.Generator:
+    """Returns the generator for the shared permutations. The seed is
+    broadcast from rank 0 only when the generator is created."""
+    global _shuffle_generator
+    if _shuffle_generator is None:
+        seed = torch.randint(2**62, (1,), dtype=torch.long).to(device)
+        dist.broadcast(seed, src=0)
+        _shuffle_generator = torch.Generator()
+        _shuffle_generator.manual_seed(int(seed.item()))
+    return _shuffle_generator
+
+
+def _get_shuffle_exchange(
+    idx_shuffle: torch.Tensor, batch_size: int
+) -> Tuple[torch.Tensor, List[int], torch.Tensor, List[int]]:
+    """Computes which samples this process exchanges with the other processes
+    for the permutation idx_shuffle of the samples of all processes.
+
+    Sample i of process r has the global index r * batch_size + i. After the
+    shuffle, position j of process r holds the sample with global index
+    idx_shuffle[r * batch_size + j].
+
+    Returns:
+        A (send_index, send_splits, receive_index, receive_splits) tuple.
+        send_index are the local indices of the samples that are sent to the
+        processes, ordered by process, and send_splits are the number of
+        samples per process. The samples received from all processes are
+        stored at the local positions receive_index and receive_splits are
+        the number of samples received per process.
+
+    """
+    rank = dist.get_rank()
+    world_size = dist.get_world_size()
+    owner = torch.div(idx_shuffle, batch_size, rounding_mode="floor")
+
+    # positions of the shuffled batch which are filled with samples of this
+    # process, ordered by the process to which the position belongs
+    positions = torch.nonzero(owner == rank, as_tuple=True)[0]
+    send_index = idx_shuffle[positions] - rank * batch_size
+    send_splits = torch.bincount(
+        torch.div(positions, batch_size, rounding_mode="floor"),
+        minlength=world_size,
+    )
+
+    # the received samples are ordered by the process from which they come
+    owner_this = owner[rank * batch_size : (rank + 1) * batch_size]
+    _, receive_index = torch.sort(owner_this, stable=True)
+    receive_splits = torch.bincount(owner_this, minlength=world_size)
+    return send_index, send_splits.tolist(), receive_index, receive_splits.tolist()
+
+
+def _exchange(
+    batch: torch.Tensor,
+    send_index: torch.Tensor,
+    send_splits: List[int],
+    receive_index: torch.Tensor,
+    receive_splits: List[int],
+) -> torch.Tensor:
+    """Sends batch[send_index] to the other processes and stores the received
+    samples at receive_index."""
+    received = batch.new_empty((sum(receive_splits), *batch.shape[1:]))
+    dist.all_to_all_single(
+        received,
+        batch[send_index].contiguous(),
+        output_split_sizes=receive_splits,
+        input_split_sizes=send_splits,
+    )
+    output = torch.empty_like(batch)
+    output[receive_index] = received
+    return output
+
+
 @torch.no_grad()
 def batch_shuffle_distributed(batch: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor]:
     """Shuffles batch over multiple gpus.
 
+    All processes draw the same random permutation from a generator with a
+    shared seed and exchange only the samples that move to another process
+    with a single all-to-all operation. Works with all backends that support
+    all_to_all_single, for example nccl and gloo. All processes must have the
+    same batch size.
+
     This code was taken and adapted from here:
     https://github.com/facebookresearch/moco.
 
@@ -105,27 +189,23 @@ def batch_shuffle_distributed(batch: torch.Tensor) -> Tuple[torch.Tensor, torch.
         input batch and shuffle is an index to restore the original order.
 
     """
-    # gather from all gpus
-    batch_size_this = batch.shape[0]
-    batch_gather = concat_all_gather(batch)
-    batch_size_all = batch_gather.shape[0]
-
-    num_gpus = batch_size_all // batch_size_this
-
-    # random shuffle index
-    idx_shuffle = torch.randperm(batch_size_all).cuda()
-
-    # broadcast to all gpus
-    dist.broadcast(idx_shuffle, src=0)
-
+    batch_size = batch.shape[0]
+    batch_size_all = batch_size * dist.get_world_size()
+    generator = _get_shuffle_generator(batch.device)
+    idx_shuffle = torch.randperm(batch_size_all, generator=generator)
+    send_index, send_splits, receive_index, receive_splits = _get_shuffle_exchange(
+        idx_shuffle, batch_size=batch_size
+    )
+    batch = _exchange(
+        batch,
+        send_index=send_index.to(batch.device),
+        send_splits=send_splits,
+        receive_index=receive_index.to(batch.device),
+        receive_splits=receive_splits,
+    )
     # index for restoring
-    shuffle = torch.argsort(idx_shuffle)
-
-    # shuffled index for this gpu
-    gpu_idx = dist.get_rank()
-    idx_this = idx_shuffle.view(num_gpus, -1)[gpu_idx]
-
-    return batch_gather[idx_this], shuffle
+    shuffle = torch.argsort(idx_shuffle).to(batch.device)
+    return batch, shuffle
 
 
 @torch.no_grad()
@@ -134,6 +214,9 @@ def batch_unshuffle_distributed(
 ) -> torch.Tensor:
     """Undo batch shuffle over multiple gpus.
 
+    Sends every sample back to the process from which it came with a single
+    all-to-all operation.
+
     This code was taken and adapted from here:
     https://github.com/facebookresearch/moco.
 
@@ -147,18 +230,18 @@ def batch_unshuffle_distributed(
         The unshuffled tensor.
 
     """
-    # gather from all gpus
-    batch_size_this = batch.shape[0]
-    batch_gather = concat_all_gather(batch)
-    batch_size_all = batch_gather.shape[0]
-
-    num_gpus = batch_size_all // batch_size_this
-
-    # restored index for this gpu
-    gpu_idx = dist.get_rank()
-    idx_this = shuffle.view(num_gpus, -1)[gpu_idx]
-
-    return batch_gather[idx_this]
+    idx_shuffle = torch.argsort(shuffle.cpu())
+    send_index, send_splits, receive_index, receive_splits = _get_shuffle_exchange(
+        idx_shuffle, batch_size=batch.shape[0]
+    )
+    # the exchange of the shuffle is reversed
+    return _exchange(
+        batch,
+        send_index=receive_index.to(batch.device),
+        send_splits=receive_splits,
+        receive_index=send_index.to(batch.device),
+        receive_splits=send_splits,
+    )
 
 
 def deactivate_requires_grad(model: nn.Module):
@@ -190,11 +273,30 @@ def activate_requires_grad(model: nn.Module):
         param.requires_grad = True
 
 
-def update_momentum(model: nn.Module, model_ema: nn.Module, m: float):
+@torch.no_grad()
+def update_momentum(
+    model: nn.Module, model_ema: nn.Module, m: float, update_buffers: bool = False
+):
     """Updates parameters of `model_ema` with Exponential Moving Average of `model`
 
     Momentum encoders are a crucial component fo models such as MoCo or BYOL.
 
+    The parameters are updated in place with fused multi-tensor operations
+    which launch only a few kernels for all parameters instead of multiple
+    kernels per parameter.
+
+    Args:
+        model:
+            Model from which the parameters are taken.
+        model_ema:
+            Model whose parameters are updated.
+        m:
+            Momentum. The new parameters are model_ema * m + model * (1 - m).
+        update_buffers:
+            If True, floating point buffers such as the running statistics of
+            batch norm layers are updated in the same way as the parameters.
+            Other buffers such as the number of tracked batches are copied.
+
     Examples:
         >>> backbone = resnet18()
         >>> projection_head = MoCoProjectionHead()
@@ -205,8 +307,32 @@ def update_momentum(model: nn.Module, model_ema: nn.Module, m: float):
         >>> update_momentum(moco, moco_momentum, m=0.999)
         >>> update_momentum(projection_head, projection_head_momentum, m=0.999)
     """
-    for model_ema, model in zip(model_ema.parameters(), model.parameters()):
-        model_ema.data = model_ema.data * m + model.data * (1.0 - m)
+    _update_ema(model_ema.parameters(), model.parameters(), m=m)
+    if update_buffers:
+        ema_buffers = []
+        buffers = []
+        for ema_buffer, buffer in zip(model_ema.buffers(), model.buffers()):
+            if ema_buffer.is_floating_point():
+                ema_buffers.append(ema_buffer)
+                buffers.append(buffer)
+            else:
+                ema_buffer.copy_(buffer)
+        _update_ema(ema_buffers, buffers, m=m)
+
+
+@torch.no_grad()
+def _update_ema(
+    ema_tensors: Iterable[torch.Tensor], tensors: Iterable[torch.Tensor], m: float
+) -> None:
+    """Computes ema_tensor * m + tensor * (1 - m) in place for all pairs of
+    tensors with fused multi-tensor operations."""
+    pairs = list(zip(ema_tensors, tensors))
+    if not pairs:
+        return
+    ema_list = [ema_tensor for ema_tensor, _ in pairs]
+    tensor_list = [tensor for _, tensor in pairs]
+    torch._foreach_mul_(ema_list, m)
+    torch._foreach_add_(ema_list, tensor_list, alpha=1.0 - m)
 
 
 @torch.no_grad()
@@ -8,6 +8,12 @@
 # Copyright (c) 2020. Lightly AG and its affiliates.
 # All Rights Reserved
 
+from lightly.transforms.batch_transform import (
+    BatchMultiViewTransform,
+    BatchViewTransform,
+    DINOBatchTransform,
+    SimCLRBatchTransform,
+)
 from lightly.transforms.dino_transform import DINOTransform, DINOViewTransform
 from lightly.transforms.fast_siam_transform import FastSiamTransform
 from lightly.transforms.gaussian_blur import GaussianBlur
@@ -26,5 +32,6 @@ from lightly.transforms.simsiam_transform import SimSiamTransform, SimSiamViewTr
 from lightly.transforms.smog_transform import SMoGTransform, SmoGViewTransform
 from lightly.transforms.solarize import RandomSolarization
 from lightly.transforms.swav_transform import SwaVTransform, SwaVViewTransform
+from lightly.transforms.uint8_normalize import Uint8Normalize
 from lightly.transforms.vicreg_transform import VICRegTransform, VICRegViewTransform
 from lightly.transforms.vicregl_transform import VICRegLTransform, VICRegLViewTransform
@@ -0,0 +1,733 @@
+""" Batched Augmentations """
+
+# Copyright (c) 2023. Lightly AG and its affiliates.
+# All Rights Reserved
+
+import math
+from typing import List, Sequence, Tuple, Union
+
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+import torchvision.transforms.functional as TF
+from PIL.Image import Image
+from torch import Tensor
+from torchvision.ops import roi_align
+
+from lightly.transforms.multi_view_transform import MultiViewTransform
+from lightly.transforms.utils import IMAGENET_NORMALIZE
+
+_Images = Union[Tensor, Sequence[Union[Tensor, Image]]]
+
+
+class BatchViewTransform(nn.Module):
+    """Applies random augmentations to a whole batch of images at once.
+
+    The batched counterpart of the view transforms such as SimCLRViewTransform
+    and DINOViewTransform. Instead of transforming every image separately with
+    PIL, the random parameters are sampled for all images at once and every
+    augmentation is a single tensor operation on the batch. The random
+    parameters are still sampled independently for every image.
+
+    The augmentations are applied in the following order: random resized
+    crop, random rotation, horizontal and vertical flip, color jitter,
+    grayscale, Gaussian blur, solarization, and normalization. Crops are
+    resized with bilinear interpolation and antialiasing. Color jitter applies
+    brightness, contrast, saturation, and hue adjustments in a random order
+    per image like torchvision.transforms.ColorJitter.
+
+    The transform runs on the device of the input images. This makes it
+    possible to augment the images on the GPU.
+
+    Attributes:
+        input_size:
+            Size of the output images in pixels.
+        crop_scale:
+            Tuple of min and max area of the random crop relative to the area
+            of the input image.
+        crop_ratio:
+            Tuple of min and max aspect ratio of the random crop.
+        hf_prob:
+            Probability that horizontal flip is applied.
+        vf_prob:
+            Probability that vertical flip is applied.
+        rr_prob:
+            Probability that random rotation is applied.
+        rr_degrees:
+            Range of degrees to select from for random rotation. If rr_degrees is None,
+            images are rotated by 90 degrees. If rr_degrees is a (min, max) tuple,
+            images are rotated by a random angle in [min, max]. If rr_degrees is a
+            single number, images are rotated by a random angle in
+            [-rr_degrees, +rr_degrees]. All rotations are counter-clockwise.
+        cj_prob:
+            Probability that color jitter is applied.
+        cj_bright:
+            How much to jitter brightness.
+        cj_contrast:
+            How much to jitter constrast.
+        cj_sat:
+            How much to jitter saturation.
+        cj_hue:
+            How much to jitter hue.
+        random_gray_scale:
+            Probability of conversion to grayscale.
+        gaussian_blur:
+            Probability of Gaussian blur.
+        sigmas:
+            Tuple of min and max value from which the std of the gaussian kernel is sampled.
+        solarization_prob:
+            Probability of solarization.
+        normalize:
+            Dictionary with 'mean' and 'std' for torchvision.transforms.Normalize.
+        output_uint8:
+            If True, returns uint8 tensors which must be normalized with
+            Uint8Normalize on the device.
+
+    Examples:
+        >>> transform = BatchViewTransform(input_size=224, gaussian_blur=0.5)
+        >>> # images is a uint8 tensor with shape (batch_size, 3, H, W) or a
+        >>> # list of uint8 tensors or PIL images with different sizes
+        >>> views = transform(images)
+        >>> views.shape
+        >>> torch.Size([batch_size, 3, 224, 224])
+
+    """
+
+    def __init__(
+        self,
+        input_size: int = 224,
+        crop_scale: Tuple[float, float] = (0.08, 1.0),
+        crop_ratio: Tuple[float, float] = (3.0 / 4.0, 4.0 / 3.0),
+        hf_prob: float = 0.5,
+        vf_prob: float = 0.0,
+        rr_prob: float = 0.0,
+        rr_degrees: Union[None, float, Tuple[float, float]] = None,
+        cj_prob: float = 0.8,
+        cj_bright: float = 0.8,
+        cj_contrast: float = 0.8,
+        cj_sat: float = 0.8,
+        cj_hue: float = 0.2,
+        random_gray_scale: float = 0.2,
+        gaussian_blur: float = 0.5,
+        sigmas: Tuple[float, float] = (0.1, 2),
+        solarization_prob: float = 0.0,
+        normalize: Union[None, dict] = IMAGENET_NORMALIZE,
+        output_uint8: bool = False,
+    ):
+        super().__init__()
+        self.input_size = input_size
+        self.crop_scale = crop_scale
+        self.crop_ratio = crop_ratio
+        self.hf_prob = hf_prob
+        self.vf_prob = vf_prob
+        self.rr_prob = rr_prob
+        self.rr_degrees = rr_degrees
+        self.cj_prob = cj_prob
+        self.cj_bright = cj_bright
+        self.cj_contrast = cj_contrast
+        self.cj_sat = cj_sat
+        self.cj_hue = cj_hue
+        self.random_gray_scale = random_gray_scale
+        self.gaussian_blur = gaussian_blur
+        self.sigmas = sigmas
+        self.solarization_prob = solarization_prob
+        self.normalize = normalize
+        self.output_uint8 = output_uint8
+
+    def forward(self, images: _Images) -> Tensor:
+        """Applies the transforms to a batch of images.
+
+        Args:
+            images:
+                Batch of images. Either a tensor with shape (B, C, H, W) or a
+                list of tensors with shape (C, H, W) or PIL images. The images
+                in a list can have different sizes. Tensors must be uint8 or
+                float with values in [0, 1].
+
+        Returns:
+            Float tensor with shape (B, C, input_size, input_size). A uint8
+            tensor if output_uint8 is True.
+
+        """
+        return self._forward_stacked(*_stack_images(images))
+
+    def _forward_stacked(self, images: Tensor, heights: Tensor, widths: Tensor):
+        x = _random_resized_crop(
+            images,
+            heights=heights,
+            widths=widths,
+            size=self.input_size,
+            scale=self.crop_scale,
+            ratio=self.crop_ratio,
+        )
+        batch_size = x.shape[0]
+
+        if self.rr_prob > 0:
+            mask = _random_mask(batch_size, self.rr_prob, x.device)
+            if mask.any():
+                x[mask] = _rotate(x[mask], self._sample_angles(int(mask.sum()), x))
+        if self.hf_prob > 0:
+            mask = _random_mask(batch_size, self.hf_prob, x.device)
+            x = torch.where(mask[:, None, None, None], x.flip(-1), x)
+        if self.vf_prob > 0:
+            mask = _random_mask(batch_size, self.vf_prob, x.device)
+            x = torch.where(mask[:, None, None, None], x.flip(-2), x)
+        if self.cj_prob > 0:
+            mask = _random_mask(batch_size, self.cj_prob, x.device)
+            if mask.any():
+                x[mask] = _color_jitter(
+                    x[mask],
+                    brightness=self.cj_bright,
+                    contrast=self.cj_contrast,
+                    saturation=self.cj_sat,
+                    hue=self.cj_hue,
+                )
+        if self.random_gray_scale > 0:
+            mask = _random_mask(batch_size, self.random_gray_scale, x.device)
+            x = torch.where(mask[:, None, None, None], _grayscale(x).expand_as(x), x)
+        if self.gaussian_blur > 0:
+            mask = _random_mask(batch_size, self.gaussian_blur, x.device)
+            if mask.any():
+                sigmas = _uniform(int(mask.sum()), *self.sigmas, device=x.device)
+                x[mask] = _gaussian_blur(x[mask], sigmas)
+        if self.solarization_prob > 0:
+            mask = _random_mask(batch_size, self.solarization_prob, x.device)
+            x = torch.where(mask[:, None, None, None], _solarize(x), x)
+        if self.output_uint8:
+            return x.mul_(255).round_().to(torch.uint8)
+        if self.normalize:
+            x = TF.normalize(x, mean=self.normalize["mean"], std=self.normalize["std"])
+        return x
+
+    def _sample_angles(self, n: int, x: Tensor) -> Tensor:
+        if self.rr_degrees is None:
+            return torch.full((n,), 90.0, device=x.device)
+        if isinstance(self.rr_degrees, (int, float)):
+            low, high = -self.rr_degrees, self.rr_degrees
+        else:
+            low, high = self.rr_degrees
+        return _uniform(n, low, high, device=x.device)
+
+
+class BatchMultiViewTransform(MultiViewTransform):
+    """Transforms a batch of images into multiple views at once.
+
+    Batched version of MultiViewTransform. Every transform must be a
+    BatchViewTransform and creates a new view of the whole batch. Use it
+    together with BatchMultiViewCollate to augment the images in the collate
+    function instead of in the dataset.
+
+    Args:
+        transforms:
+            A sequence of BatchViewTransform. Every transform creates a new view.
+
+    Examples:
+        >>> transform = SimCLRBatchTransform(input_size=224)
+        >>> dataset = LightlyDataset('path/to/images/')
+        >>> dataloader = torch.utils.data.DataLoader(
+        >>>     dataset,
+        >>>     batch_size=256,
+        >>>     collate_fn=BatchMultiViewCollate(transform),
+        >>> )
+
+    """
+
+    def __init__(self, transforms: Sequence[BatchViewTransform]):
+        super().__init__(transforms=transforms)
+
+    def __call__(self, image: Union[Tensor, Image]) -> List[Tensor]:
+        """Transforms a single image into multiple views.
+
+        Args:
+            image:
+                Image to be transformed into multiple views.
+
+        Returns:
+            List of views.
+
+        """
+        return [view[0] for view in self.transform_batch([image])]
+
+    def transform_batch(self, images: _Images) -> List[Tensor]:
+        """Transforms a batch of images into multiple views.
+
+        Args:
+            images:
+                Batch of images. See BatchViewTransform for supported formats.
+
+        Returns:
+            List of views with one tensor with shape (B, C, H, W) per view.
+
+        """
+        stacked = _stack_images(images)
+        return [transform._forward_stacked(*stacked) for transform in self.transforms]
+
+
+class SimCLRBatchTransform(BatchMultiViewTransform):
+    """Batched version of SimCLRTransform.
+
+    Creates two views of every image with the SimCLR augmentations. See
+    BatchViewTransform for how the batched augmentations differ from their
+    PIL counterparts.
+
+    Attributes:
+        input_size:
+            Size of the input image in pixels.
+        cj_prob:
+            Probability that color jitter is applied.
+        cj_strength:
+            Strength of the color jitter. `cj_bright`, `cj_contrast`, `cj_sat`, and
+            `cj_hue` are multiplied by this value.
+        cj_bright:
+            How much to jitter brightness.
+        cj_contrast:
+            How much to jitter constrast.
+        cj_sat:
+            How much to jitter saturation.
+        cj_hue:
+            How much to jitter hue.
+        min_scale:
+            Minimum size of the randomized crop relative to the input_size.
+        random_gray_scale:
+            Probability of conversion to grayscale.
+        gaussian_blur:
+            Probability of Gaussian blur.
+        sigmas:
+            Tuple of min and max value from which the std of the gaussian kernel is sampled.
+        vf_prob:
+            Probability that vertical flip is applied.
+        hf_prob:
+            Probability that horizontal flip is applied.
+        rr_prob:
+            Probability that random rotation is applied.
+        rr_degrees:
+            Range of degrees to select from for random rotation. See
+            SimCLRTransform for details.
+        normalize:
+            Dictionary with 'mean' and 'std' for torchvision.transforms.Normalize.
+        output_uint8:
+            If True, returns uint8 tensors which must be normalized with
+            Uint8Normalize on the device.
+
+    """
+
+    def __init__(
+        self,
+        input_size: int = 224,
+        cj_prob: float = 0.8,
+        cj_strength: float = 1.0,
+        cj_bright: float = 0.8,
+        cj_contrast: float = 0.8,
+        cj_sat: float = 0.8,
+        cj_hue: float = 0.2,
+        min_scale: float = 0.08,
+        random_gray_scale: float = 0.2,
+        gaussian_blur: float = 0.5,
+        sigmas: Tuple[float, float] = (0.1, 2),
+        vf_prob: float = 0.0,
+        hf_prob: float = 0.5,
+        rr_prob: float = 0.0,
+        rr_degrees: Union[None, float, Tuple[float, float]] = None,
+        normalize: Union[None, dict] = IMAGENET_NORMALIZE,
+        output_uint8: bool = False,
+    ):
+        view_transform = BatchViewTransform(
+            input_size=input_size,
+            crop_scale=(min_scale, 1.0),
+            hf_prob=hf_prob,
+            vf_prob=vf_prob,
+            rr_prob=rr_prob,
+            rr_degrees=rr_degrees,
+            cj_prob=cj_prob,
+            cj_bright=cj_strength * cj_bright,
+            cj_contrast=cj_strength * cj_contrast,
+            cj_sat=cj_strength * cj_sat,
+            cj_hue=cj_strength * cj_hue,
+            random_gray_scale=random_gray_scale,
+            gaussian_blur=gaussian_blur,
+            sigmas=sigmas,
+            normalize=normalize,
+            output_uint8=output_uint8,
+        )
+        super().__init__(transforms=[view_transform, view_transform])
+
+
+class DINOBatchTransform(BatchMultiViewTransform):
+    """Batched version of DINOTransform.
+
+    Creates two global and n_local_views local views of every image with the
+    DINO augmentations. Crops are resized with bilinear instead of bicubic
+    interpolation. See BatchViewTransform for how the batched augmentations
+    differ from their PIL counterparts.
+
+    Attributes:
+        global_crop_size:
+            Crop size of the global views.
+        global_crop_scale:
+            Tuple of min and max scales relative to global_crop_size.
+        local_crop_size:
+            Crop size of the local views.
+        local_crop_scale:
+            Tuple of min and max scales relative to local_crop_size.
+        n_local_views:
+            Number of generated local views.
+        hf_prob:
+            Probability that horizontal flip is applied.
+        vf_prob:
+            Probability that vertical flip is applied.
+        rr_prob:
+            Probability that random rotation is applied.
+        rr_degrees:
+            Range of degrees to select from for random rotation. See
+            DINOTransform for details.
+        cj_prob:
+            Probability that color jitter is applied.
+        cj_strength:
+            Strength of the color jitter. `cj_bright`, `cj_contrast`, `cj_sat`, and
+            `cj_hue` are multiplied by this value.
+        cj_bright:
+            How much to jitter brightness.
+        cj_contrast:
+            How much to jitter constrast.
+        cj_sat:
+            How much to jitter saturation.
+        cj_hue:
+            How much to jitter hue.
+        random_gray_scale:
+            Probability of conversion to grayscale.
+        gaussian_blur:
+            Tuple of probabilities to apply gaussian blur on the different
+            views. The input is ordered as follows:
+            (global_view_0, global_view_1, local_views)
+        sigmas:
+            Tuple of min and max value from which the std of the gaussian kernel is sampled.
+        solarization_prob:
+            Probability to apply solarization on the second global view.
+        normalize:
+            Dictionary with 'mean' and 'std' for torchvision.transforms.Normalize.
+        output_uint8:
+            If True, returns uint8 tensors which must be normalized with
+            Uint8Normalize on the device.
+
+    """
+
+    def __init__(
+        self,
+        global_crop_size: int = 224,
+        global_crop_scale: Tuple[float, float] = (0.4, 1.0),
+        local_crop_size: int = 96,
+        local_crop_scale: Tuple[float, float] = (0.05, 0.4),
+        n_local_views: int = 6,
+        hf_prob: float = 0.5,
+        vf_prob: float = 0,
+        rr_prob: float = 0,
+        rr_degrees: Union[None, float, Tuple[float, float]] = None,
+        cj_prob: float = 0.8,
+        cj_strength: float = 0.5,
+        cj_bright: float = 0.8,
+        cj_contrast: float = 0.8,
+        cj_sat: float = 0.4,
+        cj_hue: float = 0.2,
+        random_gray_scale: float = 0.2,
+        gaussian_blur: Tuple[float, float, float] = (1.0, 0.1, 0.5),
+        sigmas: Tuple[float, float] = (0.1, 2),
+        solarization_prob: float = 0.2,
+        normalize: Union[None, dict] = IMAGENET_NORMALIZE,
+        output_uint8: bool = False,
+    ):
+        def view_transform(
+            crop_size: int,
+            crop_scale: Tuple[float, float],
+            blur_prob: float,
+            solarize_prob: float,
+        ) -> BatchViewTransform:
+            return BatchViewTransform(
+                input_size=crop_size,
+                crop_scale=crop_scale,
+                hf_prob=hf_prob,
+                vf_prob=vf_prob,
+                rr_prob=rr_prob,
+                rr_degrees=rr_degrees,
+                cj_prob=cj_prob,
+                cj_bright=cj_strength * cj_bright,
+                cj_contrast=cj_strength * cj_contrast,
+                cj_sat=cj_strength * cj_sat,
+                cj_hue=cj_strength * cj_hue,
+                random_gray_scale=random_gray_scale,
+                gaussian_blur=blur_prob,
+                sigmas=sigmas,
+                solarization_prob=solarize_prob,
+                normalize=normalize,
+                output_uint8=output_uint8,
+            )
+
+        global_transform_0 = view_transform(
+            global_crop_size, global_crop_scale, gaussian_blur[0], 0
+        )
+        global_transform_1 = view_transform(
+            global_crop_size, global_crop_scale, gaussian_blur[1], solarization_prob
+        )
+        local_transform = view_transform(
+            local_crop_size, local_crop_scale, gaussian_blur[2], 0
+        )
+        transforms = [global_transform_0, global_transform_1]
+        transforms.extend([local_transform] * n_local_views)
+        super().__init__(transforms=transforms)
+
+
+def _stack_images(images: _Images) -> Tuple[Tensor, Tensor, Tensor]:
+    """Stacks the images into a single float tensor with values in [0, 1].
+
+    Images with different sizes are padded to the largest height and width by
+    repeating their border pixels. Returns the stacked images and the height
+    and width of every image before padding.
+
+    """
+    if isinstance(images, Tensor):
+        if images.ndim != 4:
+            raise ValueError(
+                f"Expected images with shape (B, C, H, W) but got {images.shape}."
+            )
+        batch_size, _, height, width = images.shape
+        heights = torch.full((batch_size,), height, device=images.device)
+        widths = torch.full((batch_size,), width, device=images.device)
+        return _to_float(images), heights, widths
+
+    tensors = [
+        TF.pil_to_tensor(image) if isinstance(image, Image) else image
+        for image in images
+    ]
+    if len(tensors) == 0:
+        raise ValueError("Cannot transform an empty batch of images.")
+    device = tensors[0].device
+    heights = torch.tensor([t.shape[-2] for t in tensors], device=device)
+    widths = torch.tensor([t.shape[-1] for t in tensors], device=device)
+    max_height, max_width = int(heights.max()), int(widths.max())
+    padded = []
+    for t in tensors:
+        t = _to_float(t)
+        if t.shape[-2] != max_height or t.shape[-1] != max_width:
+            pad = (0, max_width - t.shape[-1], 0, max_height - t.shape[-2])
+            t = F.pad(t.unsqueeze(0), pad, mode="replicate").squeeze(0)
+        padded.append(t)
+    return torch.stack(padded), heights, widths
+
+
+def _to_float(images: Tensor) -> Tensor:
+    if images.dtype == torch.uint8:
+        return images.float().div_(255)
+    return images.float()
+
+
+def _uniform(n: int, low: float, high: float, device: torch.device) -> Tensor:
+    return torch.empty(n, device=device).uniform_(low, high)
+
+
+def _random_mask(n: int, prob: float, device: torch.device) -> Tensor:
+    return torch.rand(n, device=device) < prob
+
+
+def _random_resized_crop(
+    images: Tensor,
+    heights: Tensor,
+    widths: Tensor,
+    size: int,
+    scale: Tuple[float, float],
+    ratio: Tuple[float, float],
+    attempts: int = 10,
+) -> Tensor:
+    """Crops a random region of every image and resizes it to size x size.
+
+    The crop parameters follow torchvision.transforms.RandomResizedCrop: up to
+    `attempts` random crops are drawn per image and the first one that fits
+    into the image is used. If none fits, a center crop is used instead.
+
+    """
+    batch_size = images.shape[0]
+    device = images.device
+    heights = heights.float()
+    widths = widths.float()
+    area = (heights * widths)[:, None]
+    target_area = area * torch.empty(batch_size, attempts, device=device).uniform_(
+        *scale
+    )
+    log_ratio = torch.empty(batch_size, attempts, device=device).uniform_(
+        math.log(ratio[0]), math.log(ratio[1])
+    )
+    aspect_ratio = torch.exp(log_ratio)
+    crop_w = torch.round(torch.sqrt(target_area * aspect_ratio))
+    crop_h = torch.round(torch.sqrt(target_area / aspect_ratio))
+    valid = (
+        (crop_w > 0)
+        & (crop_w <= widths[:, None])
+        & (crop_h > 0)
+        & (crop_h <= heights[:, None])
+    )
+    first = valid.int().argmax(dim=1, keepdim=True)
+    crop_w = crop_w.gather(1, first).squeeze(1)
+    crop_h = crop_h.gather(1, first).squeeze(1)
+    top = torch.floor(torch.rand(batch_size, device=device) * (heights - crop_h + 1))
+    left = torch.floor(torch.rand(batch_size, device=device) * (widths - crop_w + 1))
+
+    # Fallback to a center crop with the aspect ratio clamped to ratio.
+    in_ratio = widths / heights
+    center_w = torch.where(in_ratio > ratio[1], torch.round(heights * ratio[1]), widths)
+    center_h = torch.where(in_ratio < ratio[0], torch.round(widths / ratio[0]), heights)
+    has_valid = valid.any(dim=1)
+    crop_w = torch.where(has_valid, crop_w, center_w)
+    crop_h = torch.where(has_valid, crop_h, center_h)
+    top = torch.where(has_valid, top, torch.div(heights - crop_h, 2).floor())
+    left = torch.where(has_valid, left, torch.div(widths - crop_w, 2).floor())
+
+    boxes = torch.stack(
+        [
+            torch.arange(batch_size, device=device, dtype=torch.float),
+            left,
+            top,
+            left + crop_w,
+            top + crop_h,
+        ],
+        dim=1,
+    )
+    # With sampling_ratio=-1 every output pixel averages over all input pixels
+    # it covers which antialiases downscaled crops.
+    return roi_align(
+        images,
+        boxes.to(images.dtype),
+        output_size=size,
+        sampling_ratio=-1,
+        aligned=True,
+    )
+
+
+def _rotate(images: Tensor, angles: Tensor) -> Tensor:
+    """Rotates square images counter-clockwise by angles in degrees.
+
+    Uses nearest interpolation and fills the corners with zeros like
+    torchvision.transforms.functional.rotate.
+
+    """
+    theta = torch.deg2rad(angles)
+    cos, sin = torch.cos(theta), torch.sin(theta)
+    zeros = torch.zeros_like(cos)
+    matrix = torch.stack(
+        [
+            torch.stack([cos, -sin, zeros], dim=1),
+            torch.stack([sin, cos, zeros], dim=1),
+        ],
+        dim=1,
+    )
+    grid = F.affine_grid(matrix, list(images.shape), align_corners=False)
+    return F.grid_sample(
+        images, grid, mode="nearest", padding_mode="zeros", align_corners=False
+    )
+
+
+def _grayscale(images: Tensor) -> Tensor:
+    r, g, b = images.unbind(dim=-3)
+    return (0.299 * r + 0.587 * g + 0.114 * b).unsqueeze(dim=-3)
+
+
+def _blend(images: Tensor, other: Tensor, factors: Tensor) -> Tensor:
+    return torch.lerp(other, images, factors[:, None, None, None]).clamp_(0, 1)
+
+
+def _adjust_brightness(images: Tensor, factors: Tensor) -> Tensor:
+    return (images * factors[:, None, None, None]).clamp_(0, 1)
+
+
+def _adjust_contrast(images: Tensor, factors: Tensor) -> Tensor:
+    mean = _grayscale(images).mean(dim=(-3, -2, -1), keepdim=True)
+    return _blend(images, mean, factors)
+
+
+def _adjust_saturation(images: Tensor, factors: Tensor) -> Tensor:
+    return _blend(images, _grayscale(images), factors)
+
+
+def _adjust_hue(images: Tensor, factors: Tensor) -> Tensor:
+    """Shifts the hue of every image by its factor.
+
+    Equivalent to a round trip through the HSV color space. Only the hue is
+    computed explicitly because saturation and value are unchanged and the
+    chroma max - min is all that is needed to convert back to RGB.
+
+    """
+    r, g, b = images.unbind(dim=-3)
+    maxc, _ = images.max(dim=-3)
+    minc, _ = images.min(dim=-3)
+    chroma = maxc - minc
+    divisor = torch.where(chroma == 0, torch.ones_like(chroma), chroma)
+    # hue in [0, 6) as in the hexagonal HSV model
+    hue = torch.where(
+        maxc == r,
+        (g - b) / divisor,
+        torch.where(maxc == g, 2.0 + (b - r) / divisor, 4.0 + (r - g) / divisor),
+    )
+    hue = hue.add_(6.0 * factors[:, None, None])
+    channels = []
+    for n in (5.0, 3.0, 1.0):
+        k = torch.remainder(hue + n, 6.0)
+        weight = torch.minimum(k, 4.0 - k).clamp_(0.0, 1.0)
+        channels.append(maxc - chroma * weight)
+    return torch.stack(channels, dim=-3)
+
+
+def _color_jitter(
+    images: Tensor,
+    brightness: float,
+    contrast: float,
+    saturation: float,
+    hue: float,
+) -> Tensor:
+    """Applies color jitter with random factors and a random order of the
+    adjustments for every image."""
+    n = images.shape[0]
+    device = images.device
+    adjustments = []
+    if brightness > 0:
+        factors = _uniform(n, max(0.0, 1 - brightness), 1 + brightness, device)
+        adjustments.append((_adjust_brightness, factors))
+    if contrast > 0:
+        factors = _uniform(n, max(0.0, 1 - contrast), 1 + contrast, device)
+        adjustments.append((_adjust_contrast, factors))
+    if saturation > 0:
+        factors = _uniform(n, max(0.0, 1 - saturation), 1 + saturation, device)
+        adjustments.append((_adjust_saturation, factors))
+    if hue > 0:
+        factors = _uniform(n, -hue, hue, device)
+        adjustments.append((_adjust_hue, factors))
+    if not adjustments:
+        return images
+
+    # order[i, step] is the index of the adjustment applied to image i at step
+    order = torch.rand(n, len(adjustments), device=device).argsort(dim=1)
+    images = images.clone()
+    for step in range(len(adjustments)):
+        for index, (adjust, factors) in enumerate(adjustments):
+            mask = order[:, step] == index
+            if mask.any():
+                images[mask] = adjust(images[mask], factors[mask])
+    return images
+
+
+def _gaussian_blur(images: Tensor, sigmas: Tensor) -> Tensor:
+    """Blurs every image with a Gaussian kernel with its own standard
+    deviation."""
+    n, channels, height, width = images.shape
+    radius = max(1, math.ceil(3 * float(sigmas.max())))
+    offsets = torch.arange(-radius, radius + 1, device=images.device)
+    kernels = torch.exp(-0.5 * (offsets[None, :] / sigmas[:, None]) ** 2)
+    kernels = kernels / kernels.sum(dim=1, keepdim=True)
+    kernels = kernels.to(images.dtype).repeat_interleave(channels, dim=0)
+
+    # Blur all images and channels with a single grouped convolution per axis.
+    x = images.reshape(1, n * channels, height, width)
+    x = F.pad(x, (radius, radius, radius, radius), mode="replicate")
+    x = F.conv2d(x, kernels[:, None, None, :], groups=n * channels)
+    x = F.conv2d(x, kernels[:, None, :, None], groups=n * channels)
+    return x.reshape(n, channels, height, width)
+
+
+def _solarize(images: Tensor, threshold: float = 128 / 255) -> Tensor:
+    return torch.where(images >= threshold, 1.0 - images, images)
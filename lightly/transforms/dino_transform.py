@@ -6,10 +6,10 @@ from PIL.Image import Image
 from torch import Tensor
 
 from lightly.transforms.gaussian_blur import GaussianBlur
-from lightly.transforms.multi_view_transform import MultiViewTransform
+from lightly.transforms.multi_view_transform import MultiViewTransform, get_working_size
 from lightly.transforms.rotation import random_rotation_transform
 from lightly.transforms.solarize import RandomSolarization
-from lightly.transforms.utils import IMAGENET_NORMALIZE
+from lightly.transforms.utils import IMAGENET_NORMALIZE, to_tensor_and_normalize
 
 
 class DINOTransform(MultiViewTransform):
@@ -76,6 +76,14 @@ class DINOTransform(MultiViewTransform):
             Probability to apply solarization on the second global view.
         normalize:
             Dictionary with 'mean' and 'std' for torchvision.transforms.Normalize.
+        output_uint8:
+            If True, returns uint8 tensors which must be normalized with
+            Uint8Normalize on the device.
+        resize_once:
+            If True, the image is downsampled once to the smallest resolution
+            at which no global or local crop has to be upsampled before the
+            crops are created. This makes creating many crops of large images
+            much faster.
 
     """
 
@@ -103,6 +111,8 @@ class DINOTransform(MultiViewTransform):
         sigmas: Tuple[float, float] = (0.1, 2),
         solarization_prob: float = 0.2,
         normalize: Union[None, dict] = IMAGENET_NORMALIZE,
+        output_uint8: bool = False,
+        resize_once: bool = False,
     ):
         # first global crop
         global_transform_0 = DINOViewTransform(
@@ -125,6 +135,7 @@ class DINOTransform(MultiViewTransform):
             sigmas=sigmas,
             solarization_prob=0,
             normalize=normalize,
+            output_uint8=output_uint8,
         )
 
         # second global crop
@@ -147,6 +158,7 @@ class DINOTransform(MultiViewTransform):
             sigmas=sigmas,
             solarization_prob=solarization_prob,
             normalize=normalize,
+            output_uint8=output_uint8,
         )
 
         # transformation for the local small crops
@@ -170,11 +182,18 @@ class DINOTransform(MultiViewTransform):
             sigmas=sigmas,
             solarization_prob=0,
             normalize=normalize,
+            output_uint8=output_uint8,
         )
         local_transforms = [local_transform] * n_local_views
         transforms = [global_transform_0, global_transform_1]
         transforms.extend(local_transforms)
-        super().__init__(transforms)
+        working_size = None
+        if resize_once:
+            working_size = get_working_size(
+                crop_sizes=(global_crop_size, local_crop_size),
+                crop_min_scales=(global_crop_scale[0], local_crop_scale[0]),
+            )
+        super().__init__(transforms, working_size=working_size)
 
 
 class DINOViewTransform:
@@ -199,6 +218,7 @@ class DINOViewTransform:
         sigmas: Tuple[float, float] = (0.1, 2),
         solarization_prob: float = 0.2,
         normalize: Union[None, dict] = IMAGENET_NORMALIZE,
+        output_uint8: bool = False,
     ):
         transform = [
             T.RandomResizedCrop(
@@ -228,11 +248,10 @@ class DINOViewTransform:
                 prob=gaussian_blur,
             ),
             RandomSolarization(prob=solarization_prob),
-            T.ToTensor(),
         ]
-
-        if normalize:
-            transform += [T.Normalize(mean=normalize["mean"], std=normalize["std"])]
+        transform += to_tensor_and_normalize(
+            normalize=normalize, output_uint8=output_uint8
+        )
         self.transform = T.Compose(transform)
 
     def __call__(self, image: Union[Tensor, Image]) -> Tensor:
@@ -53,6 +53,9 @@ class FastSiamTransform(MultiViewTransform):
             [-rr_degrees, +rr_degrees]. All rotations are counter-clockwise.
         normalize:
             Dictionary with 'mean' and 'std' for torchvision.transforms.Normalize.
+        output_uint8:
+            If True, returns uint8 tensors which must be normalized with
+            Uint8Normalize on the device.
 
     """
 
@@ -76,6 +79,7 @@ class FastSiamTransform(MultiViewTransform):
         rr_prob: float = 0.0,
         rr_degrees: Union[None, float, Tuple[float, float]] = None,
         normalize: Union[None, dict] = IMAGENET_NORMALIZE,
+        output_uint8: bool = False,
     ):
         transforms = [
             SimSiamViewTransform(
@@ -96,6 +100,7 @@ class FastSiamTransform(MultiViewTransform):
                 rr_prob=rr_prob,
                 rr_degrees=rr_degrees,
                 normalize=normalize,
+                output_uint8=output_uint8,
             )
             for _ in range(num_views)
         ]
@@ -5,7 +5,7 @@ from PIL.Image import Image
 from torch import Tensor
 
 from lightly.transforms.multi_view_transform import MultiViewTransform
-from lightly.transforms.utils import IMAGENET_NORMALIZE
+from lightly.transforms.utils import IMAGENET_NORMALIZE, to_tensor_and_normalize
 
 
 class MAETransform:
@@ -20,6 +20,9 @@ class MAETransform:
             Minimum size of the randomized crop relative to the input_size.
         normalize:
             Dictionary with 'mean' and 'std' for torchvision.transforms.Normalize.
+        output_uint8:
+            If True, returns uint8 tensors which must be normalized with
+            Uint8Normalize on the device.
 
     """
 
@@ -28,16 +31,17 @@ class MAETransform:
         input_size: Union[int, Tuple[int, int]] = 224,
         min_scale: float = 0.2,
         normalize: dict = IMAGENET_NORMALIZE,
+        output_uint8: bool = False,
     ):
         transforms = [
             T.RandomResizedCrop(
                 input_size, scale=(min_scale, 1.0), interpolation=3
             ),  # 3 is bicubic
             T.RandomHorizontalFlip(),
-            T.ToTensor(),
         ]
-        if normalize:
-            transforms.append(T.Normalize(mean=normalize["mean"], std=normalize["std"]))
+        transforms += to_tensor_and_normalize(
+            normalize=normalize, output_uint8=output_uint8
+        )
 
         self.transform = T.Compose(transforms)
 
@@ -49,6 +49,9 @@ class MoCoV1Transform(SimCLRTransform):
             [-rr_degrees, +rr_degrees]. All rotations are counter-clockwise.
         normalize:
             Dictionary with 'mean' and 'std' for torchvision.transforms.Normalize.
+        output_uint8:
+            If True, returns uint8 tensors which must be normalized with
+            Uint8Normalize on the device.
 
     """
 
@@ -71,6 +74,7 @@ class MoCoV1Transform(SimCLRTransform):
         rr_prob: float = 0.0,
         rr_degrees: Union[None, float, Tuple[float, float]] = None,
         normalize: dict = IMAGENET_NORMALIZE,
+        output_uint8: bool = False,
     ):
         super().__init__(
             input_size=input_size,
@@ -90,6 +94,7 @@ class MoCoV1Transform(SimCLRTransform):
             rr_prob=rr_prob,
             rr_degrees=rr_degrees,
             normalize=normalize,
+            output_uint8=output_uint8,
         )
 
 
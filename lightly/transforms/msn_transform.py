@@ -6,7 +6,7 @@ from torch import Tensor
 
 from lightly.transforms.gaussian_blur import GaussianBlur
 from lightly.transforms.multi_view_transform import MultiViewTransform
-from lightly.transforms.utils import IMAGENET_NORMALIZE
+from lightly.transforms.utils import IMAGENET_NORMALIZE, to_tensor_and_normalize
 
 
 class MSNTransform(MultiViewTransform):
@@ -60,6 +60,9 @@ class MSNTransform(MultiViewTransform):
             Probability that vertical flip is applied.
         normalize:
             Dictionary with 'mean' and 'std' for torchvision.transforms.Normalize.
+        output_uint8:
+            If True, returns uint8 tensors which must be normalized with
+            Uint8Normalize on the device.
     """
 
     def __init__(
@@ -83,6 +86,7 @@ class MSNTransform(MultiViewTransform):
         hf_prob: float = 0.5,
         vf_prob: float = 0.0,
         normalize: dict = IMAGENET_NORMALIZE,
+        output_uint8: bool = False,
     ):
         random_view_transform = MSNViewTransform(
             crop_size=random_size,
@@ -100,6 +104,7 @@ class MSNTransform(MultiViewTransform):
             hf_prob=hf_prob,
             vf_prob=vf_prob,
             normalize=normalize,
+            output_uint8=output_uint8,
         )
         focal_view_transform = MSNViewTransform(
             crop_size=focal_size,
@@ -113,6 +118,7 @@ class MSNTransform(MultiViewTransform):
             hf_prob=hf_prob,
             vf_prob=vf_prob,
             normalize=normalize,
+            output_uint8=output_uint8,
         )
         transforms = [random_view_transform] * random_views
         transforms += [focal_view_transform] * focal_views
@@ -137,6 +143,7 @@ class MSNViewTransform:
         hf_prob: float = 0.5,
         vf_prob: float = 0.0,
         normalize: dict = IMAGENET_NORMALIZE,
+        output_uint8: bool = False,
     ):
         color_jitter = T.ColorJitter(
             brightness=cj_strength * cj_bright,
@@ -151,9 +158,10 @@ class MSNViewTransform:
             T.RandomApply([color_jitter], p=cj_prob),
             T.RandomGrayscale(p=random_gray_scale),
             GaussianBlur(kernel_size=kernel_size, sigmas=sigmas, prob=gaussian_blur),
-            T.ToTensor(),
-            T.Normalize(mean=normalize["mean"], std=normalize["std"]),
         ]
+        transform += to_tensor_and_normalize(
+            normalize=normalize, output_uint8=output_uint8
+        )
 
         self.transform = T.Compose(transform)
 
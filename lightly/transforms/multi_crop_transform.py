@@ -2,7 +2,7 @@ from typing import Tuple
 
 import torchvision.transforms as T
 
-from lightly.transforms.multi_view_transform import MultiViewTransform
+from lightly.transforms.multi_view_transform import MultiViewTransform, get_working_size
 
 
 class MultiCropTranform(MultiViewTransform):
@@ -19,6 +19,10 @@ class MultiCropTranform(MultiViewTransform):
             Max_scales for each crop category.
         transforms:
             Transforms which are applied to all crops.
+        resize_once:
+            If True, the image is downsampled once to the smallest resolution
+            at which no crop has to be upsampled before the crops are created.
+            This makes creating many crops of large images much faster.
 
     """
 
@@ -29,6 +33,7 @@ class MultiCropTranform(MultiViewTransform):
         crop_min_scales: Tuple[float],
         crop_max_scales: Tuple[float],
         transforms,
+        resize_once: bool = False,
     ):
         if len(crop_sizes) != len(crop_counts):
             raise ValueError(
@@ -63,4 +68,7 @@ class MultiCropTranform(MultiViewTransform):
                 ]
                 * crop_counts[i]
             )
-        super().__init__(crop_transforms)
+        working_size = (
+            get_working_size(crop_sizes, crop_min_scales) if resize_once else None
+        )
+        super().__init__(crop_transforms, working_size=working_size)
@@ -1,8 +1,13 @@
-from typing import List, Union
+import math
+from typing import List, Optional, Sequence, Tuple, Union
 
+import torchvision.transforms.functional as TF
+from PIL import Image as PILImage
 from PIL.Image import Image
 from torch import Tensor
 
+from lightly.transforms.seeded_rng import derive_seed, get_sample_seed, seeded_rng
+
 
 class MultiViewTransform:
     """Transforms an image into multiple views.
@@ -10,16 +15,25 @@ class MultiViewTransform:
     Args:
         transforms:
             A sequence of transforms. Every transform creates a new view.
+        working_size:
+            If not None, images whose shorter side is larger than working_size
+            are downsampled once such that their shorter side is working_size
+            before the views are created. All views are then cropped from the
+            same downsampled image which is much faster than transforming the
+            full resolution image for every view. See get_working_size.
 
     """
 
-    def __init__(self, transforms):
+    def __init__(self, transforms, working_size: Optional[int] = None):
         self.transforms = transforms
+        self.working_size = working_size
 
     def __call__(self, image: Union[Tensor, Image]) -> Union[List[Tensor], List[Image]]:
         """Transforms an image into multiple views.
 
-        Every transform in self.transforms creates a new view.
+        Every transform in self.transforms creates a new view. If the image
+        is transformed inside a sample_rng context, every view is created with
+        its own seed derived from the sample seed and the index of the view.
 
         Args:
             image:
@@ -29,4 +43,61 @@ class MultiViewTransform:
             List of views.
 
         """
-        return [transform(image) for transform in self.transforms]
+        if self.working_size is not None:
+            image = _downsample(image, self.working_size)
+        sample_seed = get_sample_seed()
+        if sample_seed is None:
+            return [transform(image) for transform in self.transforms]
+        views = []
+        for view_index, transform in enumerate(self.transforms):
+            with seeded_rng(derive_seed(sample_seed, view_index)):
+                views.append(transform(image))
+        return views
+
+
+def get_working_size(
+    crop_sizes: Sequence[int],
+    crop_min_scales: Sequence[float],
+    crop_ratio: Tuple[float, float] = (3.0 / 4.0, 4.0 / 3.0),
+) -> int:
+    """Returns the smallest size of the shorter image side at which no random
+    resized crop has to be upsampled.
+
+    A crop with scale s and aspect ratio r of an image with shorter side S has
+    a shorter side of at least sqrt(s * min(r, 1 / r)) * S pixels.
+
+    Args:
+        crop_sizes:
+            Output size of the crops for each crop category.
+        crop_min_scales:
+            Min scales of the crops for each crop category.
+        crop_ratio:
+            Range of aspect ratios of the crops.
+
+    Returns:
+        The working size in pixels.
+
+    """
+    min_ratio = min(crop_ratio[0], 1.0 / crop_ratio[1])
+    return max(
+        math.ceil(size / math.sqrt(min_scale * min_ratio))
+        for size, min_scale in zip(crop_sizes, crop_min_scales)
+    )
+
+
+def _downsample(image: Union[Tensor, Image], size: int) -> Union[Tensor, Image]:
+    """Downsamples the image such that its shorter side is size. Images which
+    are already small enough are returned unchanged."""
+    if isinstance(image, Image):
+        width, height = image.size
+    else:
+        height, width = image.shape[-2:]
+    if min(width, height) <= size:
+        return image
+    scale = size / min(width, height)
+    new_size = (max(size, round(width * scale)), max(size, round(height * scale)))
+    if isinstance(image, Image):
+        # reducing_gap first shrinks the image by an integer factor which is
+        # much faster for large images and has almost no effect on quality.
+        return image.resize(new_size, PILImage.BILINEAR, reducing_gap=2.0)
+    return TF.resize(image, [new_size[1], new_size[0]], antialias=True)
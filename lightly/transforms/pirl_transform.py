@@ -7,7 +7,7 @@ from torch import Tensor
 from lightly.transforms.jigsaw import Jigsaw
 from lightly.transforms.multi_view_transform import MultiViewTransform
 from lightly.transforms.rotation import random_rotation_transform
-from lightly.transforms.utils import IMAGENET_NORMALIZE
+from lightly.transforms.utils import IMAGENET_NORMALIZE, to_tensor_and_normalize
 
 
 class PIRLTransform(MultiViewTransform):
@@ -42,6 +42,9 @@ class PIRLTransform(MultiViewTransform):
             Sqrt of the number of grids in the jigsaw image.
         normalize:
             Dictionary with 'mean' and 'std' for torchvision.transforms.Normalize.
+        output_uint8:
+            If True, returns uint8 tensors which must be normalized with
+            Uint8Normalize on the device.
 
     """
 
@@ -59,6 +62,7 @@ class PIRLTransform(MultiViewTransform):
         hf_prob: float = 0.5,
         n_grid: int = 3,
         normalize: Union[None, dict] = IMAGENET_NORMALIZE,
+        output_uint8: bool = False,
     ):
         if isinstance(input_size, tuple):
             input_size_ = max(input_size)
@@ -69,8 +73,9 @@ class PIRLTransform(MultiViewTransform):
         no_augment = T.Compose(
             [
                 T.RandomResizedCrop(size=input_size, scale=(min_scale, 1.0)),
-                T.ToTensor(),
-                T.Normalize(mean=normalize["mean"], std=normalize["std"]),
+                *to_tensor_and_normalize(
+                    normalize=normalize, output_uint8=output_uint8
+                ),
             ]
         )
 
@@ -86,11 +91,10 @@ class PIRLTransform(MultiViewTransform):
             T.RandomHorizontalFlip(p=hf_prob),
             T.RandomApply([color_jitter], p=cj_prob),
             T.RandomGrayscale(p=random_gray_scale),
-            T.ToTensor(),
         ]
-
-        if normalize:
-            transform += [T.Normalize(mean=normalize["mean"], std=normalize["std"])]
+        transform += to_tensor_and_normalize(
+            normalize=normalize, output_uint8=output_uint8
+        )
 
         jigsaw = Jigsaw(
             n_grid=n_grid,
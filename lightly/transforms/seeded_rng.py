@@ -0,0 +1,102 @@
+""" Seeded Random Number Generators for Augmentations """
+
+# Copyright (c) 2023. Lightly AG and its affiliates.
+# All Rights Reserved
+
+import random
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+import numpy as np
+import torch
+
+# Seed of the sample that is currently transformed in this process or None if
+# the augmentations use the global random state.
+_sample_seed: Optional[int] = None
+
+
+def derive_seed(*keys: int) -> int:
+    """Derives a 32 bit seed from a sequence of non-negative integers.
+
+    Seeds derived from different keys are statistically independent, unlike
+    for example seed + index.
+
+    Args:
+        keys:
+            Integers from which the seed is derived, for example
+            (seed, epoch, index, view).
+
+    Returns:
+        The derived seed.
+
+    """
+    return int(np.random.SeedSequence(keys).generate_state(1)[0])
+
+
+def get_sample_seed() -> Optional[int]:
+    """Returns the seed of the sample that is currently transformed or None
+    if no sample_rng context is active."""
+    return _sample_seed
+
+
+@contextmanager
+def seeded_rng(seed: int) -> Iterator[None]:
+    """Seeds the torch (CPU), numpy, and python random number generators and
+    restores their previous states on exit.
+
+    All transforms in lightly and torchvision draw their random parameters from
+    these generators. Transforms applied inside the context are therefore
+    deterministic without changing the random state outside of it.
+
+    Args:
+        seed:
+            Seed for the random number generators.
+
+    """
+    torch_state = torch.get_rng_state()
+    numpy_state = np.random.get_state()
+    python_state = random.getstate()
+    torch.default_generator.manual_seed(seed)
+    np.random.seed(seed)
+    random.seed(seed)
+    try:
+        yield
+    finally:
+        torch.set_rng_state(torch_state)
+        np.random.set_state(numpy_state)
+        random.setstate(python_state)
+
+
+@contextmanager
+def sample_rng(seed: int, epoch: int, index: int) -> Iterator[None]:
+    """Makes the augmentations of a sample deterministic.
+
+    The random number generators are seeded with a seed derived from seed,
+    epoch, and index. MultiViewTransform additionally derives a separate seed
+    for every view from the sample seed. The views of a sample are therefore
+    independent of the number of views and of the order in which the samples
+    are loaded, for example by different dataloader workers.
+
+    Args:
+        seed:
+            Base seed, for example of the experiment.
+        epoch:
+            Current epoch.
+        index:
+            Index of the sample in the dataset.
+
+    Examples:
+        >>> transform = SimCLRTransform()
+        >>> with sample_rng(seed=0, epoch=0, index=42):
+        >>>     views = transform(image)
+        >>> # views are the same in every run
+
+    """
+    global _sample_seed
+    previous_sample_seed = _sample_seed
+    _sample_seed = derive_seed(seed, epoch, index)
+    try:
+        with seeded_rng(_sample_seed):
+            yield
+    finally:
+        _sample_seed = previous_sample_seed
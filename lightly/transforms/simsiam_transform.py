@@ -7,7 +7,7 @@ from torch import Tensor
 from lightly.transforms.gaussian_blur import GaussianBlur
 from lightly.transforms.multi_view_transform import MultiViewTransform
 from lightly.transforms.rotation import random_rotation_transform
-from lightly.transforms.utils import IMAGENET_NORMALIZE
+from lightly.transforms.utils import IMAGENET_NORMALIZE, to_tensor_and_normalize
 
 
 class SimSiamTransform(MultiViewTransform):
@@ -56,6 +56,9 @@ class SimSiamTransform(MultiViewTransform):
             [-rr_degrees, +rr_degrees]. All rotations are counter-clockwise.
         normalize:
             Dictionary with 'mean' and 'std' for torchvision.transforms.Normalize.
+        output_uint8:
+            If True, returns uint8 tensors which must be normalized with
+            Uint8Normalize on the device.
 
     """
 
@@ -78,6 +81,7 @@ class SimSiamTransform(MultiViewTransform):
         rr_prob: float = 0.0,
         rr_degrees: Union[None, float, Tuple[float, float]] = None,
         normalize: Union[None, dict] = IMAGENET_NORMALIZE,
+        output_uint8: bool = False,
     ):
         view_transform = SimSiamViewTransform(
             input_size=input_size,
@@ -97,6 +101,7 @@ class SimSiamTransform(MultiViewTransform):
             rr_prob=rr_prob,
             rr_degrees=rr_degrees,
             normalize=normalize,
+            output_uint8=output_uint8,
         )
         super().__init__(transforms=[view_transform, view_transform])
 
@@ -121,6 +126,7 @@ class SimSiamViewTransform:
         rr_prob: float = 0.0,
         rr_degrees: Union[None, float, Tuple[float, float]] = None,
         normalize: Union[None, dict] = IMAGENET_NORMALIZE,
+        output_uint8: bool = False,
     ):
         color_jitter = T.ColorJitter(
             brightness=cj_strength * cj_bright,
@@ -137,10 +143,10 @@ class SimSiamViewTransform:
             T.RandomApply([color_jitter], p=cj_prob),
             T.RandomGrayscale(p=random_gray_scale),
             GaussianBlur(kernel_size=kernel_size, sigmas=sigmas, prob=gaussian_blur),
-            T.ToTensor(),
         ]
-        if normalize:
-            transform += [T.Normalize(mean=normalize["mean"], std=normalize["std"])]
+        transform += to_tensor_and_normalize(
+            normalize=normalize, output_uint8=output_uint8
+        )
         self.transform = T.Compose(transform)
 
     def __call__(self, image: Union[Tensor, Image]) -> Tensor:
@@ -7,7 +7,7 @@ from torch import Tensor
 from lightly.transforms.gaussian_blur import GaussianBlur
 from lightly.transforms.multi_view_transform import MultiViewTransform
 from lightly.transforms.solarize import RandomSolarization
-from lightly.transforms.utils import IMAGENET_NORMALIZE
+from lightly.transforms.utils import IMAGENET_NORMALIZE, to_tensor_and_normalize
 
 
 class SMoGTransform(MultiViewTransform):
@@ -49,6 +49,9 @@ class SMoGTransform(MultiViewTransform):
             Probability of conversion to grayscale.
         normalize:
             Dictionary with 'mean' and 'std' for torchvision.transforms.Normalize.
+        output_uint8:
+            If True, returns uint8 tensors which must be normalized with
+            Uint8Normalize on the device.
 
     """
 
@@ -74,6 +77,7 @@ class SMoGTransform(MultiViewTransform):
         cj_hue: float = 0.2,
         random_gray_scale: float = 0.2,
         normalize: Union[None, dict] = IMAGENET_NORMALIZE,
+        output_uint8: bool = False,
     ):
         transforms = []
         for i in range(len(crop_sizes)):
@@ -96,6 +100,7 @@ class SMoGTransform(MultiViewTransform):
                         cj_hue=cj_hue,
                         random_gray_scale=random_gray_scale,
                         normalize=normalize,
+                        output_uint8=output_uint8,
                     )
                 ]
                 * crop_counts[i]
@@ -123,6 +128,7 @@ class SmoGViewTransform:
         cj_hue: float = 0.2,
         random_gray_scale: float = 0.2,
         normalize: Union[None, dict] = IMAGENET_NORMALIZE,
+        output_uint8: bool = False,
     ):
         color_jitter = T.ColorJitter(
             brightness=cj_strength * cj_bright,
@@ -142,10 +148,10 @@ class SmoGViewTransform:
                 sigmas=sigmas,
             ),
             RandomSolarization(prob=solarize_prob),
-            T.ToTensor(),
         ]
-        if normalize:
-            transform += [T.Normalize(mean=normalize["mean"], std=normalize["std"])]
+        transform += to_tensor_and_normalize(
+            normalize=normalize, output_uint8=output_uint8
+        )
         self.transform = T.Compose(transform)
 
     def __call__(self, image: Union[Tensor, Image]) -> Tensor:
@@ -7,7 +7,7 @@ from torch import Tensor
 from lightly.transforms.gaussian_blur import GaussianBlur
 from lightly.transforms.multi_crop_transform import MultiCropTranform
 from lightly.transforms.rotation import random_rotation_transform
-from lightly.transforms.utils import IMAGENET_NORMALIZE
+from lightly.transforms.utils import IMAGENET_NORMALIZE, to_tensor_and_normalize
 
 
 class SwaVTransform(MultiCropTranform):
@@ -59,6 +59,13 @@ class SwaVTransform(MultiCropTranform):
             Is ignored if `kernel_size` is set.
         normalize:
             Dictionary with 'mean' and 'std' for torchvision.transforms.Normalize.
+        output_uint8:
+            If True, returns uint8 tensors which must be normalized with
+            Uint8Normalize on the device.
+        resize_once:
+            If True, the image is downsampled once to the smallest resolution
+            at which no crop has to be upsampled before the crops are created.
+            This makes creating many crops of large images much faster.
 
     """
 
@@ -83,6 +90,8 @@ class SwaVTransform(MultiCropTranform):
         kernel_size: Optional[float] = None,
         sigmas: Tuple[float, float] = (0.1, 2),
         normalize: Union[None, dict] = IMAGENET_NORMALIZE,
+        output_uint8: bool = False,
+        resize_once: bool = False,
     ):
         transforms = SwaVViewTransform(
             hf_prob=hf_prob,
@@ -100,6 +109,7 @@ class SwaVTransform(MultiCropTranform):
             kernel_size=kernel_size,
             sigmas=sigmas,
             normalize=normalize,
+            output_uint8=output_uint8,
         )
 
         super().__init__(
@@ -108,6 +118,7 @@ class SwaVTransform(MultiCropTranform):
             crop_min_scales=crop_min_scales,
             crop_max_scales=crop_max_scales,
             transforms=transforms,
+            resize_once=resize_once,
         )
 
 
@@ -129,6 +140,7 @@ class SwaVViewTransform:
         kernel_size: Optional[float] = None,
         sigmas: Tuple[float, float] = (0.1, 2),
         normalize: Union[None, dict] = IMAGENET_NORMALIZE,
+        output_uint8: bool = False,
     ):
         color_jitter = T.ColorJitter(
             brightness=cj_strength * cj_bright,
@@ -145,10 +157,10 @@ class SwaVViewTransform:
             T.RandomApply([color_jitter], p=cj_prob),
             T.RandomGrayscale(p=random_gray_scale),
             GaussianBlur(kernel_size=kernel_size, sigmas=sigmas, prob=gaussian_blur),
-            T.ToTensor(),
         ]
-        if normalize:
-            transforms += [T.Normalize(mean=normalize["mean"], std=normalize["std"])]
+        transforms += to_tensor_and_normalize(
+            normalize=normalize, output_uint8=output_uint8
+        )
 
         self.transform = T.Compose(transforms)
 
@@ -0,0 +1,76 @@
+""" Normalization of uint8 Images """
+
+# Copyright (c) 2023. Lightly AG and its affiliates.
+# All Rights Reserved
+
+from typing import Union
+
+import torch
+import torch.nn as nn
+from torch import Tensor
+
+from lightly.transforms.utils import IMAGENET_NORMALIZE
+
+
+class Uint8Normalize(nn.Module):
+    """Converts uint8 images into normalized float images.
+
+    Counterpart of the output_uint8 option of the transforms. The transforms
+    return uint8 tensors which are four times smaller than float tensors and
+    are therefore faster to send from the dataloader workers to the main
+    process and to the GPU. This module converts them into floats and
+    normalizes them on the device, for example as the first layer of the
+    backbone.
+
+    Float tensors are returned unchanged as they are assumed to be already
+    normalized. This makes it possible to use the same backbone with
+    dataloaders which return float tensors, for example for evaluation.
+
+    Attributes:
+        normalize:
+            Dictionary with 'mean' and 'std' as used by
+            torchvision.transforms.Normalize for images with values in [0, 1].
+            If None, the images are only scaled to [0, 1].
+
+    Examples:
+        >>> transform = SimCLRTransform(output_uint8=True)
+        >>> dataset = LightlyDataset('path/to/images/', transform=transform)
+        >>>
+        >>> backbone = nn.Sequential(
+        >>>     Uint8Normalize(),
+        >>>     *list(torchvision.models.resnet18().children())[:-1],
+        >>> )
+        >>> model = SimCLR(backbone).to('cuda')
+        >>> for (x0, x1), _, _ in dataloader:
+        >>>     # x0 and x1 are uint8 tensors
+        >>>     z0 = model(x0.to('cuda', non_blocking=True))
+
+    """
+
+    def __init__(self, normalize: Union[None, dict] = IMAGENET_NORMALIZE):
+        super().__init__()
+        if normalize:
+            mean = torch.tensor(normalize["mean"], dtype=torch.float)
+            std = torch.tensor(normalize["std"], dtype=torch.float)
+        else:
+            mean = torch.zeros(1)
+            std = torch.ones(1)
+        # (x / 255 - mean) / std is computed as x * scale - shift.
+        self.register_buffer("scale", (1.0 / (255.0 * std)).view(-1, 1, 1))
+        self.register_buffer("shift", (mean / std).view(-1, 1, 1))
+
+    def forward(self, images: Tensor) -> Tensor:
+        """Converts and normalizes the images.
+
+        Args:
+            images:
+                uint8 tensor with shape (..., C, H, W) and values in [0, 255].
+
+        Returns:
+            The normalized images as float tensor. Float inputs are returned
+            unchanged.
+
+        """
+        if images.is_floating_point():
+            return images
+        return images.to(self.scale.dtype).mul_(self.scale).sub_(self.shift)
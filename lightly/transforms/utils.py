@@ -1 +1,31 @@
+from typing import Callable, List, Optional
+
+import torchvision.transforms as T
+
 IMAGENET_NORMALIZE = {"mean": [0.485, 0.456, 0.406], "std": [0.229, 0.224, 0.225]}
+
+
+def to_tensor_and_normalize(
+    normalize: Optional[dict], output_uint8: bool = False
+) -> List[Callable]:
+    """Returns the transforms which convert a PIL image into a tensor.
+
+    Args:
+        normalize:
+            Dictionary with 'mean' and 'std' for torchvision.transforms.Normalize.
+            The image is not normalized if normalize is None.
+        output_uint8:
+            If True, the image is converted into a uint8 tensor with values in
+            [0, 255] and normalize is ignored. Use Uint8Normalize to normalize
+            the images on the device instead.
+
+    Returns:
+        List of transforms.
+
+    """
+    if output_uint8:
+        return [T.PILToTensor()]
+    transforms = [T.ToTensor()]
+    if normalize:
+        transforms.append(T.Normalize(mean=normalize["mean"], std=normalize["std"]))
+    return transforms
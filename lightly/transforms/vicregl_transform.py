@@ -8,7 +8,7 @@ from lightly.transforms.gaussian_blur import GaussianBlur
 from lightly.transforms.image_grid_transform import ImageGridTransform
 from lightly.transforms.random_crop_and_flip_with_grid import RandomResizedCropAndFlip
 from lightly.transforms.solarize import RandomSolarization
-from lightly.transforms.utils import IMAGENET_NORMALIZE
+from lightly.transforms.utils import IMAGENET_NORMALIZE, to_tensor_and_normalize
 
 
 class VICRegLTransform(ImageGridTransform):
@@ -79,6 +79,9 @@ class VICRegLTransform(ImageGridTransform):
             Probability of conversion to grayscale.
         normalize:
             Dictionary with mean and standard deviation for normalization.
+        output_uint8:
+            If True, returns uint8 tensors which must be normalized with
+            Uint8Normalize on the device.
     """
 
     def __init__(
@@ -108,6 +111,7 @@ class VICRegLTransform(ImageGridTransform):
         cj_hue: float = 0.2,
         random_gray_scale: float = 0.2,
         normalize: Union[None, dict] = IMAGENET_NORMALIZE,
+        output_uint8: bool = False,
     ):
         global_transform = (
             RandomResizedCropAndFlip(
@@ -130,6 +134,7 @@ class VICRegLTransform(ImageGridTransform):
                 cj_hue=cj_hue,
                 random_gray_scale=random_gray_scale,
                 normalize=normalize,
+                output_uint8=output_uint8,
             ),
         )
         local_transform = (
@@ -149,6 +154,7 @@ class VICRegLTransform(ImageGridTransform):
                 cj_strength=cj_strength,
                 random_gray_scale=random_gray_scale,
                 normalize=normalize,
+                output_uint8=output_uint8,
             ),
         )
 
@@ -173,6 +179,7 @@ class VICRegLViewTransform:
         cj_hue: float = 0.2,
         random_gray_scale: float = 0.2,
         normalize: Union[None, dict] = IMAGENET_NORMALIZE,
+        output_uint8: bool = False,
     ):
         color_jitter = T.ColorJitter(
             brightness=cj_strength * cj_bright,
@@ -190,10 +197,10 @@ class VICRegLViewTransform:
                 sigmas=gaussian_blur_sigmas,
             ),
             RandomSolarization(prob=solarize_prob),
-            T.ToTensor(),
         ]
-        if normalize:
-            transforms += [T.Normalize(mean=normalize["mean"], std=normalize["std"])]
+        transforms += to_tensor_and_normalize(
+            normalize=normalize, output_uint8=output_uint8
+        )
         self.transform = T.Compose(transforms=transforms)
 
     def __call__(self, image: Union[Tensor, Image]) -> Tensor:
@@ -5,14 +5,23 @@
 
 import csv
 import json
+import os
 import re
 from itertools import compress
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
 import numpy as np
 
 INVALID_FILENAME_CHARACTERS = [","]
 
+# Embeddings stored in the binary format are saved as a float32 .npy matrix
+# next to a small csv sidecar file holding the filenames and labels.
+BINARY_EMBEDDINGS_EXTENSION = ".npy"
+BINARY_EMBEDDINGS_SIDECAR_SUFFIX = ".filenames.csv"
+
+# Number of rows which are parsed at once when reading embeddings csv files.
+DEFAULT_EMBEDDINGS_CHUNK_SIZE = 4096
+
 
 def _is_valid_filename(filename: str) -> bool:
     """Returns False if the filename is misformatted."""
@@ -35,6 +44,16 @@ def check_filenames(filenames: List[str]):
         raise ValueError(f"Invalid filename(s): {invalid_filenames}")
 
 
+def is_binary_embeddings_path(path: str) -> bool:
+    """Returns True if the path points to embeddings in the binary format."""
+    return path.endswith(BINARY_EMBEDDINGS_EXTENSION)
+
+
+def _get_binary_embeddings_sidecar_path(path: str) -> str:
+    """Returns the path of the filenames and labels sidecar of binary embeddings."""
+    return path[: -len(BINARY_EMBEDDINGS_EXTENSION)] + BINARY_EMBEDDINGS_SIDECAR_SUFFIX
+
+
 def check_embeddings(path: str, remove_additional_columns: bool = False):
     """Raises an error if the embeddings csv file has not the correct format
 
@@ -43,6 +62,10 @@ def check_embeddings(path: str, remove_additional_columns: bool = False):
     This method only checks whether the header row matches the specs:
     https://docs.lightly.ai/self-supervised-learning/getting_started/command_line_tool.html#id1
 
+    Embeddings in the binary format (see save_embeddings) are checked for a
+    two-dimensional embedding matrix and a matching filenames and labels
+    sidecar file. They never contain additional columns.
+
     Args:
         path:
             Path to the embedding csv file
@@ -54,44 +77,18 @@ def check_embeddings(path: str, remove_additional_columns: bool = False):
     Raises:
         RuntimeError
     """
+    if is_binary_embeddings_path(path):
+        _check_binary_embeddings(path)
+        return
+
     with open(path, "r", newline="") as csv_file:
         reader = csv.reader(csv_file, delimiter=",")
         header: List[str] = next(reader)
-
-        # check for whitespace in the header (we don't allow this)
-        if any(x != x.strip() for x in header):
-            raise RuntimeError("Embeddings csv file must not contain whitespaces.")
-
-        # first col is `filenames`
-        if header[0] != "filenames":
-            raise RuntimeError(
-                f"Embeddings csv file must start with `filenames` "
-                f"column but had {header[0]} instead."
-            )
-
-        # `labels` exists
-        try:
-            header_labels_idx = header.index("labels")
-        except ValueError:
-            raise RuntimeError(f"Embeddings csv file has no `labels` column.")
-
-        # cols between first and `labels` are `embedding_x`
-        for embedding_header in header[1:header_labels_idx]:
-            if not re.match(r"embedding_\d+", embedding_header):
-                # check if we have a special column
-                if not embedding_header in ["masked", "selected"]:
-                    raise RuntimeError(
-                        f"Embeddings csv file must have `embedding_x` columns but "
-                        f"found {embedding_header} instead."
-                    )
+        _check_embeddings_header(header)
 
         # check for empty rows in the body of the csv file
         for i, row in enumerate(reader):
-            if len(row) == 0:
-                raise RuntimeError(
-                    f"Embeddings csv file must not have empty rows. "
-                    f"Found empty row on line {i}."
-                )
+            _check_embeddings_row(row, line=i)
 
     if remove_additional_columns:
         new_rows = []
@@ -117,6 +114,85 @@ def check_embeddings(path: str, remove_additional_columns: bool = False):
             writer.writerows(new_rows)
 
 
+def _check_embeddings_header(header: List[str]):
+    """Raises an error if the header of an embeddings csv file is misformatted."""
+    # check for whitespace in the header (we don't allow this)
+    if any(x != x.strip() for x in header):
+        raise RuntimeError("Embeddings csv file must not contain whitespaces.")
+
+    # first col is `filenames`
+    if header[0] != "filenames":
+        raise RuntimeError(
+            f"Embeddings csv file must start with `filenames` "
+            f"column but had {header[0]} instead."
+        )
+
+    # `labels` exists
+    try:
+        header_labels_idx = header.index("labels")
+    except ValueError:
+        raise RuntimeError(f"Embeddings csv file has no `labels` column.")
+
+    # cols between first and `labels` are `embedding_x`
+    for embedding_header in header[1:header_labels_idx]:
+        if not re.match(r"embedding_\d+", embedding_header):
+            # check if we have a special column
+            if not embedding_header in ["masked", "selected"]:
+                raise RuntimeError(
+                    f"Embeddings csv file must have `embedding_x` columns but "
+                    f"found {embedding_header} instead."
+                )
+
+
+def _check_embeddings_row(row: List[str], line: int):
+    """Raises an error if a row in the body of an embeddings csv file is empty."""
+    if len(row) == 0:
+        raise RuntimeError(
+            f"Embeddings csv file must not have empty rows. "
+            f"Found empty row on line {line}."
+        )
+
+
+def _check_binary_embeddings(path: str):
+    """Raises an error if the binary embeddings have not the correct format."""
+    sidecar_path = _get_binary_embeddings_sidecar_path(path)
+    if not os.path.isfile(sidecar_path):
+        raise RuntimeError(
+            f"Binary embeddings file {path} has no filenames and labels file "
+            f"at {sidecar_path}."
+        )
+
+    embeddings = np.load(path, mmap_mode="r")
+    if embeddings.ndim != 2:
+        raise RuntimeError(
+            f"Binary embeddings must be a two-dimensional matrix but have "
+            f"shape {embeddings.shape} instead."
+        )
+
+    with open(sidecar_path, "r", newline="") as csv_file:
+        reader = csv.reader(csv_file, delimiter=",")
+        header = next(reader)
+        if header != ["filenames", "labels"]:
+            raise RuntimeError(
+                f"Binary embeddings sidecar file must have the header "
+                f"`filenames,labels` but has {','.join(header)} instead."
+            )
+        n_rows = 0
+        for i, row in enumerate(reader):
+            if len(row) != 2:
+                raise RuntimeError(
+                    f"Binary embeddings sidecar file must have exactly two "
+                    f"columns in every row. Found {len(row)} on line {i}."
+                )
+            n_rows += 1
+
+    if n_rows != len(embeddings):
+        raise RuntimeError(
+            f"Binary embeddings file has {len(embeddings)} embeddings but "
+            f"its sidecar file has {n_rows} filenames."
+        )
+
+
 def save_embeddings(
     path: str, embeddings: np.ndarray, labels: List[int], filenames: List[str]
 ):
@@ -125,6 +201,14 @@ def save_embeddings(
     Creates a csv file at the location specified by path and saves embeddings,
     labels, and filenames.
 
+    If the path ends with `.npy`, the embeddings are stored in a binary format
+    instead: A float32 matrix saved with numpy at the location specified by
+    path and a csv file with the filenames and labels next to it (for example
+    `embeddings.npy` and `embeddings.filenames.csv`). The binary format is
+    much faster to save and load for large datasets and can be memory-mapped.
+    Use convert_embeddings_binary_to_csv to get a file which can be uploaded
+    to the Lightly Platform.
+
     Args:
         path:
             Path to the csv file.
@@ -157,6 +241,13 @@ def save_embeddings(
         msg += f" but are not: ({n_embeddings}, {n_filenames}, {n_labels})"
         raise ValueError(msg)
 
+    if is_binary_embeddings_path(path):
+        np.save(path, np.asarray(embeddings, dtype=np.float32))
+        _save_filenames_and_labels(
+            _get_binary_embeddings_sidecar_path(path), filenames, labels
+        )
+        return
+
     header = ["filenames"]
     header = header + [f"embedding_{i}" for i in range(embeddings.shape[-1])]
     header = header + ["labels"]
@@ -167,12 +258,55 @@ def save_embeddings(
             writer.writerow([filename] + list(embedding) + [str(label)])
 
 
-def load_embeddings(path: str):
+def _save_filenames_and_labels(path: str, filenames: List[str], labels: List[int]):
+    """Saves the filenames and labels sidecar file of binary embeddings."""
+    with open(path, "w", newline="") as csv_file:
+        writer = csv.writer(csv_file, delimiter=",")
+        writer.writerow(["filenames", "labels"])
+        writer.writerows(zip(filenames, (str(label) for label in labels)))
+
+
+def _load_filenames_and_labels(path: str) -> Tuple[List[str], List[int]]:
+    """Loads the filenames and labels sidecar file of binary embeddings."""
+    filenames, labels = [], []
+    with open(path, "r", newline="") as csv_file:
+        reader = csv.reader(csv_file, delimiter=",")
+        # skip header
+        next(reader)
+        for filename, label in reader:
+            filenames.append(filename)
+            labels.append(int(label))
+    return filenames, labels
+
+
+def load_embeddings(
+    path: str,
+    mmap_mode: Optional[str] = None,
+    memmap_path: Optional[str] = None,
+    chunk_size: int = DEFAULT_EMBEDDINGS_CHUNK_SIZE,
+):
     """Loads embeddings from a csv file in a Lightly compatible format.
 
+    Embeddings saved in the binary format (path ends with `.npy`, see
+    save_embeddings) are detected automatically.
+
+    Embeddings from a csv file are parsed in chunks of rows directly into a
+    preallocated float32 array. Use iter_embeddings to process the embeddings
+    chunk by chunk without loading all of them.
+
     Args:
         path:
             Path to the csv file.
+        mmap_mode:
+            Only used for embeddings in the binary format. If set, the
+            embeddings are memory-mapped instead of read into memory. See
+            numpy.load for the available modes, e.g. "r" for read-only.
+        memmap_path:
+            Only used for embeddings in the csv format. If set, the embeddings
+            are parsed into a memory-mapped .npy file created at this path
+            instead of into memory.
+        chunk_size:
+            Number of csv rows which are parsed at once.
 
     Returns:
         The embeddings as a numpy array, labels as a list of integers, and
@@ -184,32 +318,145 @@ def load_embeddings(path: str):
         >>> import lightly.utils.io as io
         >>> embeddings, labels, filenames = io.load_embeddings(
         >>>     'path/to/my/embeddings.csv')
+        >>>
+        >>> # memory-map embeddings saved in the binary format
+        >>> embeddings, labels, filenames = io.load_embeddings(
+        >>>     'path/to/my/embeddings.npy', mmap_mode='r')
 
     """
-    check_embeddings(path)
+    if is_binary_embeddings_path(path):
+        check_embeddings(path)
+        filenames, labels = _load_filenames_and_labels(
+            _get_binary_embeddings_sidecar_path(path)
+        )
+        check_filenames(filenames)
+        embeddings = np.load(path, mmap_mode=mmap_mode)
+        if embeddings.dtype != np.float32:
+            embeddings = embeddings.astype(np.float32)
+        return embeddings, labels, filenames
+
+    with open(path, "r", newline="") as csv_file:
+        header = next(csv.reader(csv_file, delimiter=","))
+    shape = (_count_embeddings_csv_rows(path), len(header) - 2)
+    if memmap_path is None:
+        embeddings = np.empty(shape, dtype=np.float32)
+    else:
+        embeddings = np.lib.format.open_memmap(
+            memmap_path, mode="w+", dtype=np.float32, shape=shape
+        )
 
     filenames, labels = [], []
-    embeddings = []
+    for embeddings_chunk, labels_chunk, filenames_chunk in iter_embeddings(
+        path, chunk_size=chunk_size
+    ):
+        start = len(filenames)
+        end = start + len(filenames_chunk)
+        if end > len(embeddings):
+            _raise_embeddings_csv_row_count_error(len(embeddings))
+        embeddings[start:end] = embeddings_chunk
+        labels.extend(labels_chunk)
+        filenames.extend(filenames_chunk)
+
+    if len(filenames) != len(embeddings):
+        _raise_embeddings_csv_row_count_error(len(embeddings))
+    if memmap_path is not None:
+        embeddings.flush()
+    return embeddings, labels, filenames
+
+
+def _raise_embeddings_csv_row_count_error(n_lines: int):
+    raise RuntimeError(
+        f"Embeddings csv file has {n_lines} lines but a different number of "
+        f"rows. Filenames must not contain line breaks."
+    )
+
+
+def iter_embeddings(
+    path: str, chunk_size: int = DEFAULT_EMBEDDINGS_CHUNK_SIZE
+) -> Iterator[Tuple[np.ndarray, List[int], List[str]]]:
+    """Iterates over embeddings in chunks of rows.
+
+    Works with embeddings in the csv and the binary format (see
+    save_embeddings). Only a single chunk is held in memory at once.
+
+    Args:
+        path:
+            Path to the csv file.
+        chunk_size:
+            Maximum number of embeddings per chunk.
+
+    Yields:
+        Tuples of embeddings as a float32 numpy array, labels as a list of
+        integers, and filenames as a list of strings. The chunks are yielded
+        in the order the embeddings were saved.
+
+    Examples:
+        >>> import lightly.utils.io as io
+        >>> for embeddings, labels, filenames in io.iter_embeddings(
+        >>>     'path/to/my/embeddings.csv', chunk_size=1024):
+        >>>     process(embeddings)
+
+    """
+    if chunk_size <= 0:
+        raise ValueError(f"chunk_size must be positive but is {chunk_size}.")
+
+    if is_binary_embeddings_path(path):
+        embeddings, labels, filenames = load_embeddings(path, mmap_mode="r")
+        for start in range(0, len(embeddings), chunk_size):
+            end = start + chunk_size
+            yield (
+                np.array(embeddings[start:end], dtype=np.float32),
+                labels[start:end],
+                filenames[start:end],
+            )
+        return
+
     with open(path, "r", newline="") as csv_file:
         reader = csv.reader(csv_file, delimiter=",")
+        _check_embeddings_header(next(reader))
+        rows = []
         for i, row in enumerate(reader):
-            # skip header
-            if i == 0:
-                continue
-            #  read filenames and labels
-            filenames.append(row[0])
-            labels.append(int(row[-1]))
-            # read embeddings
-            embeddings.append(row[1:-1])
-
+            _check_embeddings_row(row, line=i)
+            rows.append(row)
+            if len(rows) == chunk_size:
+                yield _parse_embeddings_csv_rows(rows)
+                rows = []
+        if len(rows) > 0:
+            yield _parse_embeddings_csv_rows(rows)
+
+
+def _parse_embeddings_csv_rows(
+    rows: List[List[str]],
+) -> Tuple[np.ndarray, List[int], List[str]]:
+    """Converts rows of an embeddings csv file to embeddings, labels, and filenames."""
+    filenames = [row[0] for row in rows]
     check_filenames(filenames)
-
-    embeddings = np.array(embeddings).astype(np.float32)
+    labels = [int(row[-1]) for row in rows]
+    # numpy parses the strings directly into a float32 array
+    embeddings = np.array([row[1:-1] for row in rows], dtype=np.float32)
     return embeddings, labels, filenames
 
 
+def _count_embeddings_csv_rows(path: str) -> int:
+    """Counts the rows of an embeddings csv file without parsing them."""
+    n_lines = 0
+    last_byte = b"\n"
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 24), b""):
+            n_lines += block.count(b"\n")
+            last_byte = block[-1:]
+    if last_byte != b"\n":
+        # last line has no line break
+        n_lines += 1
+    # exclude the header
+    return max(n_lines - 1, 0)
+
+
 def load_embeddings_as_dict(
-    path: str, embedding_name: str = "default", return_all: bool = False
+    path: str,
+    embedding_name: str = "default",
+    return_all: bool = False,
+    chunk_size: int = DEFAULT_EMBEDDINGS_CHUNK_SIZE,
 ):
     """Loads embeddings from csv and store it in a dictionary for transfer.
 
@@ -225,6 +472,8 @@ def load_embeddings_as_dict(
             Name of the embedding for the platform.
         return_all:
             If true, return embeddings, labels, and filenames, too.
+        chunk_size:
+            Number of embeddings which are parsed at once (see iter_embeddings).
 
     Returns:
         A dictionary containing the embedding information (see load_embeddings)
@@ -242,21 +491,94 @@ def load_embeddings_as_dict(
         >>> embedding_dict, embeddings, labels, filenames = result
 
     """
-    embeddings, labels, filenames = load_embeddings(path)
-
     # build dictionary
     data = {"embeddingName": embedding_name, "embeddings": []}
-    for embedding, filename, label in zip(embeddings, filenames, labels):
-        item = {"fileName": filename, "value": embedding.tolist(), "label": label}
-        data["embeddings"].append(item)
+    embeddings_chunks, labels, filenames = [], [], []
+    for embeddings_chunk, labels_chunk, filenames_chunk in iter_embeddings(
+        path, chunk_size=chunk_size
+    ):
+        data["embeddings"].extend(
+            {"fileName": filename, "value": embedding, "label": label}
+            for embedding, filename, label in zip(
+                embeddings_chunk.tolist(), filenames_chunk, labels_chunk
+            )
+        )
+        if return_all:
+            embeddings_chunks.append(embeddings_chunk)
+            labels.extend(labels_chunk)
+            filenames.extend(filenames_chunk)
 
     # return embeddings along with dictionary
     if return_all:
+        if embeddings_chunks:
+            embeddings = np.concatenate(embeddings_chunks)
+        else:
+            embeddings = np.empty((0, 0), dtype=np.float32)
         return data, embeddings, labels, filenames
     else:
         return data
 
 
+def convert_embeddings_csv_to_binary(csv_path: str, binary_path: str):
+    """Converts embeddings from the csv to the binary format.
+
+    Args:
+        csv_path:
+            Path to the embeddings csv file.
+        binary_path:
+            Path to the binary embeddings file. Must end with `.npy`.
+
+    Examples:
+        >>> import lightly.utils.io as io
+        >>> io.convert_embeddings_csv_to_binary(
+        >>>     'path/to/my/embeddings.csv',
+        >>>     'path/to/my/embeddings.npy')
+
+    """
+    _check_binary_embeddings_path(binary_path)
+    # parse the csv file directly into the binary file to bound memory usage
+    _, labels, filenames = load_embeddings(csv_path, memmap_path=binary_path)
+    _save_filenames_and_labels(
+        _get_binary_embeddings_sidecar_path(binary_path), filenames, labels
+    )
+
+
+def convert_embeddings_binary_to_csv(binary_path: str, csv_path: str):
+    """Converts embeddings from the binary to the csv format.
+
+    The float32 values are written with the shortest representation which
+    round-trips, thus loading the csv file results in the same embeddings.
+    The csv file can be checked with check_embeddings and uploaded to the
+    Lightly Platform.
+
+    Args:
+        binary_path:
+            Path to the binary embeddings file. Must end with `.npy`.
+        csv_path:
+            Path to the embeddings csv file.
+
+    Examples:
+        >>> import lightly.utils.io as io
+        >>> io.convert_embeddings_binary_to_csv(
+        >>>     'path/to/my/embeddings.npy',
+        >>>     'path/to/my/embeddings.csv')
+
+    """
+    _check_binary_embeddings_path(binary_path)
+    if is_binary_embeddings_path(csv_path):
+        raise ValueError(f"Path to the csv file must not end with .npy: {csv_path}")
+    embeddings, labels, filenames = load_embeddings(binary_path, mmap_mode="r")
+    save_embeddings(csv_path, embeddings, labels, filenames)
+
+
+def _check_binary_embeddings_path(path: str):
+    if not is_binary_embeddings_path(path):
+        raise ValueError(
+            f"Path to the binary embeddings file must end with "
+            f"{BINARY_EMBEDDINGS_EXTENSION} but is {path}."
+        )
+
+
 class COCO_ANNOTATION_KEYS:
     """Enum of coco annotation keys complemented with a key for custom metadata."""
 
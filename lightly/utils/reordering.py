@@ -1,9 +1,75 @@
-from typing import List, Sized
+from typing import List, Sized, TypeVar, Union
 
+import numpy as np
+import torch
 
-def sort_items_by_keys(keys: List[any], items: List[any], sorted_keys: List[any]):
+_ArrayOrTensor = TypeVar("_ArrayOrTensor", np.ndarray, torch.Tensor)
+
+
+def get_sort_indices(keys: List[any], sorted_keys: List[any]) -> np.ndarray:
+    """Computes the permutation which sorts the keys in the order of the sorted keys.
+
+    The permutation is computed once with vectorized operations and can then
+    be applied to any number of arrays with a single gather each, e.g.
+    items[indices] for a numpy array or a torch tensor.
+
+    Args:
+        keys:
+            Keys by which items can be identified. Must be unique.
+        sorted_keys:
+            Keys in sorted order.
+
+    Returns:
+        Integer numpy array of indices such that keys[indices] equals
+        sorted_keys.
+
+    Raises:
+        ValueError: If keys and sorted_keys have different lengths.
+        KeyError: If a key in sorted_keys does not exist in keys.
+
+    Examples:
+        >>> keys = [3, 2, 1]
+        >>> items = np.array([30, 20, 10])
+        >>> sorted_keys = [1, 2, 3]
+        >>> indices = get_sort_indices(keys, sorted_keys)
+        >>> print(items[indices])
+        >>> > [10 20 30]
+
+    """
+    if len(keys) != len(sorted_keys):
+        raise ValueError(
+            f"keys and sorted_keys must have the same length, "
+            f"but their lengths are: ({len(keys)} and {len(sorted_keys)})."
+        )
+    keys = np.asarray(keys)
+    sorted_keys = np.asarray(sorted_keys)
+    if len(keys) == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    # find the position of every sorted key with a binary search over the
+    # lexicographically sorted keys
+    order = np.argsort(keys, kind="stable")
+    positions = np.searchsorted(keys[order], sorted_keys)
+    positions = np.minimum(positions, len(keys) - 1)
+    indices = order[positions]
+
+    missing = keys[indices] != sorted_keys
+    if np.any(missing):
+        raise KeyError(sorted_keys[missing][0])
+    return indices
+
+
+def sort_items_by_keys(
+    keys: List[any],
+    items: Union[List[any], _ArrayOrTensor],
+    sorted_keys: List[any],
+) -> Union[List[any], _ArrayOrTensor]:
     """Sorts the items in the same order as the sorted keys.
 
+    If items is a numpy array or a torch tensor, the items are reordered with
+    a single gather along the first dimension (see get_sort_indices) and an
+    array or tensor is returned instead of a list.
+
     Args:
         keys:
             Keys by which items can be identified.
@@ -13,7 +79,7 @@ def sort_items_by_keys(keys: List[any], items: List[any], sorted_keys: List[any]
             Keys in sorted order.
 
     Returns:
-        The list of sorted items.
+        The list of sorted items or the sorted array or tensor.
 
     Examples:
         >>> keys = [3, 2, 1]
@@ -35,6 +101,11 @@ def sort_items_by_keys(keys: List[any], items: List[any], sorted_keys: List[any]
             f"but their lengths are: ({len(keys)},"
             f"{len(items)} and {len(sorted_keys)})."
         )
+    if isinstance(items, np.ndarray):
+        return items[get_sort_indices(keys, sorted_keys)]
+    if isinstance(items, torch.Tensor):
+        indices = torch.from_numpy(get_sort_indices(keys, sorted_keys))
+        return items[indices.to(items.device)]
     lookup = {key_: item_ for key_, item_ in zip(keys, items)}
     sorted_ = [lookup[key_] for key_ in sorted_keys]
     return sorted_
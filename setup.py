@@ -59,6 +59,7 @@ if __name__ == "__main__":
             "lightly-upload = lightly.cli.upload_cli:entry",
             "lightly-download = lightly.cli.download_cli:entry",
             "lightly-version = lightly.cli.version_cli:entry",
+            "lightly-check-images = lightly.cli.check_images_cli:entry",
         ]
     }
 
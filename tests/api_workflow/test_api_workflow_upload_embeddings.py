@@ -70,6 +70,20 @@ class TestApiWorkflowUploadEmbeddings(MockedApiWorkflowSetup):
         )
         self.api_workflow_client.n_dims_embeddings_on_server = n_dims
 
+    def test_upload_binary_embeddings(self):
+        n_data = len(self.api_workflow_client._mappings_api.sample_names)
+        self.create_fake_embeddings(n_data)
+        embeddings, labels, filenames = load_embeddings(self.path_to_embeddings)
+        path_to_binary_embeddings = os.path.join(self.folder_path, "embeddings.npy")
+        save_embeddings(path_to_binary_embeddings, embeddings, labels, filenames)
+
+        self.api_workflow_client.upload_embeddings(
+            path_to_embeddings_csv=path_to_binary_embeddings, name="embedding_xyz"
+        )
+        # the binary embeddings must not be modified by the upload
+        _, _, filenames_binary = load_embeddings(path_to_binary_embeddings)
+        self.assertListEqual(filenames_binary, filenames)
+
     def test_upload_success(self):
         n_data = len(self.api_workflow_client._mappings_api.sample_names)
         self.t_ester_upload_embedding(n_data=n_data)
@@ -0,0 +1,40 @@
+import os
+import tempfile
+import unittest
+
+import torchvision
+from hydra.experimental import compose, initialize
+
+from lightly.cli.check_images_cli import _check_images_cli
+
+
+class TestCLICheckImages(unittest.TestCase):
+    def setUp(self):
+        self.folder_path = tempfile.mkdtemp()
+        dataset = torchvision.datasets.FakeData(size=4, image_size=(3, 32, 32))
+        for i, (image, _) in enumerate(dataset):
+            image.save(os.path.join(self.folder_path, f"img_{i}.jpg"))
+        with open(os.path.join(self.folder_path, "img_4.jpg"), "w") as f:
+            f.write("this_is_not_an_image")
+        self.cache_path = os.path.join(tempfile.mkdtemp(), "cache.jsonl")
+        with initialize(config_path="../../lightly/cli/config", job_name="test_app"):
+            self.cfg = compose(
+                config_name="config",
+                overrides=[
+                    f"input_dir={self.folder_path}",
+                    "check_images.num_workers=0",
+                    f"check_images.cache_path={self.cache_path}",
+                ],
+            )
+
+    def test_check_images(self):
+        healthy_images, corrupt_images = _check_images_cli(self.cfg, is_cli_call=False)
+        self.assertListEqual(healthy_images, [f"img_{i}.jpg" for i in range(4)])
+        self.assertListEqual(corrupt_images, ["img_4.jpg"])
+        self.assertTrue(os.path.isfile(self.cache_path))
+
+    def test_check_images_verify_only(self):
+        self.cfg["check_images"]["verify_only"] = True
+        self.cfg["check_images"]["num_workers"] = 1
+        _, corrupt_images = _check_images_cli(self.cfg, is_cli_call=False)
+        self.assertListEqual(corrupt_images, ["img_4.jpg"])
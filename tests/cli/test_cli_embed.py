@@ -3,10 +3,13 @@ import re
 import sys
 import tempfile
 
+import numpy as np
 import torchvision
 from hydra.experimental import compose, initialize
 
 import lightly
+from lightly.cli._helpers import get_decode_size, get_loader_kwargs
+from lightly.cli.embed_cli import _embed_cli
 from tests.api_workflow.mocked_api_workflow_client import (
     MockedApiWorkflowClient,
     MockedApiWorkflowSetup,
@@ -58,6 +61,28 @@ class TestCLIEmbed(MockedApiWorkflowSetup):
             0,
         )
 
+    def test_embed_inference_settings(self):
+        self.cfg["inference"]["inference_mode"] = True
+        self.cfg["inference"]["precision"] = "bf16"
+        self.cfg["inference"]["channels_last"] = True
+        embeddings, labels, filenames = _embed_cli(self.cfg, is_cli_call=False)
+        self.assertEqual(embeddings.dtype, np.float32)
+        self.assertEqual(len(embeddings), len(self.sample_names))
+
+    def test_embed_draft_decoding(self):
+        self.cfg["loader"]["draft_decoding"] = True
+        embeddings, labels, filenames = _embed_cli(self.cfg, is_cli_call=False)
+        self.assertEqual(len(embeddings), len(self.sample_names))
+
+    def test_get_decode_size(self):
+        self.cfg["collate"]["input_size"] = 64
+        self.cfg["collate"]["min_scale"] = 0.25
+        self.assertIsNone(get_decode_size(self.cfg, training=False))
+        self.cfg["loader"]["draft_decoding"] = True
+        self.assertEqual(get_decode_size(self.cfg, training=False), 64)
+        self.assertEqual(get_decode_size(self.cfg, training=True), 128)
+        self.assertNotIn("draft_decoding", get_loader_kwargs(self.cfg))
+
     def tearDown(self) -> None:
         for filename in ["embeddings.csv", "embeddings_sorted.csv"]:
             try:
@@ -0,0 +1,62 @@
+import time
+import unittest
+from typing import List, Tuple
+
+import torch
+from torch import Tensor
+
+from lightly.data.multi_view_collate import MultiViewCollate
+
+
+def _concat_collate(
+    batch: List[Tuple[List[Tensor], int, str]]
+) -> Tuple[List[Tensor], Tensor, List[str]]:
+    """Previous implementation of MultiViewCollate for comparison."""
+    views = [[] for _ in range(len(batch[0][0]))]
+    labels = []
+    fnames = []
+    for img, label, fname in batch:
+        for i, view in enumerate(img):
+            views[i].append(view.unsqueeze(0))
+        labels.append(label)
+        fnames.append(fname)
+    for i, view in enumerate(views):
+        views[i] = torch.cat(view)
+    return views, torch.tensor(labels, dtype=torch.long), fnames
+
+
+@unittest.skip("Only used for benchmarks")
+class BenchmarkMultiViewCollate(unittest.TestCase):
+    """Compares MultiViewCollate with the previous implementation which
+    concatenated unsqueezed views.
+
+    Uses two 224x224 views for SimCLR and two 224x224 plus six 96x96 views for
+    DINO.
+
+    """
+
+    def _benchmark(self, view_sizes: List[int], batch_size: int = 256):
+        batch = [
+            ([torch.rand(3, size, size) for size in view_sizes], 0, f"{i}.jpg")
+            for i in range(batch_size)
+        ]
+        collate_fns = [
+            ("concat", _concat_collate),
+            ("preallocated", MultiViewCollate()),
+        ]
+        if torch.cuda.is_available():
+            collate_fns.append(("pinned", MultiViewCollate(pin_memory=True)))
+        for name, collate_fn in collate_fns:
+            collate_fn(batch)
+            n_iterations = 10
+            start_time = time.time()
+            for _ in range(n_iterations):
+                collate_fn(batch)
+            duration = (time.time() - start_time) / n_iterations
+            print(f"{name}: {duration * 1e3:.1f}ms per batch of {batch_size}")
+
+    def test_simclr_views(self):
+        self._benchmark(view_sizes=[224, 224])
+
+    def test_dino_views(self):
+        self._benchmark(view_sizes=[224, 224] + [96] * 6)
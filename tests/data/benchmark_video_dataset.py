@@ -0,0 +1,66 @@
+import tempfile
+import time
+import unittest
+from fractions import Fraction
+
+import cv2
+import numpy as np
+
+from lightly.data._video import VideoDataset, _TimestampIndex
+
+
+@unittest.skip("Only used for benchmarks")
+class BenchmarkVideoDatasetLookup(unittest.TestCase):
+    """Measures the per-frame overhead of the frame lookups.
+
+    The lookups in VideoDataset.__getitem__, VideoDataset.get_filename, and
+    VideoLoader.read_frame should take roughly constant time independent of
+    the number of videos and frames.
+
+    """
+
+    def _create_dataset(self, n_videos: int, n_frames: int) -> VideoDataset:
+        input_dir = tempfile.mkdtemp()
+        frames = (np.random.randn(n_frames, 8, 8, 3) * 255).astype(np.uint8)
+        for i in range(n_videos):
+            out = cv2.VideoWriter(
+                f"{input_dir}/video-{i:05}.avi",
+                cv2.VideoWriter_fourcc(*"DIVX"),
+                1,
+                frames.shape[1:3],
+            )
+            for frame in frames:
+                out.write(frame)
+            out.release()
+        return VideoDataset(input_dir, extensions=".avi")
+
+    def test_find_video_index(self):
+        for n_videos in [10, 100, 1000]:
+            dataset = self._create_dataset(n_videos=n_videos, n_frames=2)
+            indices = np.random.randint(len(dataset), size=10000)
+            start_time = time.time()
+            for index in indices:
+                dataset.get_filename(index)
+            duration = time.time() - start_time
+            print(
+                f"{n_videos} videos: "
+                f"{duration / len(indices) * 1e6:.2f}us per get_filename"
+            )
+
+    def test_timestamp_index(self):
+        for n_frames in [1000, 10000, 100000]:
+            timestamps = [Fraction(i, 30) for i in range(n_frames)]
+            start_time = time.time()
+            timestamp_index = _TimestampIndex(timestamps)
+            setup = time.time() - start_time
+
+            indices = np.random.randint(n_frames, size=10000)
+            start_time = time.time()
+            for index in indices:
+                timestamp_index.index(timestamps[index])
+                timestamp_index.next_larger(index)
+            duration = time.time() - start_time
+            print(
+                f"{n_frames} frames: {setup:.3f}s setup, "
+                f"{duration / len(indices) * 1e6:.2f}us per lookup"
+            )
@@ -1,3 +1,4 @@
+import io
 import os
 import random
 import re
@@ -6,14 +7,17 @@ import tempfile
 import unittest
 import warnings
 from typing import List, Tuple
+from unittest import mock
 
 import numpy as np
 import torch
 import torchvision
 from PIL.Image import Image
 
-from lightly.data import LightlyDataset
-from lightly.data._utils import check_images
+from lightly.data import LightlyDataset, _manifest
+from lightly.data._utils import check_images, iter_check_images
+from lightly.data.multi_view_collate import MultiViewCollate
+from lightly.transforms import SimCLRTransform
 from lightly.utils.io import INVALID_FILENAME_CHARACTERS
 
 try:
@@ -180,6 +184,105 @@ class TestLightlyDataset(unittest.TestCase):
         assert len(healthy_images) == n_healthy
         assert len(corrupt_images) == n_corrupt
 
+        # multiple processes and verify only
+        healthy_images, corrupt_images = check_images(
+            tmp_dir, num_workers=2, verify_only=True
+        )
+        assert len(healthy_images) == n_healthy
+        assert sorted(corrupt_images) == sorted(corrupt_sample_names)
+
+    def test_check_images_truncated(self):
+        tmp_dir = tempfile.mkdtemp()
+        image = torchvision.datasets.FakeData(size=1, image_size=(3, 64, 64))[0][0]
+        image.save(os.path.join(tmp_dir, "healthy.jpg"))
+        buffer = io.BytesIO()
+        image.save(buffer, format="jpeg")
+        with open(os.path.join(tmp_dir, "truncated.jpg"), "wb") as f:
+            f.write(buffer.getvalue()[:-200])
+
+        healthy_images, corrupt_images = check_images(tmp_dir, num_workers=0)
+        self.assertListEqual(healthy_images, ["healthy.jpg"])
+        self.assertListEqual(corrupt_images, ["truncated.jpg"])
+
+        # verify only does not decode the image data
+        healthy_images, corrupt_images = check_images(
+            tmp_dir, num_workers=0, verify_only=True
+        )
+        self.assertListEqual(healthy_images, ["healthy.jpg", "truncated.jpg"])
+        self.assertListEqual(corrupt_images, [])
+
+    def test_check_images_cache(self):
+        tmp_dir = tempfile.mkdtemp()
+        dataset = torchvision.datasets.FakeData(size=3, image_size=(3, 32, 32))
+        for i, (image, _) in enumerate(dataset):
+            image.save(os.path.join(tmp_dir, f"img_{i}.png"))
+        with open(os.path.join(tmp_dir, "img_3.png"), "w") as f:
+            f.write("this_is_not_an_image")
+        cache_path = os.path.join(tempfile.mkdtemp(), "cache.jsonl")
+
+        expected = (
+            ["img_0.png", "img_1.png", "img_2.png"],
+            ["img_3.png"],
+        )
+        self.assertEqual(
+            check_images(tmp_dir, num_workers=0, cache_path=cache_path), expected
+        )
+        with open(cache_path, "r") as f:
+            self.assertEqual(len(f.readlines()), 4)
+
+        # unchanged images are not checked again
+        with mock.patch("lightly.data._utils._is_corrupt") as is_corrupt:
+            self.assertEqual(
+                check_images(tmp_dir, num_workers=0, cache_path=cache_path),
+                expected,
+            )
+            is_corrupt.assert_not_called()
+
+        # verify only results are not reused for a full check
+        with mock.patch("lightly.data._utils._is_corrupt") as is_corrupt:
+            is_corrupt.return_value = False
+            os.remove(cache_path)
+            check_images(
+                tmp_dir, num_workers=0, cache_path=cache_path, verify_only=True
+            )
+            is_corrupt.reset_mock()
+            check_images(tmp_dir, num_workers=0, cache_path=cache_path)
+            self.assertEqual(is_corrupt.call_count, 4)
+
+        # changed images are checked again
+        os.remove(cache_path)
+        check_images(tmp_dir, num_workers=0, cache_path=cache_path)
+        dataset[0][0].save(os.path.join(tmp_dir, "img_3.png"))
+        self.assertEqual(
+            check_images(tmp_dir, num_workers=0, cache_path=cache_path),
+            (["img_0.png", "img_1.png", "img_2.png", "img_3.png"], []),
+        )
+
+    def test_check_images_cache_interrupted(self):
+        tmp_dir = tempfile.mkdtemp()
+        dataset = torchvision.datasets.FakeData(size=3, image_size=(3, 32, 32))
+        for i, (image, _) in enumerate(dataset):
+            image.save(os.path.join(tmp_dir, f"img_{i}.png"))
+        cache_path = os.path.join(tempfile.mkdtemp(), "cache.jsonl")
+
+        # results are flushed after every chunk
+        results = iter_check_images(
+            tmp_dir, num_workers=0, cache_path=cache_path, chunk_size=1
+        )
+        next(results)
+        with open(cache_path, "r") as f:
+            lines = f.readlines()
+        self.assertEqual(len(lines), 1)
+        results.close()
+
+        # an incomplete last line does not corrupt the next entry
+        with open(cache_path, "w") as f:
+            f.write(lines[0] + lines[0][:5])
+        check_images(tmp_dir, num_workers=0, cache_path=cache_path)
+        with mock.patch("lightly.data._utils._is_corrupt") as is_corrupt:
+            check_images(tmp_dir, num_workers=0, cache_path=cache_path)
+            is_corrupt.assert_not_called()
+
     def test_not_existing_folder_dataset(self):
         with self.assertRaises(ValueError):
             LightlyDataset("/a-random-hopefully-non/existing-path-to-nowhere/")
@@ -394,3 +497,198 @@ class TestLightlyDataset(unittest.TestCase):
             os.chmod(tmp_dir, 0o000)
             with self.assertRaises(PermissionError):
                 dataset = LightlyDataset(input_dir=tmp_dir)
+
+    def test_dataset_manifest(self):
+        tmp_dir, folder_names, sample_names = self.create_dataset(
+            n_subfolders=3, n_samples_per_subfolder=4
+        )
+        os.makedirs(os.path.join(tmp_dir, folder_names[0], "nested"))
+        nested = os.path.join(folder_names[0], "nested", "img.png")
+        shutil.copyfile(
+            os.path.join(tmp_dir, folder_names[1], sample_names[0]),
+            os.path.join(tmp_dir, nested),
+        )
+        manifest_path = os.path.join(tempfile.mkdtemp(), "manifest.json")
+        expected = LightlyDataset(input_dir=tmp_dir)
+
+        with mock.patch(
+            "lightly.data._manifest._list_dir", wraps=_manifest._list_dir
+        ) as list_dir:
+            dataset = LightlyDataset(input_dir=tmp_dir, manifest_path=manifest_path)
+            self.assertEqual(list_dir.call_count, 5)
+            self.assertTrue(os.path.isfile(manifest_path))
+            self.assertListEqual(dataset.get_filenames(), expected.get_filenames())
+            self.assertListEqual(dataset.dataset.targets, expected.dataset.targets)
+            self.assertListEqual(dataset.dataset.classes, expected.dataset.classes)
+
+            # nothing changed, nothing is listed again
+            list_dir.reset_mock()
+            dataset = LightlyDataset(input_dir=tmp_dir, manifest_path=manifest_path)
+            self.assertEqual(list_dir.call_count, 0)
+            self.assertListEqual(dataset.get_filenames(), expected.get_filenames())
+
+            # only the changed directory is listed again
+            os.remove(os.path.join(tmp_dir, folder_names[2], sample_names[0]))
+            list_dir.reset_mock()
+            dataset = LightlyDataset(input_dir=tmp_dir, manifest_path=manifest_path)
+            self.assertEqual(list_dir.call_count, 1)
+            self.assertListEqual(
+                dataset.get_filenames(), LightlyDataset(tmp_dir).get_filenames()
+            )
+
+        # filenames filter works with the manifest
+        filenames = [nested] + [
+            os.path.join(folder_name, sample_names[1])
+            for folder_name in folder_names[1:]
+        ]
+        dataset = LightlyDataset(
+            input_dir=tmp_dir, filenames=filenames, manifest_path=manifest_path
+        )
+        self.assertListEqual(dataset.get_filenames(), sorted(filenames))
+
+    def test_dataset_manifest_no_subdir(self):
+        tmp_dir, sample_names = self.create_dataset_no_subdir(5)
+        manifest_path = os.path.join(tempfile.mkdtemp(), "manifest.json")
+        for _ in range(2):
+            dataset = LightlyDataset(input_dir=tmp_dir, manifest_path=manifest_path)
+            self.assertListEqual(dataset.get_filenames(), sorted(sample_names))
+
+        # a manifest of another root directory is discarded
+        other_dir, other_names = self.create_dataset_no_subdir(3)
+        dataset = LightlyDataset(input_dir=other_dir, manifest_path=manifest_path)
+        self.assertListEqual(dataset.get_filenames(), sorted(other_names))
+
+    def test_dataset_manifest_empty_class(self):
+        tmp_dir, _, _ = self.create_dataset(n_subfolders=2, n_samples_per_subfolder=2)
+        manifest = _manifest._FileManifest(
+            path=os.path.join(tempfile.mkdtemp(), "manifest.json"), root=tmp_dir
+        )
+        manifest.refresh()
+        dataset = _manifest._ManifestImageFolder(tmp_dir, manifest=manifest)
+
+        os.makedirs(os.path.join(tmp_dir, "empty"))
+        manifest.refresh()
+        _, class_to_idx = dataset.find_classes(tmp_dir)
+        self.assertIn("empty", class_to_idx)
+        with self.assertRaises(FileNotFoundError):
+            dataset.make_dataset(tmp_dir, class_to_idx, extensions=dataset.extensions)
+        # torchvision>=0.18 passes allow_empty to make_dataset
+        samples = dataset.make_dataset(
+            tmp_dir, class_to_idx, extensions=dataset.extensions, allow_empty=True
+        )
+        self.assertEqual(len(samples), 4)
+
+    def test_dump_shards(self):
+        tmp_dir, folder_names, sample_names = self.create_dataset(
+            n_subfolders=3, n_samples_per_subfolder=4
+        )
+        dataset = LightlyDataset(input_dir=tmp_dir)
+        out_dir = tempfile.mkdtemp()
+        # small shards to make sure that images are spread over multiple shards
+        dataset.dump_shards(out_dir, max_shard_size=2000)
+        self.assertGreater(len(os.listdir(out_dir)), 2)
+
+        shard_dataset = LightlyDataset(input_dir=out_dir)
+        self.assertEqual(len(shard_dataset), len(dataset))
+        self.assertListEqual(shard_dataset.get_filenames(), dataset.get_filenames())
+        for (sample, target, _), (expected_sample, expected_target, _) in zip(
+            shard_dataset, dataset
+        ):
+            self.assertIsInstance(sample, Image)
+            np.testing.assert_array_equal(np.array(sample), np.array(expected_sample))
+            self.assertEqual(target, expected_target)
+
+        # shards are reopened in dataloader workers
+        dataloader = torch.utils.data.DataLoader(
+            shard_dataset, batch_size=5, num_workers=2, collate_fn=lambda x: x
+        )
+        fnames = [fname for batch in dataloader for _, _, fname in batch]
+        self.assertListEqual(fnames, dataset.get_filenames())
+
+        # filter by filenames
+        filenames = dataset.get_filenames()[::3]
+        shard_dataset = LightlyDataset(input_dir=out_dir, filenames=filenames)
+        self.assertListEqual(shard_dataset.get_filenames(), filenames)
+
+        # only dump some images
+        out_dir = tempfile.mkdtemp()
+        dataset.dump_shards(out_dir, filenames=filenames)
+        shard_dataset = LightlyDataset(input_dir=out_dir)
+        self.assertListEqual(shard_dataset.get_filenames(), filenames)
+
+    @unittest.skipUnless(VIDEO_DATASET_AVAILABLE, "PyAV or CV2 is/are not installed")
+    def test_dump_shards_video(self):
+        self.create_video_dataset(n_videos=2, n_frames_per_video=3)
+        dataset = LightlyDataset(input_dir=self.input_dir)
+        out_dir = tempfile.mkdtemp()
+        dataset.dump_shards(out_dir)
+
+        shard_dataset = LightlyDataset(input_dir=out_dir)
+        self.assertListEqual(shard_dataset.get_filenames(), dataset.get_filenames())
+        for (sample, target, _), (expected_sample, expected_target, _) in zip(
+            shard_dataset, dataset
+        ):
+            # frames are stored as lossless png
+            np.testing.assert_array_equal(np.array(sample), np.array(expected_sample))
+            self.assertEqual(target, expected_target)
+
+    def test_dump_shards_with_transform(self):
+        tmp_dir, _ = self.create_dataset_no_subdir(3)
+        dataset = LightlyDataset(
+            input_dir=tmp_dir, transform=torchvision.transforms.ToTensor()
+        )
+        with self.assertRaises(RuntimeError):
+            dataset.dump_shards(tempfile.mkdtemp())
+
+    def test_dataset_seed(self):
+        tmp_dir, _ = self.create_dataset_no_subdir(4)
+        transform = SimCLRTransform(input_size=16)
+
+        def load(dataset, num_workers=0):
+            dataloader = torch.utils.data.DataLoader(
+                dataset,
+                batch_size=2,
+                num_workers=num_workers,
+                collate_fn=MultiViewCollate(),
+            )
+            return [views for views, _, _ in dataloader]
+
+        def assert_equal(batches_0, batches_1):
+            for views_0, views_1 in zip(batches_0, batches_1):
+                for view_0, view_1 in zip(views_0, views_1):
+                    self.assertTrue(torch.equal(view_0, view_1))
+
+        dataset = LightlyDataset(input_dir=tmp_dir, transform=transform, seed=0)
+        batches = load(dataset)
+        # same augmentations independent of the global random state and the
+        # number of workers
+        torch.manual_seed(1)
+        assert_equal(batches, load(dataset))
+        assert_equal(batches, load(dataset, num_workers=2))
+        assert_equal(
+            batches[1:],
+            load(torch.utils.data.Subset(dataset, indices=[2, 3])),
+        )
+        # the two views of a sample are different
+        self.assertFalse(torch.equal(batches[0][0], batches[0][1]))
+
+        # different augmentations in every epoch
+        dataset.set_epoch(1)
+        self.assertFalse(torch.equal(batches[0][0], load(dataset)[0][0]))
+        dataset.set_epoch(0)
+        assert_equal(batches, load(dataset))
+
+    def test_dataloader_uses_overridden_getitem(self):
+        tmp_dir, _ = self.create_dataset_no_subdir(4)
+
+        class DatasetWithIndex(LightlyDataset):
+            def __getitem__(self, index):
+                sample, target, fname = super().__getitem__(index)
+                return sample, target, fname, index
+
+        dataset = DatasetWithIndex(
+            input_dir=tmp_dir, transform=torchvision.transforms.ToTensor()
+        )
+        dataloader = torch.utils.data.DataLoader(dataset, batch_size=2)
+        indices = [index for batch in dataloader for index in batch[3].tolist()]
+        self.assertListEqual(indices, [0, 1, 2, 3])
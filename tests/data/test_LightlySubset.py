@@ -70,6 +70,15 @@ class TestLightlySubset(TestLightlyDataset):
             sample, target, fname = subset.__getitem__(index_subset)
             assert filename_subset == fname
 
+    @unittest.skipUnless(VIDEO_DATASET_AVAILABLE, "PyAV and CV2 are both installed")
+    def test_lightly_video_subset_getitems(self):
+        subset, filenames_subset = self.create_video_subset()
+
+        indices_subset = list(range(len(subset)))[::-1]
+        items = subset.__getitems__(indices_subset)
+        fnames = [fname for _, _, fname in items]
+        assert fnames == [filenames_subset[i] for i in indices_subset]
+
     def test_lightly_subset_transform(self):
         subset, filenames_subset = self.create_subset()
         self.test_transform_setter(dataset=subset)
@@ -17,8 +17,12 @@ import torchvision
 from lightly.data import LightlyDataset, NonIncreasingTimestampError
 from lightly.data._video import (
     VideoDataset,
+    VideoLoader,
+    VideoLoaderCacheInfo,
     _find_non_increasing_timestamps,
     _make_dataset,
+    _TimestampIndex,
+    _VideoLoaderPool,
 )
 
 try:
@@ -163,6 +167,61 @@ class TestVideoDataset(unittest.TestCase):
             dataset_0_workers.dataset.fps, dataset_4_workers.dataset.fps
         )
 
+    def test_video_dataset_index_cache(self):
+        self.create_dataset(n_videos=3)
+        cache_path = os.path.join(tempfile.mkdtemp(), "video_index.json")
+        dataset = VideoDataset(
+            self.input_dir,
+            extensions=self.extensions,
+            video_index_cache_path=cache_path,
+        )
+        self.assertTrue(os.path.isfile(cache_path))
+
+        read_video_timestamps = torchvision.io.read_video_timestamps
+        with mock.patch(
+            "torchvision.io.read_video_timestamps", wraps=read_video_timestamps
+        ) as mock_read:
+            # all videos are cached
+            cached_dataset = VideoDataset(
+                self.input_dir,
+                extensions=self.extensions,
+                video_index_cache_path=cache_path,
+            )
+            mock_read.assert_not_called()
+            self.assertListEqual(cached_dataset.videos, dataset.videos)
+            self.assertEqual(cached_dataset.video_timestamps, dataset.video_timestamps)
+            self.assertEqual(cached_dataset.offsets, dataset.offsets)
+            self.assertTupleEqual(cached_dataset.fps, dataset.fps)
+            self.assertListEqual(
+                cached_dataset.get_filenames(), dataset.get_filenames()
+            )
+
+            # only the modified video is rescanned
+            modified_video = dataset.videos[1]
+            stat = os.stat(modified_video)
+            os.utime(modified_video, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+            rescanned_dataset = VideoDataset(
+                self.input_dir,
+                extensions=self.extensions,
+                video_index_cache_path=cache_path,
+            )
+            mock_read.assert_called_once()
+            self.assertEqual(mock_read.call_args[0][0], modified_video)
+            self.assertEqual(
+                rescanned_dataset.video_timestamps, dataset.video_timestamps
+            )
+        shutil.rmtree(self.input_dir)
+
+    def test_video_dataset_index_cache_corrupt(self):
+        self.create_dataset(n_videos=2)
+        cache_path = os.path.join(tempfile.mkdtemp(), "video_index.json")
+        with open(cache_path, "w") as f:
+            f.write("not json")
+        with self.assertWarns(UserWarning):
+            dataset = LightlyDataset(self.input_dir, video_index_cache_path=cache_path)
+        self.assertEqual(len(dataset), 2 * self.n_frames_per_video)
+        shutil.rmtree(self.input_dir)
+
     @unittest.skipUnless(PYAV_AVAILABLE, "PyAV unavailable")
     def test_video_dataset_from_folder__pyav(self) -> None:
         torchvision.set_video_backend("pyav")
@@ -339,3 +398,164 @@ class TestVideoDataset(unittest.TestCase):
         expected = [False, False, False, True, True, False, True]
         non_increasing = _find_non_increasing_timestamps(timestamps)
         self.assertListEqual(non_increasing, expected)
+
+    def test_timestamp_index(self):
+        timestamps = [
+            Fraction(-1, 1),
+            Fraction(0, 1),
+            Fraction(1, 1),
+            Fraction(2, 3),
+            Fraction(2, 3),
+            Fraction(2, 1),
+            Fraction(3, 2),
+        ]
+        timestamp_index = _TimestampIndex(timestamps)
+        for index, timestamp in enumerate(timestamps):
+            # compare against the linear lookups
+            self.assertEqual(
+                timestamp_index.index(timestamp), timestamps.index(timestamp)
+            )
+            expected_next = next(
+                (ts for ts in timestamps[index + 1 :] if ts > timestamp),
+                float("inf"),
+            )
+            self.assertEqual(timestamp_index.next_larger(index), expected_next)
+
+        self.assertEqual(timestamp_index.index(0.0), 1)
+        with self.assertRaises(ValueError):
+            timestamp_index.index(Fraction(1, 7))
+
+    def test_video_dataset_find_video_index(self):
+        self.create_dataset_specified_frames_per_video([1, 3, 4])
+        dataset = VideoDataset(self.input_dir, extensions=self.extensions)
+        expected = []
+        for video_index, frames in enumerate(self.frames_over_videos):
+            expected.extend([video_index] * len(frames))
+        self.assertListEqual(
+            [dataset._find_video_index(i) for i in range(len(dataset))], expected
+        )
+
+        # videos without frames are skipped
+        dataset._offsets_array = np.array([0, 3, 3, 5])
+        self.assertListEqual(
+            [dataset._find_video_index(i) for i in range(6)], [0, 0, 0, 2, 2, 3]
+        )
+
+    def test_video_dataset_max_open_videos(self):
+        self.create_dataset_specified_frames_per_video([4, 5, 6])
+        for max_open_videos, expected_misses in [(1, 8), (2, 2), (3, 2)]:
+            dataset = VideoDataset(
+                self.input_dir,
+                extensions=self.extensions,
+                max_open_videos=max_open_videos,
+            )
+            # access the first frames of the first two videos in interleaved
+            # order
+            first, second = dataset.offsets[:2]
+            indices = [first, second, first + 1, second + 1]
+            indices += [first + 2, second + 2, first + 3, second + 3]
+            for index in indices:
+                dataset[index]
+            self.assertEqual(
+                dataset.video_loader_cache_info(),
+                VideoLoaderCacheInfo(
+                    hits=len(indices) - expected_misses,
+                    misses=expected_misses,
+                    maxsize=max_open_videos,
+                    currsize=min(max_open_videos, 2),
+                ),
+            )
+
+        with self.assertRaises(ValueError):
+            VideoDataset(self.input_dir, extensions=self.extensions, max_open_videos=0)
+
+    def test_video_loader_pool(self):
+        pool = _VideoLoaderPool(maxsize=2)
+        created = []
+
+        def create_loader(video_index):
+            created.append(video_index)
+            return object()
+
+        loader_0 = pool.get(0, create_loader)
+        pool.get(1, create_loader)
+        self.assertIs(pool.get(0, create_loader), loader_0)
+        # video 1 is least recently used and must be evicted
+        pool.get(2, create_loader)
+        self.assertIs(pool.get(0, create_loader), loader_0)
+        pool.get(1, create_loader)
+        self.assertListEqual(created, [0, 1, 2, 1])
+        self.assertEqual(pool.cache_info(), (2, 4, 2, 2))
+
+        pool.clear()
+        self.assertEqual(pool.cache_info(), (0, 0, 2, 0))
+
+    def test_video_loader_read_frames__pyav(self):
+        torchvision.set_video_backend("pyav")
+        self._test_video_loader_read_frames()
+
+    @unittest.skipUnless(VIDEO_READER_AVAILABLE, "video_reader unavailable")
+    def test_video_loader_read_frames__video_reader(self):
+        torchvision.set_video_backend("video_reader")
+        self._test_video_loader_read_frames()
+
+    def _test_video_loader_read_frames(self):
+        self.create_dataset_specified_frames_per_video([20])
+        dataset = VideoDataset(self.input_dir, extensions=self.extensions)
+        timestamps = dataset.video_timestamps[0]
+        expected = [
+            np.array(VideoLoader(dataset.videos[0], timestamps).read_frame(ts))
+            for ts in timestamps
+        ]
+
+        # unsorted with duplicates and gaps larger than max_skip_frames
+        indices = [3, 0, 1, 19, 3, 10, 12]
+        video_loader = VideoLoader(
+            dataset.videos[0], timestamps, backend=dataset.backend
+        )
+        frames = video_loader.read_frames(
+            [timestamps[i] for i in indices], max_skip_frames=2
+        )
+        self.assertEqual(frames.dtype, torch.uint8)
+        self.assertEqual(frames.shape, (len(indices), *expected[0].shape))
+        for frame, index in zip(frames, indices):
+            np.testing.assert_array_equal(frame.numpy(), expected[index])
+
+        with self.assertRaises(ValueError):
+            video_loader.read_frames([Fraction(-1, 1)])
+
+    def test_video_dataset_getitems(self):
+        self.create_dataset_specified_frames_per_video([5, 6])
+        dataset = VideoDataset(
+            self.input_dir,
+            extensions=self.extensions,
+            target_transform=lambda target: target + 10,
+        )
+        indices = [7, 0, 3, 10, 1, 7]
+        items = dataset.__getitems__(indices)
+        self.assertEqual(len(items), len(indices))
+        for (sample, target), index in zip(items, indices):
+            expected_sample, expected_target = dataset[index]
+            self.assertIsInstance(sample, PIL.Image.Image)
+            np.testing.assert_array_equal(np.array(sample), np.array(expected_sample))
+            self.assertEqual(target, expected_target)
+
+        frames = dataset.get_frames(indices)
+        self.assertEqual(frames.shape, (len(indices), 32, 32, 3))
+        for frame, (sample, _) in zip(frames, items):
+            np.testing.assert_array_equal(frame.numpy(), np.array(sample))
+
+        with self.assertRaises(IndexError):
+            dataset.__getitems__([0, len(dataset)])
+
+    def test_lightly_dataset_getitems(self):
+        self.create_dataset_specified_frames_per_video([5, 6])
+        dataset = LightlyDataset(self.input_dir)
+        dataloader = torch.utils.data.DataLoader(
+            dataset, batch_size=4, collate_fn=lambda x: x
+        )
+        items = [item for batch in dataloader for item in batch]
+        self.assertEqual(len(items), len(dataset))
+        for index, (sample, target, fname) in enumerate(items):
+            self.assertEqual(fname, dataset.get_filenames()[index])
+            np.testing.assert_array_equal(np.array(sample), np.array(dataset[index][0]))
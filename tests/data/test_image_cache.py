@@ -0,0 +1,93 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import torchvision
+from PIL import Image
+
+from lightly.data import DecodedImageCache, LightlyDataset
+from lightly.data._image_loaders import default_loader
+
+
+class TestDecodedImageCache(unittest.TestCase):
+    def setUp(self):
+        self.image_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(tempfile.mkdtemp(), "cache")
+        dataset = torchvision.datasets.FakeData(size=5, image_size=(3, 32, 24))
+        self.paths = []
+        for i in range(len(dataset)):
+            path = os.path.join(self.image_dir, f"img_{i}.png")
+            dataset[i][0].save(path)
+            self.paths.append(path)
+
+    def test_cache(self):
+        loader = mock.Mock(wraps=default_loader)
+        cache = DecodedImageCache(self.cache_dir, max_bytes=1 << 30, loader=loader)
+        for _ in range(3):
+            for path in self.paths:
+                image = cache(path)
+                self.assertIsInstance(image, Image.Image)
+                np.testing.assert_array_equal(
+                    np.array(image), np.array(default_loader(path))
+                )
+        self.assertEqual(loader.call_count, len(self.paths))
+        self.assertEqual(cache.misses, len(self.paths))
+        self.assertEqual(cache.hits, 2 * len(self.paths))
+
+        # a new cache (e.g. in another worker) reuses the entries
+        loader.reset_mock()
+        cache = DecodedImageCache(self.cache_dir, max_bytes=1 << 30, loader=loader)
+        cache(self.paths[0])
+        self.assertEqual(loader.call_count, 0)
+
+        # changed images are decoded again
+        Image.new("RGB", (8, 8)).save(self.paths[0])
+        self.assertEqual(cache(self.paths[0]).size, (8, 8))
+        self.assertEqual(loader.call_count, 1)
+
+        cache.clear()
+        self.assertListEqual(os.listdir(self.cache_dir), [])
+
+    def test_cache_resize(self):
+        cache = DecodedImageCache(self.cache_dir, max_bytes=1 << 30, size=12)
+        self.assertEqual(cache(self.paths[0]).size, (12, 16))
+        self.assertEqual(cache(self.paths[0]).size, (12, 16))
+        self.assertEqual(cache.hits, 1)
+
+    def test_cache_eviction(self):
+        entry_bytes = 32 * 24 * 3 + 128
+        cache = DecodedImageCache(self.cache_dir, max_bytes=2 * entry_bytes)
+        cache(self.paths[0])
+        cache(self.paths[1])
+        # make the second image the least recently used one
+        os.utime(cache._cache_path(self.paths[1]), ns=(0, 0))
+        cache(self.paths[0])
+        cache(self.paths[2])
+        self.assertEqual(len(os.listdir(self.cache_dir)), 2)
+        self.assertTrue(os.path.isfile(cache._cache_path(self.paths[0])))
+        self.assertFalse(os.path.isfile(cache._cache_path(self.paths[1])))
+
+        # images larger than the budget are not cached
+        cache = DecodedImageCache(self.cache_dir, max_bytes=10)
+        cache.clear()
+        cache(self.paths[0])
+        self.assertListEqual(os.listdir(self.cache_dir), [])
+
+    def test_lightly_dataset(self):
+        cache = DecodedImageCache(self.cache_dir, max_bytes=1 << 30)
+        dataset = LightlyDataset(self.image_dir, image_cache=cache)
+        expected = LightlyDataset(self.image_dir)
+        for _ in range(2):
+            for (sample, _, fname), (expected_sample, _, expected_fname) in zip(
+                dataset, expected
+            ):
+                np.testing.assert_array_equal(
+                    np.array(sample), np.array(expected_sample)
+                )
+                self.assertEqual(fname, expected_fname)
+        self.assertEqual(cache.hits, len(self.paths))
+
+        with self.assertRaises(ValueError):
+            LightlyDataset(None, image_cache=cache)
@@ -0,0 +1,58 @@
+import os
+import pickle
+import tempfile
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from lightly.data import LightlyDataset
+from lightly.data._image_loaders import (
+    default_loader,
+    draft_pil_loader,
+    get_image_loader,
+)
+
+
+class TestImageLoaders(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        image = Image.fromarray(
+            np.random.randint(0, 255, size=(600, 800, 3), dtype=np.uint8)
+        )
+        self.jpg_path = os.path.join(self.tmp_dir, "image.jpg")
+        self.png_path = os.path.join(self.tmp_dir, "image.png")
+        image.save(self.jpg_path)
+        image.save(self.png_path)
+
+    def test_draft_pil_loader(self):
+        image = draft_pil_loader(self.jpg_path, size=100)
+        self.assertEqual(image.mode, "RGB")
+        # smallest scale where width and height are at least 100 pixels
+        self.assertEqual(image.size, (200, 150))
+
+        # no reduction if the image is not large enough
+        self.assertEqual(draft_pil_loader(self.jpg_path, size=500).size, (800, 600))
+
+        # other formats are decoded at full resolution
+        self.assertEqual(draft_pil_loader(self.png_path, size=100).size, (800, 600))
+
+    def test_get_image_loader(self):
+        self.assertIs(get_image_loader(), default_loader)
+        loader = get_image_loader(decode_size=100)
+        self.assertEqual(loader(self.jpg_path).size, (200, 150))
+        # loaders must be picklable for dataloader workers
+        self.assertEqual(
+            pickle.loads(pickle.dumps(loader))(self.jpg_path).size, (200, 150)
+        )
+        with self.assertRaises(ValueError):
+            get_image_loader(decode_size=0)
+
+    def test_lightly_dataset_decode_size(self):
+        os.remove(self.png_path)
+        dataset = LightlyDataset(self.tmp_dir, decode_size=300)
+        sample, _, fname = dataset[0]
+        self.assertEqual(sample.size, (400, 300))
+        self.assertEqual(fname, "image.jpg")
+        with self.assertRaises(ValueError):
+            LightlyDataset(None, decode_size=300)
@@ -1,10 +1,17 @@
 from typing import List, Tuple, Union
 from warnings import warn
 
+import pytest
 import torch
+from PIL import Image
 from torch import Tensor
 
-from lightly.data.multi_view_collate import MultiViewCollate
+from lightly.data.multi_view_collate import (
+    BatchMultiViewCollate,
+    MultiViewCollate,
+    _allocate,
+)
+from lightly.transforms.batch_transform import SimCLRBatchTransform
 
 
 def test_empty_batch():
@@ -43,3 +50,74 @@ def test_multiple_item_batch():
     assert views[0].shape == (2, 3, 224, 224)
     assert torch.equal(labels, torch.tensor([1, 2], dtype=torch.long))
     assert fnames == ["image1.jpg", "image2.jpg"]
+
+
+def test_batch_multi_view_collate():
+    collate = BatchMultiViewCollate(SimCLRBatchTransform(input_size=32))
+    batch = [
+        (Image.new("RGB", (64, 48)), 0, "image0.jpg"),
+        (torch.randint(0, 256, (3, 40, 40), dtype=torch.uint8), 1, "image1.jpg"),
+    ]
+    views, labels, fnames = collate(batch)
+    assert len(views) == 2
+    assert views[0].shape == (2, 3, 32, 32)
+    assert torch.equal(labels, torch.tensor([0, 1], dtype=torch.long))
+    assert fnames == ["image0.jpg", "image1.jpg"]
+    assert collate([]) == ([], [], [])
+
+
+def test_mixed_resolution_views():
+    multi_view_collate = MultiViewCollate()
+    batch = [
+        ([torch.randn((3, 32, 32)), torch.randn((3, 16, 16))], i, f"image{i}.jpg")
+        for i in range(3)
+    ]
+    views, labels, fnames = multi_view_collate(batch)
+    assert views[0].shape == (3, 3, 32, 32)
+    assert views[1].shape == (3, 3, 16, 16)
+    for i, (img, _, _) in enumerate(batch):
+        assert torch.equal(views[0][i], img[0])
+        assert torch.equal(views[1][i], img[1])
+
+
+def test_dataloader_worker():
+    dataset = [([torch.randn((3, 8, 8)), torch.randn((3, 4, 4))], 0, "a.jpg")] * 4
+    dataloader = torch.utils.data.DataLoader(
+        dataset, batch_size=2, num_workers=1, collate_fn=MultiViewCollate()
+    )
+    for views, labels, fnames in dataloader:
+        assert views[0].shape == (2, 3, 8, 8)
+        assert views[1].shape == (2, 3, 4, 4)
+        assert torch.equal(views[1][0], dataset[0][0][1])
+
+
+@pytest.mark.skipif(torch.cuda.is_available(), reason="Requires no CUDA.")
+def test_pin_memory_without_cuda():
+    with pytest.warns(UserWarning, match="CUDA is not available"):
+        multi_view_collate = MultiViewCollate(pin_memory=True)
+    assert not multi_view_collate.pin_memory
+
+
+@pytest.mark.skipif(not torch.cuda.is_available(), reason="Requires CUDA.")
+def test_pin_memory():
+    multi_view_collate = MultiViewCollate(pin_memory=True)
+    views, _, _ = multi_view_collate([([torch.randn((3, 8, 8))], 0, "a.jpg")])
+    assert views[0].is_pinned()
+
+
+def test_allocate_shared_without_typed_storage(monkeypatch):
+    # PyTorch < 2.0 has no Tensor._typed_storage
+    typed_storage = torch.Tensor._typed_storage
+
+    def _typed_storage(self):
+        raise AttributeError
+
+    monkeypatch.setattr(torch.Tensor, "storage", lambda self: typed_storage(self))
+    monkeypatch.setattr(torch.Tensor, "_typed_storage", property(_typed_storage))
+    elem = torch.randn((3, 4, 4))
+    assert not hasattr(elem, "_typed_storage")
+    out = _allocate(elem, batch_size=2, shared=True, pin_memory=False)
+    monkeypatch.undo()
+    assert out.shape == (2, 3, 4, 4)
+    assert out.dtype == elem.dtype
+    assert out.is_shared()
@@ -0,0 +1,141 @@
+import os
+import tempfile
+import unittest
+
+import cv2
+import numpy as np
+import torch
+
+from lightly.data import LightlyDataset, VideoBatchSampler, VideoSequentialSampler
+from lightly.data._video import VideoDataset
+from lightly.data.video_sampler import (
+    _assign_videos_to_workers,
+    _get_video_frame_ranges,
+    _split_into_chunks,
+)
+
+
+class TestVideoSampler(unittest.TestCase):
+    def setUp(self):
+        self.input_dir = tempfile.mkdtemp()
+        self.frames_per_video = [3, 5, 2, 6]
+        for i, n_frames in enumerate(self.frames_per_video):
+            frames = (np.random.randn(n_frames, 8, 8, 3) * 255).astype(np.uint8)
+            out = cv2.VideoWriter(
+                os.path.join(self.input_dir, f"video-{i}.avi"),
+                cv2.VideoWriter_fourcc(*"DIVX"),
+                1,
+                frames.shape[1:3],
+            )
+            for frame in frames:
+                out.write(frame)
+            out.release()
+        self.dataset = LightlyDataset(self.input_dir)
+        # videos are not necessarily listed in filename order
+        self.frame_ranges = _get_video_frame_ranges(self.dataset)
+
+    def test_get_video_frame_ranges(self):
+        self.assertListEqual(
+            sorted(end - start for start, end in self.frame_ranges),
+            sorted(self.frames_per_video),
+        )
+        self.assertEqual(self.frame_ranges[0][0], 0)
+        self.assertEqual(self.frame_ranges[-1][1], len(self.dataset))
+
+    def test_sequential_sampler(self):
+        sampler = VideoSequentialSampler(self.dataset)
+        self.assertListEqual(list(sampler), list(range(len(self.dataset))))
+        self.assertEqual(len(sampler), len(self.dataset))
+
+    def test_sequential_sampler_shuffle(self):
+        sampler = VideoSequentialSampler(self.dataset, chunk_size=2, shuffle=True)
+        indices = list(sampler)
+        self.assertListEqual(sorted(indices), list(range(len(self.dataset))))
+
+        # frames within a chunk are contiguous
+        chunks = _split_into_chunks(self.frame_ranges, chunk_size=2)
+        position = 0
+        chunk_starts = {start: end for start, end in chunks}
+        while position < len(indices):
+            start = indices[position]
+            end = chunk_starts[start]
+            self.assertListEqual(
+                indices[position : position + end - start], list(range(start, end))
+            )
+            position += end - start
+
+        # same epoch gives same order, different epoch gives different order
+        self.assertListEqual(list(sampler), indices)
+        orders = set()
+        for epoch in range(10):
+            sampler.set_epoch(epoch)
+            orders.add(tuple(sampler))
+        self.assertGreater(len(orders), 1)
+
+    def test_sequential_sampler_video_dataset(self):
+        dataset = VideoDataset(self.input_dir, extensions=".avi")
+        sampler = VideoSequentialSampler(dataset)
+        self.assertEqual(len(list(sampler)), len(dataset))
+
+    def test_sampler_invalid_dataset(self):
+        dataset = torch.utils.data.TensorDataset(torch.zeros(4))
+        with self.assertRaises(ValueError):
+            VideoSequentialSampler(dataset)
+        with self.assertRaises(ValueError):
+            VideoSequentialSampler(self.dataset, chunk_size=0)
+
+    def test_split_into_chunks(self):
+        chunks = _split_into_chunks([(0, 5), (5, 5), (5, 7)], chunk_size=2)
+        self.assertListEqual(chunks, [(0, 2), (2, 4), (4, 5), (5, 7)])
+        chunks = _split_into_chunks([(0, 5), (5, 5), (5, 7)], chunk_size=None)
+        self.assertListEqual(chunks, [(0, 5), (5, 7)])
+
+    def test_assign_videos_to_workers(self):
+        frame_ranges = [(0, 3), (3, 8), (8, 10), (10, 16)]
+        workers = _assign_videos_to_workers(frame_ranges, num_workers=2)
+        self.assertListEqual(workers, [[(8, 10), (10, 16)], [(0, 3), (3, 8)]])
+
+    def test_batch_sampler(self):
+        for num_workers in [0, 1, 2, 3]:
+            for drop_last in [False, True]:
+                sampler = VideoBatchSampler(
+                    self.dataset,
+                    batch_size=2,
+                    num_workers=num_workers,
+                    chunk_size=3,
+                    shuffle=True,
+                    drop_last=drop_last,
+                )
+                batches = list(sampler)
+                self.assertEqual(len(batches), len(sampler))
+                indices = [i for batch in batches for i in batch]
+                self.assertEqual(len(indices), len(set(indices)))
+                if not drop_last:
+                    self.assertListEqual(
+                        sorted(indices), list(range(len(self.dataset)))
+                    )
+
+    def test_batch_sampler_worker_assignment(self):
+        num_workers = 2
+        sampler = VideoBatchSampler(self.dataset, batch_size=1, num_workers=num_workers)
+        video_workers = {}
+        # all workers have the same number of batches, every video must be
+        # loaded by a single worker
+        for position, batch in enumerate(sampler):
+            worker = position % num_workers
+            for video, (start, end) in enumerate(self.frame_ranges):
+                if start <= batch[0] < end:
+                    video_workers.setdefault(video, set()).add(worker)
+        for workers in video_workers.values():
+            self.assertEqual(len(workers), 1)
+
+    def test_batch_sampler_dataloader(self):
+        sampler = VideoBatchSampler(self.dataset, batch_size=4, num_workers=2)
+        dataloader = torch.utils.data.DataLoader(
+            self.dataset,
+            batch_sampler=sampler,
+            num_workers=2,
+            collate_fn=lambda x: x,
+        )
+        n_samples = sum(len(batch) for batch in dataloader)
+        self.assertEqual(n_samples, len(self.dataset))
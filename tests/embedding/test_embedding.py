@@ -12,6 +12,8 @@ from torch.utils.data import DataLoader
 
 from lightly.cli._helpers import get_model_from_config
 from lightly.data import LightlyDataset
+from lightly.embedding import embedding
+from lightly.utils.io import load_embeddings
 
 
 class TestLightlyDataset(unittest.TestCase):
@@ -71,3 +73,217 @@ class TestLightlyDataset(unittest.TestCase):
 
         self.assertListEqual(filenames_1_worker, filenames_4_worker)
         self.assertListEqual(filenames_1_worker, dataset.get_filenames())
+
+    def test_embed_to_file(self):
+        transform = torchvision.transforms.ToTensor()
+        dataset = LightlyDataset(self.folder_path, transform=transform)
+        encoder = get_model_from_config(self.cfg)
+        embeddings_path = os.path.join(tempfile.mkdtemp(), "embeddings.npy")
+
+        manual_seed(42)
+        dataloader = DataLoader(dataset, shuffle=True, batch_size=4)
+        embeddings, labels, filenames = encoder.embed(dataloader)
+        embeddings_file, labels_file, filenames_file = encoder.embed(
+            dataloader, embeddings_path=embeddings_path
+        )
+        np.testing.assert_allclose(embeddings, embeddings_file, rtol=5e-5)
+        self.assertListEqual(labels, labels_file)
+        self.assertListEqual(filenames, filenames_file)
+
+        loaded_embeddings, loaded_labels, loaded_filenames = load_embeddings(
+            embeddings_path
+        )
+        np.testing.assert_array_equal(loaded_embeddings, embeddings_file)
+        self.assertListEqual(loaded_labels, labels)
+        self.assertListEqual(loaded_filenames, filenames)
+        self.assertListEqual(
+            sorted(os.listdir(os.path.dirname(embeddings_path))),
+            ["embeddings.filenames.csv", "embeddings.npy"],
+        )
+
+    def test_embed_to_file_resume(self):
+        transform = torchvision.transforms.ToTensor()
+        dataset = LightlyDataset(self.folder_path, transform=transform)
+        encoder = get_model_from_config(self.cfg)
+        embeddings_path = os.path.join(tempfile.mkdtemp(), "embeddings.npy")
+        dataloader = DataLoader(dataset, shuffle=False, batch_size=2)
+        expected_embeddings, expected_labels, _ = encoder.embed(dataloader)
+
+        # crash after the second batch
+        n_calls = 0
+
+        def count_calls_and_crash(module, input):
+            nonlocal n_calls
+            n_calls += 1
+            if n_calls == 3:
+                raise RuntimeError("crash")
+
+        encoder.model.backbone.register_forward_pre_hook(count_calls_and_crash)
+        with self.assertRaises(RuntimeError):
+            encoder.embed(
+                dataloader,
+                embeddings_path=embeddings_path,
+                checkpoint_every_n_batches=1,
+            )
+
+        # resume embeds only the remaining samples
+        n_calls = 10
+        embeddings, labels, filenames = encoder.embed(
+            dataloader, embeddings_path=embeddings_path
+        )
+        self.assertEqual(n_calls, 10 + 3)
+        np.testing.assert_allclose(embeddings, expected_embeddings, rtol=5e-5)
+        self.assertListEqual(labels, expected_labels)
+        self.assertListEqual(filenames, dataset.get_filenames())
+
+    def test_embed_to_file_resume_stale_embeddings(self):
+        transform = torchvision.transforms.ToTensor()
+        dataset = LightlyDataset(self.folder_path, transform=transform)
+        encoder = get_model_from_config(self.cfg)
+        dataloader = DataLoader(dataset, shuffle=False, batch_size=2)
+        expected_embeddings, expected_labels, _ = encoder.embed(dataloader)
+        n_samples, dim = expected_embeddings.shape
+
+        def remove_embeddings(embeddings_path):
+            os.remove(embeddings_path)
+
+        def change_dimension(embeddings_path):
+            np.save(embeddings_path, np.zeros((n_samples, dim + 1), np.float32))
+
+        for make_stale in [remove_embeddings, change_dimension]:
+            with self.subTest(make_stale=make_stale.__name__):
+                embeddings_path = os.path.join(tempfile.mkdtemp(), "embeddings.npy")
+
+                # crash after the second batch
+                n_calls = 0
+
+                def count_calls_and_crash(module, input):
+                    nonlocal n_calls
+                    n_calls += 1
+                    if n_calls == 3:
+                        raise RuntimeError("crash")
+
+                hook = encoder.model.backbone.register_forward_pre_hook(
+                    count_calls_and_crash
+                )
+                with self.assertRaises(RuntimeError):
+                    encoder.embed(
+                        dataloader,
+                        embeddings_path=embeddings_path,
+                        checkpoint_every_n_batches=1,
+                    )
+                hook.remove()
+                make_stale(embeddings_path)
+
+                # the stale progress is discarded and all samples are embedded
+                with self.assertWarnsRegex(UserWarning, "Embedding all samples"):
+                    embeddings, labels, _ = encoder.embed(
+                        dataloader, embeddings_path=embeddings_path
+                    )
+                np.testing.assert_allclose(embeddings, expected_embeddings, rtol=5e-5)
+                self.assertListEqual(labels, expected_labels)
+
+    def test_embed_to_file_resume_changed_filenames(self):
+        transform = torchvision.transforms.ToTensor()
+        dataset = LightlyDataset(self.folder_path, transform=transform)
+        encoder = get_model_from_config(self.cfg)
+        embeddings_path = os.path.join(tempfile.mkdtemp(), "embeddings.npy")
+        dataloader = DataLoader(dataset, shuffle=False, batch_size=2)
+
+        # crash after the first batch
+        n_calls = 0
+
+        def count_calls_and_crash(module, input):
+            nonlocal n_calls
+            n_calls += 1
+            if n_calls == 2:
+                raise RuntimeError("crash")
+
+        hook = encoder.model.backbone.register_forward_pre_hook(count_calls_and_crash)
+        with self.assertRaises(RuntimeError):
+            encoder.embed(
+                dataloader,
+                embeddings_path=embeddings_path,
+                checkpoint_every_n_batches=1,
+            )
+        hook.remove()
+
+        # replace a sample while keeping the size of the dataset
+        os.rename(
+            os.path.join(self.folder_path, self.sample_names[0]),
+            os.path.join(self.folder_path, "replaced.jpg"),
+        )
+        dataset = LightlyDataset(self.folder_path, transform=transform)
+        with self.assertRaisesRegex(RuntimeError, "different filenames"):
+            encoder.embed(
+                DataLoader(dataset, batch_size=2), embeddings_path=embeddings_path
+            )
+
+    def test_embed_to_file_resume_keeps_dataloader_settings(self):
+        transform = torchvision.transforms.ToTensor()
+        dataset = LightlyDataset(self.folder_path, transform=transform)
+        generator = torch.Generator()
+        dataloader = DataLoader(
+            dataset,
+            batch_size=3,
+            num_workers=2,
+            worker_init_fn=print,
+            generator=generator,
+            prefetch_factor=4,
+            persistent_workers=True,
+            timeout=10,
+            drop_last=True,
+        )
+        subset_dataloader = embedding._get_subset_dataloader(
+            dataloader=dataloader, indices=[1, 3]
+        )
+        self.assertListEqual(subset_dataloader.dataset.indices, [1, 3])
+        self.assertEqual(subset_dataloader.batch_size, 3)
+        self.assertEqual(subset_dataloader.num_workers, 2)
+        self.assertIs(subset_dataloader.worker_init_fn, print)
+        self.assertIs(subset_dataloader.generator, generator)
+        self.assertEqual(subset_dataloader.prefetch_factor, 4)
+        self.assertTrue(subset_dataloader.persistent_workers)
+        self.assertEqual(subset_dataloader.timeout, 10)
+        self.assertFalse(subset_dataloader.drop_last)
+
+    def test_embed_inference_settings(self):
+        transform = torchvision.transforms.ToTensor()
+        dataset = LightlyDataset(self.folder_path, transform=transform)
+        encoder = get_model_from_config(self.cfg)
+        dataloader = DataLoader(dataset, shuffle=False, batch_size=4)
+        expected_embeddings, expected_labels, expected_filenames = encoder.embed(
+            dataloader
+        )
+
+        for inference_mode, precision, channels_last in [
+            (True, 32, False),
+            (True, "bf16", False),
+            (False, 32, True),
+            (True, "bf16", True),
+        ]:
+            with self.subTest(
+                inference_mode=inference_mode,
+                precision=precision,
+                channels_last=channels_last,
+            ):
+                embeddings, labels, filenames = encoder.embed(
+                    dataloader,
+                    inference_mode=inference_mode,
+                    precision=precision,
+                    channels_last=channels_last,
+                )
+                self.assertEqual(embeddings.dtype, np.float32)
+                self.assertEqual(embeddings.shape, expected_embeddings.shape)
+                atol = 1e-5 if precision == 32 else 0.1
+                np.testing.assert_allclose(
+                    embeddings, expected_embeddings, rtol=0.05, atol=atol
+                )
+                self.assertListEqual(labels, expected_labels)
+                self.assertListEqual(filenames, expected_filenames)
+
+    def test_embed_invalid_precision(self):
+        encoder = get_model_from_config(self.cfg)
+        dataset = LightlyDataset(self.folder_path)
+        with self.assertRaises(ValueError):
+            encoder.embed(DataLoader(dataset), precision="int8")
@@ -0,0 +1,59 @@
+import multiprocessing
+import resource
+import time
+import unittest
+from typing import Optional
+
+import torch
+
+from lightly.loss import NTXentLoss
+
+
+def _measure(
+    batch_size: int, dim: int, block_size: Optional[int], queue: multiprocessing.Queue
+) -> None:
+    """Measures the duration and the peak memory of a forward and backward
+    pass. Runs in a new process such that the peak memory is not affected by
+    previous measurements."""
+    torch.manual_seed(0)
+    out0 = torch.randn(batch_size, dim, requires_grad=True)
+    out1 = torch.randn(batch_size, dim, requires_grad=True)
+    loss_fn = NTXentLoss(block_size=block_size)
+    max_rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start_time = time.time()
+    loss = loss_fn(out0, out1)
+    loss.backward()
+    duration = time.time() - start_time
+    # ru_maxrss is in kilobytes on linux
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - max_rss_before
+    queue.put((duration, max_rss / 1024))
+
+
+@unittest.skip("Only used for benchmarks")
+class BenchmarkNTXentLoss(unittest.TestCase):
+    """Compares the peak memory and the duration of a training step of
+    NTXentLoss with and without blocks on CPU."""
+
+    def _benchmark(self, batch_size: int, dim: int = 128):
+        context = multiprocessing.get_context("spawn")
+        for block_size in [None, 1024, 256]:
+            queue = context.Queue()
+            process = context.Process(
+                target=_measure, args=(batch_size, dim, block_size, queue)
+            )
+            process.start()
+            duration, peak_memory = queue.get()
+            process.join()
+            print(
+                f"batch_size={batch_size}, block_size={block_size}: "
+                f"{duration * 1e3:.0f}ms, {peak_memory:.0f}MB peak memory"
+            )
+
+    def test_batch_size_1024(self):
+        self._benchmark(batch_size=1024)
+
+    def test_batch_size_4096(self):
+        self._benchmark(batch_size=4096)
+
+    def test_batch_size_8192(self):
+        self._benchmark(batch_size=8192)
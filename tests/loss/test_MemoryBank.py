@@ -1,10 +1,33 @@
+import os
+import pickle
+import tempfile
 import unittest
 
 import torch
+import torch.distributed as dist
+import torch.multiprocessing as mp
 
 from lightly.loss.memory_bank import MemoryBankModule
 
 
+def _run_gather_distributed(rank: int, world_size: int, init_file: str):
+    dist.init_process_group(
+        "gloo", init_method=f"file://{init_file}", rank=rank, world_size=world_size
+    )
+    try:
+        torch.manual_seed(rank)
+        memory_bank = MemoryBankModule(size=8, gather_distributed=True)
+        output = torch.full((2, 3), float(rank))
+        memory_bank(output, update=True)
+        bank = memory_bank.bank
+        # the outputs of all processes are added in the order of the ranks
+        expected = torch.tensor([0.0, 0.0, 1.0, 1.0]).expand(3, 4)
+        assert torch.equal(bank[:, :4], expected)
+        assert int(memory_bank.bank_ptr) == 4
+    finally:
+        dist.destroy_process_group()
+
+
 class TestNTXentLoss(unittest.TestCase):
     def test_init__negative_size(self):
         with self.assertRaises(ValueError):
@@ -35,6 +58,49 @@ class TestNTXentLoss(unittest.TestCase):
 
             ptr = (ptr + bsz) % size
 
+    def test_forward__no_copy(self):
+        memory_bank = MemoryBankModule(size=16)
+        linear = torch.nn.Linear(4, 2)
+        memory_bank(torch.randn(4, 2))
+        data_ptr = memory_bank.bank.data_ptr()
+        for _ in range(3):
+            output = linear(torch.randn(4, 4))
+            _, bank = memory_bank(output, update=True)
+            (output @ bank).sum().backward()
+            del bank
+        # the bank is updated in place once the backward pass is done and
+        # the returned bank is no longer used
+        self.assertEqual(memory_bank.bank.data_ptr(), data_ptr)
+
+    def test_forward__multiple_updates_before_backward(self):
+        memory_bank = MemoryBankModule(size=16)
+        linear = torch.nn.Linear(4, 2)
+        loss = 0
+        banks = []
+        for _ in range(3):
+            output = linear(torch.randn(4, 4))
+            _, bank = memory_bank(output, update=True)
+            banks.append(bank.clone())
+            loss = loss + (output @ bank).sum()
+        # fails if a bank saved for backward was modified in place
+        loss.backward()
+        self.assertFalse(torch.equal(banks[0], banks[1]))
+
+    def test_pickle(self):
+        memory_bank = MemoryBankModule(size=16)
+        _, bank = memory_bank(torch.randn(4, 2), update=True)
+        memory_bank = pickle.loads(pickle.dumps(memory_bank))
+        self.assertEqual(memory_bank.bank.shape, (2, 16))
+        self.assertEqual(int(memory_bank.bank_ptr), 4)
+
+    def test_gather_distributed(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            mp.spawn(
+                _run_gather_distributed,
+                args=(2, os.path.join(tmp_dir, "init")),
+                nprocs=2,
+            )
+
     def test_forward(self):
         bsz = 3
         dim, size = 2, 10
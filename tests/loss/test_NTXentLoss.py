@@ -1,11 +1,67 @@
+import copy
+import os
+import tempfile
 import unittest
 
 import numpy as np
 import torch
+import torch.distributed as dist
+import torch.multiprocessing as mp
 
 from lightly.loss import NTXentLoss
 
 
+def _loss_and_grads(loss_fn: NTXentLoss, out0: torch.Tensor, out1: torch.Tensor):
+    out0 = out0.clone().requires_grad_()
+    out1 = out1.clone().requires_grad_()
+    loss = loss_fn(out0, out1)
+    loss.backward()
+    return loss.detach(), out0.grad, out1.grad
+
+
+def _run_block_size_distributed(rank: int, world_size: int, init_file: str):
+    dist.init_process_group(
+        "gloo", init_method=f"file://{init_file}", rank=rank, world_size=world_size
+    )
+    try:
+        torch.manual_seed(rank)
+        out0 = torch.randn(6, 8)
+        out1 = torch.randn(6, 8)
+        expected = _loss_and_grads(NTXentLoss(gather_distributed=True), out0, out1)
+        result = _loss_and_grads(
+            NTXentLoss(gather_distributed=True, block_size=4), out0, out1
+        )
+        for x, y in zip(expected, result):
+            assert torch.allclose(x, y, atol=1e-6)
+    finally:
+        dist.destroy_process_group()
+
+
+def _run_memory_bank_distributed(rank: int, world_size: int, init_file: str):
+    dist.init_process_group(
+        "gloo", init_method=f"file://{init_file}", rank=rank, world_size=world_size
+    )
+    try:
+        torch.manual_seed(rank)
+        out0 = torch.randn(2, 8, requires_grad=True)
+        out1 = torch.randn(2, 8)
+        for gather_distributed, gather_distributed_bank, expected_ptr in [
+            # gather_distributed keeps its meaning and does not affect the bank
+            (True, False, 2),
+            (False, True, 2 * world_size),
+        ]:
+            loss_fn = NTXentLoss(
+                memory_bank_size=16,
+                gather_distributed=gather_distributed,
+                gather_distributed_bank=gather_distributed_bank,
+            )
+            loss_fn(out0, out1)
+            loss_fn(out0, out1)
+            assert int(loss_fn.bank_ptr) == expected_ptr
+    finally:
+        dist.destroy_process_group()
+
+
 class TestNTXentLoss(unittest.TestCase):
     def test_with_values(self):
         for n_samples in [1, 2, 4]:
@@ -142,6 +198,61 @@ class TestNTXentLoss(unittest.TestCase):
             l2 = loss(batch_2, batch_1)
             self.assertAlmostEqual((l1 - l2).pow(2).item(), 0.0)
 
+    def test_block_size(self):
+        torch.manual_seed(0)
+        for block_size in [1, 3, 100]:
+            for temperature in [0.1, 0.5, -1.0]:
+                with self.subTest(block_size=block_size, temperature=temperature):
+                    out0 = torch.randn(10, 16)
+                    out1 = torch.randn(10, 16)
+                    expected = _loss_and_grads(
+                        NTXentLoss(temperature=temperature), out0, out1
+                    )
+                    result = _loss_and_grads(
+                        NTXentLoss(temperature=temperature, block_size=block_size),
+                        out0,
+                        out1,
+                    )
+                    for x, y in zip(expected, result):
+                        self.assertTrue(torch.allclose(x, y, atol=1e-6))
+
+    def test_block_size_memory_bank(self):
+        torch.manual_seed(0)
+        for block_size in [1, 3, 100]:
+            with self.subTest(block_size=block_size):
+                loss_fn = NTXentLoss(memory_bank_size=64)
+                # initialize the memory bank
+                loss_fn(torch.randn(10, 16), torch.randn(10, 16))
+                for _ in range(3):
+                    out0 = torch.randn(10, 16)
+                    out1 = torch.randn(10, 16)
+                    loss_fn_block = copy.deepcopy(loss_fn)
+                    loss_fn_block.block_size = block_size
+                    expected = _loss_and_grads(loss_fn, out0, out1)
+                    result = _loss_and_grads(loss_fn_block, out0, out1)
+                    for x, y in zip(expected, result):
+                        self.assertTrue(torch.allclose(x, y, atol=1e-6))
+
+    def test_block_size_distributed(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            mp.spawn(
+                _run_block_size_distributed,
+                args=(2, os.path.join(tmp_dir, "init")),
+                nprocs=2,
+            )
+
+    def test_memory_bank_distributed(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            mp.spawn(
+                _run_memory_bank_distributed,
+                args=(2, os.path.join(tmp_dir, "init")),
+                nprocs=2,
+            )
+
+    def test_block_size_invalid(self):
+        with self.assertRaises(ValueError):
+            NTXentLoss(block_size=0)
+
     def test_forward_pass_memory_bank(self):
         loss = NTXentLoss(memory_bank_size=64)
         for bsz in range(1, 20):
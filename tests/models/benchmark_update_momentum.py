@@ -0,0 +1,74 @@
+import time
+import unittest
+from typing import Callable
+
+import torch
+import torch.nn as nn
+import torchvision
+
+from lightly.models import ResNetGenerator
+from lightly.models.modules import DINOProjectionHead, MoCoProjectionHead
+from lightly.models.utils import update_momentum
+
+
+def _loop_update_momentum(model: nn.Module, model_ema: nn.Module, m: float):
+    """Previous implementation of update_momentum for comparison."""
+    for model_ema, model in zip(model_ema.parameters(), model.parameters()):
+        model_ema.data = model_ema.data * m + model.data * (1.0 - m)
+
+
+@unittest.skip("Only used for benchmarks")
+class BenchmarkUpdateMomentum(unittest.TestCase):
+    """Compares the fused update_momentum with the previous implementation
+    which updated the parameters one by one."""
+
+    def _benchmark(self, make_model: Callable[[], nn.Module]):
+        for device in ["cpu", "cuda"] if torch.cuda.is_available() else ["cpu"]:
+            self._benchmark_device(make_model, device=device)
+
+    def _benchmark_device(self, make_model: Callable[[], nn.Module], device: str):
+        # Models are created twice because models with weight norm cannot be
+        # deep copied.
+        model = make_model().to(device)
+        model_ema = make_model().to(device)
+        n_params = sum(1 for _ in model.parameters())
+        updates = [
+            ("loop", lambda: _loop_update_momentum(model, model_ema, 0.99)),
+            ("fused", lambda: update_momentum(model, model_ema, 0.99)),
+            (
+                "fused+buffers",
+                lambda: update_momentum(model, model_ema, 0.99, update_buffers=True),
+            ),
+        ]
+        for name, update in updates:
+            update()
+            n_iterations = 20
+            if device == "cuda":
+                torch.cuda.synchronize()
+            start_time = time.time()
+            for _ in range(n_iterations):
+                update()
+            if device == "cuda":
+                torch.cuda.synchronize()
+            duration = (time.time() - start_time) / n_iterations
+            print(f"{device} {name}: {duration * 1e3:.2f}ms for {n_params} parameters")
+
+    def test_resnet18_moco(self):
+        self._benchmark(
+            lambda: nn.Sequential(
+                ResNetGenerator("resnet-18"),
+                nn.Flatten(),
+                MoCoProjectionHead(512, 512, 128),
+            )
+        )
+
+    def test_resnet50(self):
+        self._benchmark(torchvision.models.resnet50)
+
+    def test_vit_b_16_dino(self):
+        self._benchmark(
+            lambda: nn.Sequential(
+                torchvision.models.vit_b_16(),
+                DINOProjectionHead(1000, 2048, 256, 65536),
+            )
+        )
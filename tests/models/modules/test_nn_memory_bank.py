@@ -0,0 +1,76 @@
+import unittest
+
+import torch
+
+from lightly.models.modules import NNMemoryBankModule
+
+
+def _nearest_neighbours(output: torch.Tensor, bank: torch.Tensor, k: int):
+    """Reference implementation which compares with the whole normalized
+    bank at once."""
+    output_normed = torch.nn.functional.normalize(output, dim=1)
+    bank_normed = torch.nn.functional.normalize(bank.t(), dim=1)
+    similarities = output_normed @ bank_normed.t()
+    return bank.t()[similarities.topk(k, dim=1).indices]
+
+
+class TestNNMemoryBankModule(unittest.TestCase):
+    def test_forward(self):
+        torch.manual_seed(0)
+        for chunk_size in [1, 7, 100, 1000]:
+            with self.subTest(chunk_size=chunk_size):
+                memory_bank = NNMemoryBankModule(size=100, chunk_size=chunk_size)
+                memory_bank(torch.randn(8, 16), update=True)
+                for _ in range(20):
+                    output = torch.randn(8, 16) * 3
+                    bank = memory_bank.bank.clone()
+                    nearest_neighbours = memory_bank(output, update=True)
+                    expected = _nearest_neighbours(output, bank, k=1)[:, 0]
+                    self.assertEqual(nearest_neighbours.shape, (8, 16))
+                    self.assertTrue(torch.equal(nearest_neighbours, expected))
+
+    def test_forward__topk(self):
+        torch.manual_seed(0)
+        memory_bank = NNMemoryBankModule(
+            size=50, topk=5, sample_topk=False, chunk_size=7
+        )
+        memory_bank(torch.randn(8, 16), update=True)
+        bank = memory_bank.bank.clone()
+        output = torch.randn(8, 16)
+        nearest_neighbours = memory_bank(output)
+        self.assertEqual(nearest_neighbours.shape, (8, 5, 16))
+        self.assertTrue(
+            torch.equal(nearest_neighbours, _nearest_neighbours(output, bank, k=5))
+        )
+
+    def test_forward__sample_topk(self):
+        torch.manual_seed(0)
+        memory_bank = NNMemoryBankModule(size=50, topk=5, chunk_size=7)
+        memory_bank(torch.randn(8, 16), update=True)
+        bank = memory_bank.bank.clone()
+        output = torch.randn(8, 16)
+        candidates = _nearest_neighbours(output, bank, k=5)
+        sampled = [memory_bank(output) for _ in range(20)]
+        for nearest_neighbours in sampled:
+            self.assertEqual(nearest_neighbours.shape, (8, 16))
+            # every sampled neighbour is one of the topk neighbours
+            matches = (candidates == nearest_neighbours[:, None]).all(dim=2)
+            self.assertTrue(matches.any(dim=1).all())
+        self.assertFalse(all(torch.equal(sampled[0], s) for s in sampled[1:]))
+
+    def test_bank_inv_norms(self):
+        memory_bank = NNMemoryBankModule(size=10)
+        for _ in range(7):
+            memory_bank(torch.randn(3, 4) * 5, update=True)
+        bank = memory_bank.bank
+        self.assertTrue(
+            torch.allclose(memory_bank.bank_inv_norms, 1.0 / bank.norm(dim=0))
+        )
+
+    def test_init__invalid(self):
+        with self.assertRaises(ValueError):
+            NNMemoryBankModule(size=4, topk=5)
+        with self.assertRaises(ValueError):
+            NNMemoryBankModule(size=4, topk=0)
+        with self.assertRaises(ValueError):
+            NNMemoryBankModule(size=4, chunk_size=0)
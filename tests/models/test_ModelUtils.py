@@ -1,10 +1,15 @@
 import copy
+import os
+import tempfile
 import unittest
 
 import torch
+import torch.distributed as dist
+import torch.multiprocessing as mp
 import torch.nn as nn
 
 from lightly.models import utils
+from lightly.models._momentum import _MomentumEncoderMixin
 from lightly.models.utils import (
     _no_grad_trunc_normal,
     activate_requires_grad,
@@ -27,6 +32,27 @@ def has_grad(model: nn.Module):
     return has_grad_
 
 
+def _run_batch_shuffle_distributed(
+    rank: int, world_size: int, init_file: str, batch_size: int
+):
+    dist.init_process_group(
+        "gloo", init_method=f"file://{init_file}", rank=rank, world_size=world_size
+    )
+    try:
+        batch_all = torch.arange(world_size * batch_size * 2).view(-1, 2)
+        batch = batch_all[rank * batch_size : (rank + 1) * batch_size]
+        for _ in range(3):
+            shuffled, shuffle = batch_shuffle(batch, distributed=True)
+            # all processes use the same permutation
+            shuffled_all = utils.concat_all_gather(shuffled)
+            assert torch.equal(shuffled_all[shuffle], batch_all)
+            assert not torch.equal(shuffled_all, batch_all)
+            unshuffled = batch_unshuffle(shuffled, shuffle, distributed=True)
+            assert torch.equal(unshuffled, batch)
+    finally:
+        dist.destroy_process_group()
+
+
 class TestModelUtils(unittest.TestCase):
     def _assert_tensor_equal(self, x, y):
         # If the assertion fails then only an "assertion is not True" error is
@@ -56,6 +82,16 @@ class TestModelUtils(unittest.TestCase):
         activate_requires_grad(model)
         self.assertTrue(has_grad(model))
 
+    def test_batch_shuffle_distributed(self):
+        for world_size in [2, 3]:
+            with self.subTest(world_size=world_size):
+                with tempfile.TemporaryDirectory() as tmp_dir:
+                    mp.spawn(
+                        _run_batch_shuffle_distributed,
+                        args=(world_size, os.path.join(tmp_dir, "init"), 8),
+                        nprocs=world_size,
+                    )
+
     def test_momentum_works(self):
         model = nn.Sequential(
             nn.Linear(32, 32),
@@ -64,6 +100,76 @@ class TestModelUtils(unittest.TestCase):
         model_momentum = copy.deepcopy(model)
         update_momentum(model, model_momentum, 0.99)
 
+    def test_update_momentum_values(self):
+        torch.manual_seed(0)
+        model = nn.Sequential(nn.Linear(8, 4), nn.BatchNorm1d(4))
+        model_momentum = nn.Sequential(nn.Linear(8, 4), nn.BatchNorm1d(4))
+        model(torch.rand(16, 8))
+        expected = [
+            p_ema * 0.9 + p * 0.1
+            for p_ema, p in zip(model_momentum.parameters(), model.parameters())
+        ]
+        weight = model_momentum[0].weight
+        update_momentum(model, model_momentum, 0.9)
+        # parameters are updated in place
+        self.assertIs(model_momentum[0].weight, weight)
+        for param, expected_param in zip(model_momentum.parameters(), expected):
+            self.assertTrue(torch.allclose(param, expected_param))
+        # buffers are not updated by default
+        self.assertTrue(torch.equal(model_momentum[1].running_mean, torch.zeros(4)))
+
+    def test_update_momentum_buffers(self):
+        torch.manual_seed(0)
+        model = nn.Sequential(nn.Linear(8, 4), nn.BatchNorm1d(4))
+        model_momentum = copy.deepcopy(model)
+        model(torch.rand(16, 8))
+        bn, bn_momentum = model[1], model_momentum[1]
+        expected_mean = bn_momentum.running_mean * 0.9 + bn.running_mean * 0.1
+        expected_var = bn_momentum.running_var * 0.9 + bn.running_var * 0.1
+        update_momentum(model, model_momentum, 0.9, update_buffers=True)
+        self.assertTrue(torch.allclose(bn_momentum.running_mean, expected_mean))
+        self.assertTrue(torch.allclose(bn_momentum.running_var, expected_var))
+        # integer buffers are copied
+        self.assertEqual(bn_momentum.num_batches_tracked, 1)
+
+    def test_momentum_encoder_mixin_update_buffers(self):
+        class Model(nn.Module, _MomentumEncoderMixin):
+            def __init__(self):
+                super().__init__()
+                self.backbone = nn.Sequential(nn.Linear(8, 4), nn.BatchNorm1d(4))
+                self.projection_head = nn.Sequential(nn.Linear(4, 2), nn.BatchNorm1d(2))
+                self._init_momentum_encoder()
+
+        torch.manual_seed(0)
+        for update_buffers in [False, True]:
+            with self.subTest(update_buffers=update_buffers):
+                model = Model()
+                model.projection_head(model.backbone(torch.rand(16, 8)))
+                momentum_model = copy.deepcopy(model)
+                model._momentum_update(0.9, update_buffers=update_buffers)
+                for module, momentum_module in [
+                    (momentum_model.backbone, momentum_model.momentum_backbone),
+                    (
+                        momentum_model.projection_head,
+                        momentum_model.momentum_projection_head,
+                    ),
+                ]:
+                    update_momentum(
+                        module, momentum_module, 0.9, update_buffers=update_buffers
+                    )
+                for buffer, expected_buffer in zip(
+                    model.buffers(), momentum_model.buffers()
+                ):
+                    self.assertTrue(torch.allclose(buffer, expected_buffer))
+                for param, expected_param in zip(
+                    model.parameters(), momentum_model.parameters()
+                ):
+                    self.assertTrue(torch.allclose(param, expected_param))
+                running_mean = model.momentum_backbone[1].running_mean
+                self.assertEqual(
+                    torch.equal(running_mean, torch.zeros(4)), not update_buffers
+                )
+
     def test_normalize_weight_linear(self):
         input_dim = 32
         output_dim = 64
@@ -0,0 +1,143 @@
+import pytest
+import torch
+import torchvision.transforms.functional as TF
+from PIL import Image
+
+from lightly.transforms import batch_transform
+from lightly.transforms.batch_transform import (
+    BatchViewTransform,
+    DINOBatchTransform,
+    SimCLRBatchTransform,
+)
+
+
+def _identity_transform(**kwargs) -> BatchViewTransform:
+    params = dict(
+        input_size=16,
+        crop_scale=(1.0, 1.0),
+        crop_ratio=(1.0, 1.0),
+        hf_prob=0.0,
+        cj_prob=0.0,
+        random_gray_scale=0.0,
+        gaussian_blur=0.0,
+        normalize=None,
+    )
+    params.update(kwargs)
+    return BatchViewTransform(**params)
+
+
+def test_view_on_tensor_batch():
+    transform = BatchViewTransform(input_size=32, vf_prob=0.5, rr_prob=0.5)
+    images = torch.randint(0, 256, (8, 3, 40, 50), dtype=torch.uint8)
+    output = transform(images)
+    assert output.shape == (8, 3, 32, 32)
+    assert output.dtype == torch.float32
+
+
+def test_view_on_images_with_different_sizes():
+    transform = BatchViewTransform(input_size=32, solarization_prob=0.5)
+    images = [
+        Image.new("RGB", (100, 60)),
+        torch.randint(0, 256, (3, 20, 70), dtype=torch.uint8),
+    ]
+    assert transform(images).shape == (2, 3, 32, 32)
+
+
+def test_identity():
+    images = torch.randint(0, 256, (4, 3, 16, 16), dtype=torch.uint8)
+    output = _identity_transform()(images)
+    assert torch.allclose(output, images.float() / 255)
+
+
+def test_flip_grayscale_solarize():
+    images = torch.rand(4, 3, 16, 16)
+    assert torch.equal(_identity_transform(hf_prob=1.0)(images), images.flip(-1))
+    assert torch.equal(_identity_transform(vf_prob=1.0)(images), images.flip(-2))
+    output = _identity_transform(random_gray_scale=1.0)(images)
+    # PIL and torchvision use slightly different weights for the red channel.
+    assert torch.allclose(output, TF.rgb_to_grayscale(images, 3), atol=1e-3)
+    output = _identity_transform(solarization_prob=1.0)(images)
+    assert torch.allclose(output, TF.solarize(images, 128 / 255))
+
+
+def test_rotate():
+    images = torch.rand(4, 3, 16, 16)
+    output = _identity_transform(rr_prob=1.0)(images)
+    assert torch.equal(output, TF.rotate(images, 90))
+
+
+@pytest.mark.parametrize(
+    "adjust, reference",
+    [
+        (batch_transform._adjust_brightness, TF.adjust_brightness),
+        (batch_transform._adjust_contrast, TF.adjust_contrast),
+        (batch_transform._adjust_saturation, TF.adjust_saturation),
+        (batch_transform._adjust_hue, TF.adjust_hue),
+    ],
+)
+def test_color_adjustments(adjust, reference):
+    images = torch.rand(4, 3, 8, 8)
+    if adjust is batch_transform._adjust_hue:
+        factors = torch.tensor([-0.4, -0.1, 0.2, 0.5])
+    else:
+        factors = torch.tensor([0.2, 0.9, 1.3, 1.8])
+    output = adjust(images, factors)
+    expected = torch.stack(
+        [reference(image, float(factor)) for image, factor in zip(images, factors)]
+    )
+    assert torch.allclose(output, expected, atol=1e-4)
+
+
+def test_gaussian_blur():
+    images = torch.rand(3, 3, 16, 16)
+    output = batch_transform._gaussian_blur(images, torch.tensor([0.5, 1.0, 2.0]))
+    expected = torch.stack(
+        [
+            TF.gaussian_blur(images[0], kernel_size=13, sigma=0.5),
+            TF.gaussian_blur(images[1], kernel_size=13, sigma=1.0),
+        ]
+    )
+    # All images are blurred with a kernel of size 13 due to the largest sigma.
+    # Interior pixels are not affected by the different padding modes.
+    assert torch.allclose(
+        output[:2, :, 6:-6, 6:-6], expected[:, :, 6:-6, 6:-6], atol=1e-5
+    )
+    # Stronger blur reduces the variance more.
+    assert output[2].var() < output[1].var() < output[0].var() < images.var()
+
+
+def test_random_resized_crop_fallback():
+    # No crop with the requested aspect ratio fits into a very wide image.
+    images = torch.rand(2, 3, 4, 64)
+    output = batch_transform._random_resized_crop(
+        images,
+        heights=torch.tensor([4, 4]),
+        widths=torch.tensor([64, 64]),
+        size=4,
+        scale=(0.9, 1.0),
+        ratio=(1.0, 1.0),
+    )
+    assert torch.allclose(output, images[:, :, :, 30:34])
+
+
+def test_simclr_batch_transform():
+    transform = SimCLRBatchTransform(input_size=32)
+    views = transform.transform_batch(
+        torch.randint(0, 256, (4, 3, 48, 48), dtype=torch.uint8)
+    )
+    assert len(views) == 2
+    assert all(view.shape == (4, 3, 32, 32) for view in views)
+
+    views = transform(Image.new("RGB", (100, 100)))
+    assert len(views) == 2
+    assert views[0].shape == (3, 32, 32)
+
+
+def test_dino_batch_transform():
+    transform = DINOBatchTransform(
+        global_crop_size=32, local_crop_size=16, n_local_views=3
+    )
+    views = transform.transform_batch([Image.new("RGB", (64, 48))] * 2)
+    assert len(views) == 5
+    assert all(view.shape == (2, 3, 32, 32) for view in views[:2])
+    assert all(view.shape == (2, 3, 16, 16) for view in views[2:])
@@ -19,3 +19,16 @@ def test_multi_view_on_pil_image():
     assert all(out.shape == (3, 32, 32) for out in output[:2])
     # local views
     assert all(out.shape == (3, 8, 8) for out in output[2:])
+
+
+def test_multi_view_resize_once():
+    multi_view_transform = DINOTransform(
+        global_crop_size=32, local_crop_size=8, resize_once=True
+    )
+    # max(32 / sqrt(0.4 * 3 / 4), 8 / sqrt(0.05 * 3 / 4))
+    assert multi_view_transform.working_size == 59
+    sample = Image.new("RGB", (300, 200))
+    output = multi_view_transform(sample)
+    assert len(output) == 8
+    assert all(out.shape == (3, 32, 32) for out in output[:2])
+    assert all(out.shape == (3, 8, 8) for out in output[2:])
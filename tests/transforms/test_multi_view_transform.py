@@ -1,9 +1,10 @@
 import unittest
 
+import torch
 import torchvision.transforms as T
 from PIL import Image
 
-from lightly.transforms.multi_view_transform import MultiViewTransform
+from lightly.transforms.multi_view_transform import MultiViewTransform, get_working_size
 
 
 def test_multi_view_on_pil_image():
@@ -17,3 +18,31 @@ def test_multi_view_on_pil_image():
     sample = Image.new("RGB", (10, 10))
     output = multi_view_transform(sample)
     assert len(output) == 3
+
+
+def test_get_working_size():
+    assert get_working_size(crop_sizes=[96], crop_min_scales=[0.75]) == 128
+    # the largest required size is returned
+    assert get_working_size(crop_sizes=[224, 96], crop_min_scales=[1.0, 0.01]) == 1109
+
+
+def test_multi_view_working_size():
+    sizes = []
+    multi_view_transform = MultiViewTransform(
+        [lambda image: sizes.append(image.size)] * 3, working_size=50
+    )
+    multi_view_transform(Image.new("RGB", (200, 100)))
+    assert sizes == [(100, 50)] * 3
+
+    # smaller images are not resized
+    sizes.clear()
+    multi_view_transform(Image.new("RGB", (40, 30)))
+    assert sizes == [(40, 30)] * 3
+
+
+def test_multi_view_working_size_tensor():
+    multi_view_transform = MultiViewTransform(
+        [lambda image: image.shape] * 2, working_size=50
+    )
+    output = multi_view_transform(torch.rand(3, 100, 300))
+    assert output == [(3, 50, 150)] * 2
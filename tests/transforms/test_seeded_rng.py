@@ -0,0 +1,73 @@
+import random
+
+import numpy as np
+import torch
+import torchvision.transforms as T
+from PIL import Image
+
+from lightly.transforms.multi_view_transform import MultiViewTransform
+from lightly.transforms.seeded_rng import (
+    derive_seed,
+    get_sample_seed,
+    sample_rng,
+    seeded_rng,
+)
+
+
+def _random_values():
+    return torch.rand(1).item(), np.random.random_sample(), random.random()
+
+
+def test_derive_seed():
+    assert derive_seed(0, 1, 2) == derive_seed(0, 1, 2)
+    assert derive_seed(0, 1, 2) != derive_seed(0, 2, 1)
+    assert 0 <= derive_seed(0) < 2**32
+
+
+def test_seeded_rng():
+    with seeded_rng(0):
+        values = _random_values()
+    with seeded_rng(0):
+        assert _random_values() == values
+    with seeded_rng(1):
+        assert _random_values() != values
+
+
+def test_seeded_rng_restores_state():
+    torch.manual_seed(0)
+    np.random.seed(0)
+    random.seed(0)
+    expected = _random_values()
+
+    torch.manual_seed(0)
+    np.random.seed(0)
+    random.seed(0)
+    with seeded_rng(1):
+        _random_values()
+    assert _random_values() == expected
+
+
+def test_sample_rng():
+    assert get_sample_seed() is None
+    with sample_rng(seed=0, epoch=0, index=0):
+        sample_seed = get_sample_seed()
+        values = _random_values()
+    assert get_sample_seed() is None
+    assert sample_seed == derive_seed(0, 0, 0)
+    with sample_rng(seed=0, epoch=0, index=0):
+        assert _random_values() == values
+    with sample_rng(seed=0, epoch=1, index=0):
+        assert _random_values() != values
+
+
+def test_multi_view_transform():
+    view_transform = T.Compose([T.RandomResizedCrop(8), T.PILToTensor()])
+    sample = Image.fromarray(np.random.randint(0, 256, (32, 32, 3), dtype=np.uint8))
+    with sample_rng(seed=0, epoch=0, index=0):
+        views = MultiViewTransform([view_transform] * 3)(sample)
+    # views are different from each other
+    assert not torch.equal(views[0], views[1])
+    # views do not depend on the number of views
+    with sample_rng(seed=0, epoch=0, index=0):
+        views_2 = MultiViewTransform([view_transform] * 2)(sample)
+    assert all(torch.equal(v, v2) for v, v2 in zip(views, views_2))
@@ -17,3 +17,14 @@ def test_multi_view_on_pil_image():
     assert len(output) == 8
     assert all(out.shape == (3, 32, 32) for out in output[:2])
     assert all(out.shape == (3, 8, 8) for out in output[2:])
+
+
+def test_multi_view_resize_once():
+    multi_view_transform = SwaVTransform(crop_sizes=(32, 8), resize_once=True)
+    # max(32 / sqrt(0.14 * 3 / 4), 8 / sqrt(0.05 * 3 / 4))
+    assert multi_view_transform.working_size == 99
+    sample = Image.new("RGB", (300, 200))
+    output = multi_view_transform(sample)
+    assert len(output) == 8
+    assert all(out.shape == (3, 32, 32) for out in output[:2])
+    assert all(out.shape == (3, 8, 8) for out in output[2:])
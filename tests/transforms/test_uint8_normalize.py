@@ -0,0 +1,80 @@
+import random
+
+import numpy as np
+import pytest
+import torch
+from PIL import Image
+
+from lightly.transforms import (
+    DINOTransform,
+    FastSiamTransform,
+    MAETransform,
+    MoCoV2Transform,
+    MSNTransform,
+    PIRLTransform,
+    SimCLRTransform,
+    SimSiamTransform,
+    SMoGTransform,
+    SwaVTransform,
+    Uint8Normalize,
+    VICRegLTransform,
+    VICRegTransform,
+)
+
+
+def _seed(seed: int) -> None:
+    random.seed(seed)
+    np.random.seed(seed)
+    torch.manual_seed(seed)
+
+
+def test_uint8_normalize():
+    images = torch.randint(0, 256, (2, 3, 8, 8), dtype=torch.uint8)
+    mean = torch.tensor([0.1, 0.2, 0.3]).view(-1, 1, 1)
+    std = torch.tensor([0.4, 0.5, 0.6]).view(-1, 1, 1)
+    normalize = Uint8Normalize({"mean": [0.1, 0.2, 0.3], "std": [0.4, 0.5, 0.6]})
+    output = normalize(images)
+    assert output.dtype == torch.float32
+    assert torch.allclose(output, (images / 255 - mean) / std, atol=1e-5)
+    assert torch.allclose(Uint8Normalize(None)(images), images / 255)
+    # float images are returned unchanged
+    assert normalize(output) is output
+
+
+@pytest.mark.parametrize(
+    "transform_cls, kwargs",
+    [
+        (DINOTransform, dict(global_crop_size=32, local_crop_size=16)),
+        (FastSiamTransform, dict(input_size=32)),
+        (MAETransform, dict(input_size=32)),
+        (MoCoV2Transform, dict(input_size=32)),
+        (MSNTransform, dict(random_size=32, focal_size=16)),
+        (PIRLTransform, dict(input_size=63)),
+        (SimCLRTransform, dict(input_size=32)),
+        (SimSiamTransform, dict(input_size=32)),
+        (SMoGTransform, dict(crop_sizes=(32, 16))),
+        (SwaVTransform, dict(crop_sizes=(32, 16))),
+        (VICRegTransform, dict(input_size=32)),
+    ],
+)
+def test_output_uint8(transform_cls, kwargs):
+    image = Image.fromarray(np.random.randint(0, 256, (64, 64, 3), dtype=np.uint8))
+    _seed(0)
+    expected = transform_cls(**kwargs)(image)
+    _seed(0)
+    output = transform_cls(output_uint8=True, **kwargs)(image)
+    assert len(output) == len(expected)
+    normalize = Uint8Normalize()
+    for view, expected_view in zip(output, expected):
+        assert view.dtype == torch.uint8
+        assert torch.allclose(normalize(view), expected_view, atol=1e-5)
+
+
+def test_output_uint8_vicregl():
+    image = Image.new("RGB", (64, 64))
+    output = VICRegLTransform(
+        global_crop_size=32, local_crop_size=16, n_local_views=6, output_uint8=True
+    )(image)
+    views, grids = output[:8], output[8:]
+    assert all(view.dtype == torch.uint8 for view in views)
+    assert all(grid.is_floating_point() for grid in grids)
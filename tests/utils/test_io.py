@@ -1,5 +1,6 @@
 import csv
 import json
+import os
 import sys
 import tempfile
 import unittest
@@ -9,6 +10,11 @@ import numpy as np
 from lightly.utils.io import (
     check_embeddings,
     check_filenames,
+    convert_embeddings_binary_to_csv,
+    convert_embeddings_csv_to_binary,
+    iter_embeddings,
+    load_embeddings,
+    load_embeddings_as_dict,
     save_custom_metadata,
     save_embeddings,
     save_schema,
@@ -62,6 +68,155 @@ class TestEmbeddingsIO(unittest.TestCase):
     def test_valid_embeddings(self):
         check_embeddings(self.embeddings_path)
 
+    def test_save_load_embeddings_binary(self):
+        tmp_dir = tempfile.mkdtemp()
+        path = os.path.join(tmp_dir, "embeddings.npy")
+        embeddings = np.random.rand(32, 4)
+        labels = list(range(32))
+        filenames = [f"img_{i}.jpg" for i in range(32)]
+        save_embeddings(path, embeddings, labels, filenames)
+        self.assertTrue(os.path.isfile(os.path.join(tmp_dir, "embeddings.npy")))
+        self.assertTrue(
+            os.path.isfile(os.path.join(tmp_dir, "embeddings.filenames.csv"))
+        )
+        check_embeddings(path)
+
+        for mmap_mode in [None, "r"]:
+            with self.subTest(mmap_mode=mmap_mode):
+                loaded, loaded_labels, loaded_filenames = load_embeddings(
+                    path, mmap_mode=mmap_mode
+                )
+                self.assertEqual(loaded.dtype, np.float32)
+                np.testing.assert_array_equal(loaded, embeddings.astype(np.float32))
+                self.assertListEqual(loaded_labels, labels)
+                self.assertListEqual(loaded_filenames, filenames)
+
+    def test_binary_embeddings_missing_sidecar(self):
+        tmp_dir = tempfile.mkdtemp()
+        path = os.path.join(tmp_dir, "embeddings.npy")
+        np.save(path, np.random.rand(4, 2).astype(np.float32))
+        with self.assertRaises(RuntimeError) as context:
+            check_embeddings(path)
+        self.assertTrue("has no filenames and labels file" in str(context.exception))
+
+    def test_binary_embeddings_length_mismatch(self):
+        tmp_dir = tempfile.mkdtemp()
+        path = os.path.join(tmp_dir, "embeddings.npy")
+        save_embeddings(path, np.random.rand(4, 2), [0] * 4, ["a", "b", "c", "d"])
+        np.save(path, np.random.rand(5, 2).astype(np.float32))
+        with self.assertRaises(RuntimeError):
+            check_embeddings(path)
+
+    def test_convert_embeddings_csv_binary_roundtrip(self):
+        tmp_dir = tempfile.mkdtemp()
+        binary_path = os.path.join(tmp_dir, "embeddings.npy")
+        csv_path = os.path.join(tmp_dir, "embeddings_converted.csv")
+        embeddings, labels, filenames = load_embeddings(self.embeddings_path)
+
+        convert_embeddings_csv_to_binary(self.embeddings_path, binary_path)
+        convert_embeddings_binary_to_csv(binary_path, csv_path)
+        check_embeddings(csv_path)
+
+        for path in [binary_path, csv_path]:
+            with self.subTest(path=path):
+                loaded, loaded_labels, loaded_filenames = load_embeddings(path)
+                np.testing.assert_array_equal(loaded, embeddings)
+                self.assertListEqual(loaded_labels, labels)
+                self.assertListEqual(loaded_filenames, filenames)
+
+    def test_load_embeddings_chunked(self):
+        expected, expected_labels, expected_filenames = load_embeddings(
+            self.embeddings_path, chunk_size=32
+        )
+        for chunk_size in [1, 5, 32, 100]:
+            with self.subTest(chunk_size=chunk_size):
+                embeddings, labels, filenames = load_embeddings(
+                    self.embeddings_path, chunk_size=chunk_size
+                )
+                self.assertEqual(embeddings.dtype, np.float32)
+                np.testing.assert_array_equal(embeddings, expected)
+                self.assertListEqual(labels, expected_labels)
+                self.assertListEqual(filenames, expected_filenames)
+
+    def test_load_embeddings_memmap(self):
+        memmap_path = os.path.join(tempfile.mkdtemp(), "embeddings.npy")
+        embeddings, _, _ = load_embeddings(self.embeddings_path, chunk_size=7)
+        memmap, _, _ = load_embeddings(
+            self.embeddings_path, memmap_path=memmap_path, chunk_size=7
+        )
+        self.assertIsInstance(memmap, np.memmap)
+        np.testing.assert_array_equal(memmap, embeddings)
+        np.testing.assert_array_equal(np.load(memmap_path), embeddings)
+
+    def test_iter_embeddings(self):
+        embeddings, labels, filenames = load_embeddings(self.embeddings_path)
+        binary_path = os.path.join(tempfile.mkdtemp(), "embeddings.npy")
+        save_embeddings(binary_path, embeddings, labels, filenames)
+        for path in [self.embeddings_path, binary_path]:
+            with self.subTest(path=path):
+                chunks = list(iter_embeddings(path, chunk_size=10))
+                self.assertListEqual([len(c[0]) for c in chunks], [10, 10, 10, 2])
+                np.testing.assert_array_equal(
+                    np.concatenate([c[0] for c in chunks]), embeddings
+                )
+                self.assertListEqual(sum([c[1] for c in chunks], []), labels)
+                self.assertListEqual(sum([c[2] for c in chunks], []), filenames)
+
+    def test_load_embeddings_as_dict(self):
+        embeddings, labels, filenames = load_embeddings(self.embeddings_path)
+        binary_path = os.path.join(tempfile.mkdtemp(), "embeddings.npy")
+        save_embeddings(binary_path, embeddings, labels, filenames)
+        for path in [self.embeddings_path, binary_path]:
+            for chunk_size in [5, 100]:
+                with self.subTest(path=path, chunk_size=chunk_size):
+                    (
+                        data,
+                        loaded,
+                        loaded_labels,
+                        loaded_filenames,
+                    ) = load_embeddings_as_dict(
+                        path,
+                        embedding_name="name",
+                        return_all=True,
+                        chunk_size=chunk_size,
+                    )
+                    self.assertEqual(data["embeddingName"], "name")
+                    self.assertListEqual(
+                        data["embeddings"],
+                        [
+                            {"fileName": f, "value": e.tolist(), "label": l}
+                            for e, f, l in zip(embeddings, filenames, labels)
+                        ],
+                    )
+                    np.testing.assert_array_equal(loaded, embeddings)
+                    self.assertListEqual(loaded_labels, labels)
+                    self.assertListEqual(loaded_filenames, filenames)
+                    self.assertDictEqual(
+                        load_embeddings_as_dict(
+                            path, embedding_name="name", chunk_size=chunk_size
+                        ),
+                        data,
+                    )
+
+    def test_iter_embeddings_empty_rows(self):
+        lines = [
+            "filenames,embedding_0,embedding_1,labels\n",
+            "img_1.jpg,0.351,0.1231,0\n\n" "img_2.jpg,0.311,0.6231,0",
+        ]
+        with open(self.embeddings_path, "w") as f:
+            f.writelines(lines)
+        with self.assertRaises(RuntimeError) as context:
+            load_embeddings(self.embeddings_path)
+        self.assertTrue("must not have empty rows" in str(context.exception))
+
+    def test_convert_embeddings_invalid_paths(self):
+        with self.assertRaises(ValueError):
+            convert_embeddings_csv_to_binary(self.embeddings_path, "embeddings.csv")
+        with self.assertRaises(ValueError):
+            convert_embeddings_binary_to_csv("embeddings.csv", "embeddings.csv")
+        with self.assertRaises(ValueError):
+            convert_embeddings_binary_to_csv("embeddings.npy", "embeddings.npy")
+
     def test_whitespace_in_embeddings(self):
         # should fail because there whitespaces in the header columns
         lines = [
@@ -0,0 +1,52 @@
+import unittest
+
+import numpy as np
+import torch
+
+from lightly.utils.reordering import get_sort_indices, sort_items_by_keys
+
+
+class TestReordering(unittest.TestCase):
+    def test_sort_items_by_keys_list(self):
+        keys = [3, 2, 1]
+        items = ["!", "world", "hello"]
+        sorted_keys = [1, 2, 3]
+        sorted_items = sort_items_by_keys(keys, items, sorted_keys)
+        self.assertListEqual(sorted_items, ["hello", "world", "!"])
+
+    def test_sort_items_by_keys_array(self):
+        keys = [f"img_{i}.jpg" for i in [4, 0, 3, 1, 2]]
+        sorted_keys = [f"img_{i}.jpg" for i in range(5)]
+        items = np.array([[4, 4], [0, 0], [3, 3], [1, 1], [2, 2]])
+        sorted_items = sort_items_by_keys(keys, items, sorted_keys)
+        self.assertIsInstance(sorted_items, np.ndarray)
+        np.testing.assert_array_equal(
+            sorted_items, np.repeat(np.arange(5), 2, 0).reshape(5, 2)
+        )
+
+    def test_sort_items_by_keys_tensor(self):
+        keys = ["c", "a", "b"]
+        sorted_keys = ["b", "c", "a"]
+        items = torch.tensor([2, 0, 1])
+        sorted_items = sort_items_by_keys(keys, items, sorted_keys)
+        self.assertIsInstance(sorted_items, torch.Tensor)
+        self.assertListEqual(sorted_items.tolist(), [1, 2, 0])
+
+    def test_sort_items_by_keys_different_lengths(self):
+        with self.assertRaises(ValueError):
+            sort_items_by_keys([1, 2], np.array([1, 2]), [1])
+
+    def test_get_sort_indices(self):
+        keys = np.random.permutation(1000).astype(str)
+        sorted_keys = np.random.permutation(keys)
+        indices = get_sort_indices(list(keys), list(sorted_keys))
+        np.testing.assert_array_equal(keys[indices], sorted_keys)
+
+    def test_get_sort_indices_empty(self):
+        self.assertEqual(len(get_sort_indices([], [])), 0)
+
+    def test_get_sort_indices_missing_key(self):
+        for sorted_keys in [["a", "b", "d"], ["a", "b", "0"], ["a", "b", "z"]]:
+            with self.subTest(sorted_keys=sorted_keys):
+                with self.assertRaises(KeyError):
+                    get_sort_indices(["a", "b", "c"], sorted_keys)